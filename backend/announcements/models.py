@@ -4,5 +4,10 @@ class Announcement(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='announcement_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"Announcement from {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from config.cache import bump_version
+from .models import Announcement
+
+
+@receiver([post_save, post_delete], sender=Announcement)
+def invalidate_list_cache(sender, **kwargs):
+    bump_version(sender._meta.label)
@@ -1,10 +1,14 @@
 from rest_framework import viewsets, mixins
+from config.async_views import AsyncListModelMixin
+from config.cache import CachedListMixin, ConditionalListMixin
 from .models import Announcement
 from .serializers import AnnouncementSerializer
 
-class AnnouncementViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class AnnouncementViewSet(
+    ConditionalListMixin, CachedListMixin, AsyncListModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
     """
     Provides a list of announcements ordered by latest first.
     """
-    queryset = Announcement.objects.order_by('-created_at')
+    queryset = Announcement.objects.order_by('-created_at', '-id')
     serializer_class = AnnouncementSerializer
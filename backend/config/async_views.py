@@ -0,0 +1,121 @@
+"""
+Native async GET handlers for the read-heavy viewsets (ASGI mode).
+
+DRF dispatches synchronously, so under ASGI every DRF request is handed to a
+worker thread and holds it for the whole request, slow client included. With
+``API_ASYNC_VIEWS`` enabled (``config/asgi.py`` turns it on), viewsets that
+mix in ``AsyncListModelMixin``/``AsyncRetrieveModelMixin`` route GET and HEAD
+list/retrieve to ``alist``/``aretrieve``, which run on the event loop: the
+viewset builds its queryset as usual, the page is fetched with the async ORM
+and the response is rendered in place. Writes and non-JSON renderers (the
+browsable API) still go through the regular DRF view.
+
+Django's async ORM runs each query in a thread of its own, but that thread is
+held for the query only, not for the request.
+"""
+import time
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404, HttpResponse
+from rest_framework.response import Response
+
+READ_ACTIONS = ('list', 'retrieve')
+
+
+class AsyncReadMixin:
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        action = (actions or {}).get('get')
+        if not settings.API_ASYNC_VIEWS or action not in READ_ACTIONS or not hasattr(cls, f'a{action}'):
+            return view
+        return async_read_view(cls, view, actions, initkwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """``APIView.dispatch`` for the async handlers; ``None`` means use the sync view."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # No authenticators are configured, so content negotiation,
+            # permission and throttle checks never touch the database.
+            self.initial(request, *args, **kwargs)
+            if request.accepted_renderer.format != 'json':
+                return None
+            response = await getattr(self, f'a{self.action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        if not isinstance(response, Response):
+            # 304 from the conditional GET mixins
+            return response
+        started = time.perf_counter()
+        response.render()
+        request._request._render_seconds = getattr(request._request, '_render_seconds', 0.0) + (
+            time.perf_counter() - started
+        )
+        # A plain HttpResponse keeps Django from handing the (already
+        # rendered) response to a thread just to call render() again.
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+
+def async_read_view(viewset_class, sync_view, actions, initkwargs):
+    sync_view_async = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            self = viewset_class(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            response = await self.adispatch(request, *args, **kwargs)
+            if response is not None:
+                return response
+        return await sync_view_async(request, *args, **kwargs)
+
+    update_wrapper(view, sync_view, assigned=())
+    view.cls = sync_view.cls
+    view.initkwargs = sync_view.initkwargs
+    view.actions = sync_view.actions
+    view.csrf_exempt = True
+    return view
+
+
+class AsyncListModelMixin(AsyncReadMixin):
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None and hasattr(self.paginator, 'apaginate_queryset'):
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+
+class AsyncRetrieveModelMixin(AsyncReadMixin):
+
+    async def aretrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            # Same message as get_object_or_404()
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        self.check_object_permissions(request, instance)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
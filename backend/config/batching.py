@@ -0,0 +1,103 @@
+"""
+Write coalescing for bursty create endpoints.
+
+``BatchedCreateMixin`` turns ``perform_create`` into a hand-off to a
+``BulkCreateBatcher``: the first request of a batch becomes its leader,
+waits up to ``batch_window_ms`` for concurrent requests to add their rows
+(or until ``batch_size`` is reached) and inserts them all with one
+``bulk_create``; the others block until that INSERT is done. Every request
+still gets its own row back with its primary key. Instead of a ``post_save``
+per row, ``bulk_created`` is sent once for the batch, so its receivers
+(cache invalidation, live announcements) do their work once per INSERT;
+models created through a batcher must handle it.
+
+Rows only coalesce when a process handles several writes at once, i.e.
+with threaded gunicorn workers (``--threads``); otherwise each request pays
+the window and inserts alone, so leave it off there.
+"""
+import threading
+
+from django.db import router
+from django.dispatch import Signal
+
+# Sent after a batch is inserted: sender=model, instances=[...], using=alias
+bulk_created = Signal()
+
+
+class Batch:
+    def __init__(self):
+        self.objects = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.error = None
+
+
+class BulkCreateBatcher:
+
+    def __init__(self, model, size, window):
+        self.model = model
+        self.size = size
+        self.window = window
+        self._lock = threading.Lock()
+        self._batch = None
+
+    def submit(self, obj):
+        with self._lock:
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = Batch()
+            batch.objects.append(obj)
+            if len(batch.objects) >= self.size:
+                self._batch = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._batch is batch:
+                    self._batch = None
+            self.flush(batch)
+        else:
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return obj
+
+    def flush(self, batch):
+        try:
+            using = router.db_for_write(self.model)
+            self.model.objects.using(using).bulk_create(batch.objects)
+            bulk_created.send(sender=self.model, instances=batch.objects, using=using)
+        except Exception as exc:
+            batch.error = exc
+        finally:
+            batch.done.set()
+
+
+class BatchedCreateMixin:
+    """
+    ``batch_create`` enables coalescing for a viewset; ``batch_size`` and
+    ``batch_window_ms`` bound each batch. The serializer's ``create`` is
+    bypassed, so it must not have side effects beyond building the row.
+    """
+    batch_create = False
+    batch_size = 50
+    batch_window_ms = 20.0
+
+    _batchers = {}
+    _batchers_lock = threading.Lock()
+
+    def get_batcher(self):
+        key = (type(self), self.batch_size, self.batch_window_ms)
+        with self._batchers_lock:
+            if key not in self._batchers:
+                model = self.get_queryset().model
+                self._batchers[key] = BulkCreateBatcher(model, self.batch_size, self.batch_window_ms / 1000)
+            return self._batchers[key]
+
+    def perform_create(self, serializer):
+        if not self.batch_create:
+            return super().perform_create(serializer)
+        model = self.get_queryset().model
+        serializer.instance = self.get_batcher().submit(model(**serializer.validated_data))
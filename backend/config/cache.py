@@ -0,0 +1,244 @@
+"""
+Versioned read-through cache for the public list endpoints.
+
+Every cached response key embeds the current version of each model it was
+built from. Saving or deleting a row bumps that model's version (see the
+``signals`` module of each app), so stale entries are simply never read again
+and age out of the backend instead of being deleted one by one.
+
+The versions live in the database (``config.models.ModelVersion``), so a bump
+made by any worker invalidates every worker's entries on its next request.
+That costs one primary-key query per cached request. The responses
+themselves live in the ``api`` alias in ``CACHES``: ``LRUCache`` keeps them
+in process memory, and the file or database backend shares them between
+workers.
+"""
+import hashlib
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from config import snapshots
+from config.models import ModelVersion
+
+API_CACHE_ALIAS = 'api'
+
+
+class CacheStats:
+    """Process-local hit/miss/eviction counters for the API cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def record(self, hits=0, misses=0, evictions=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else None,
+            }
+
+
+stats = CacheStats()
+
+
+class LRUCache(LocMemCache):
+    """``LocMemCache`` (already LRU ordered) that counts culled entries."""
+
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        stats.record(evictions=before - len(self._cache))
+
+
+def get_cache():
+    return caches[API_CACHE_ALIAS]
+
+
+def get_versions(labels):
+    """Current version of each model label, initialising missing counters."""
+    found = dict(ModelVersion.objects.filter(label__in=labels).values_list('label', 'version'))
+    missing = [label for label in labels if label not in found]
+    if missing:
+        # Seeded from the clock, like a bump
+        ModelVersion.objects.bulk_create(
+            [ModelVersion(label=label, version=time.time_ns()) for label in missing], ignore_conflicts=True
+        )
+        found.update(ModelVersion.objects.filter(label__in=missing).values_list('label', 'version'))
+    return {label: found[label] for label in labels}
+
+
+def bump_version(label):
+    # Versions are the nanosecond timestamp of the last change, which makes
+    # them double as the Last-Modified time of anything built from the model.
+    version = time.time_ns()
+    if not ModelVersion.objects.filter(label=label).update(version=version):
+        ModelVersion.objects.update_or_create(label=label, defaults={'version': version})
+    snapshots.model_changed(label)
+
+
+def list_cache_key(request, versions):
+    version_part = ','.join(f'{label}={version}' for label, version in versions.items())
+    uri = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'list:{version_part}:{uri}'
+
+
+class VersionedModelsMixin:
+    """
+    ``cache_models`` names the models (``app_label.ModelName``) a viewset's
+    responses are built from; it defaults to the queryset's model.
+    """
+    cache_models = ()
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model._meta.label,)
+
+    def get_model_versions(self):
+        # Read once per request (views are instantiated per request), shared
+        # by the cache key and the conditional GET validators
+        if not hasattr(self, '_model_versions'):
+            self._model_versions = get_versions(sorted(self.get_cache_models()))
+        return self._model_versions
+
+
+class ConditionalGetMixin(VersionedModelsMixin):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with a 304 before the
+    queryset is touched. Use ``ConditionalListMixin`` and
+    ``ConditionalRetrieveMixin`` to apply it to the matching actions.
+
+    The ETag hashes the model versions with the full path and ``Accept``
+    header, and Last-Modified is the time of the latest version bump. The
+    versions are shared by every worker, so once any worker has recorded a
+    change, no worker answers a stale validator with 304, and nginx's
+    ``proxy_cache_revalidate`` can't keep a stale copy alive. Validating a
+    request costs the one version query. ``cache_control`` is added to every
+    200/304 so nginx ``proxy_cache`` can serve hot lists itself.
+    """
+    cache_control = None
+
+    def get_cache_control(self):
+        if self.cache_control is not None:
+            return self.cache_control
+        return {'public': True, 'max_age': settings.API_HTTP_MAX_AGE}
+
+    def get_validators(self, request):
+        versions = self.get_model_versions()
+        raw = '|'.join([
+            ','.join(f'{label}={version}' for label, version in versions.items()),
+            request.get_full_path(),
+            request.headers.get('Accept', ''),
+        ])
+        etag = 'W/"%s"' % hashlib.md5(raw.encode()).hexdigest()
+        return etag, max(versions.values()) // 1_000_000_000
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, last_modified)
+
+    async def aconditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = await sync_to_async(self.get_validators)(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, last_modified)
+
+    def add_validators(self, response, etag, last_modified):
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, **self.get_cache_control())
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional_response(super().alist, request, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(super().aretrieve, request, *args, **kwargs)
+
+
+class CachedListMixin(VersionedModelsMixin):
+    """
+    Serve ``list`` from the API cache.
+
+    Changes to any of ``cache_models`` invalidate the cached responses. For
+    paginated viewsets only the first page is cached; deeper pages are cheap
+    keyset reads and rarely repeated.
+    """
+
+    def should_cache(self, request):
+        cursor_param = getattr(self.paginator, 'cursor_query_param', None)
+        return not (cursor_param and cursor_param in request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_cache(request):
+            return super().list(request, *args, **kwargs)
+
+        key, response = self.cached_response(request)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+            self.store_response(key, response)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        # Cache lookups run in a thread: the database and file backends
+        # block, and the database one refuses to run on the event loop.
+        if not self.should_cache(request):
+            return await super().alist(request, *args, **kwargs)
+
+        key, response = await sync_to_async(self.cached_response)(request)
+        if response is None:
+            response = await super().alist(request, *args, **kwargs)
+            await sync_to_async(self.store_response)(key, response)
+        return response
+
+    def cached_response(self, request):
+        key = list_cache_key(request, self.get_model_versions())
+        data = get_cache().get(key)
+        if data is None:
+            stats.record(misses=1)
+            return key, None
+        stats.record(hits=1)
+        return key, Response(data)
+
+    def store_response(self, key, response):
+        if response.status_code == 200:
+            get_cache().set(key, response.data, settings.API_CACHE_TIMEOUT)
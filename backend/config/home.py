@@ -0,0 +1,73 @@
+"""
+``/api/home/``: everything the landing page needs in one response.
+
+The bundle holds the latest announcements and the first page of praises
+and of visible posts, in the same shapes as ``/api/announcements/``,
+``/api/praises/`` and ``/api/posts/``. The ``next`` links point at those
+endpoints, so clients keep paging there. Building it costs three queries.
+It is cached as one unit and gets one ETag; a change to any of the three
+models invalidates both.
+"""
+from django.conf import settings
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from announcements.models import Announcement
+from announcements.serializers import AnnouncementSerializer
+from config.cache import CachedListMixin, ConditionalGetMixin
+from config.pagination import CreatedAtCursorPagination
+from posts.models import Post
+from posts.serializers import PostFeedSerializer
+from posts.views import feed_queryset
+from praises.models import Praise
+from praises.serializers import PraiseSerializer
+
+
+class FirstPagePagination(CreatedAtCursorPagination):
+    """The first page of another endpoint's list, linking to that endpoint."""
+
+    def __init__(self, url_name):
+        self.url_name = url_name
+
+    def decode_cursor(self, request):
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = super().paginate_queryset(queryset, request, view)
+        self.base_url = request.build_absolute_uri(reverse(self.url_name))
+        return page
+
+
+class HomeView(ConditionalGetMixin, CachedListMixin, APIView):
+    cache_models = ('announcements.Announcement', 'praises.Praise', 'posts.Post')
+
+    def get(self, request):
+        return self.conditional_response(self.bundle, request)
+
+    def bundle(self, request):
+        key, response = self.cached_response(request)
+        if response is None:
+            response = self.build_response(request)
+            self.store_response(key, response)
+        return response
+
+    def build_response(self, request):
+        announcements = Announcement.objects.order_by('-created_at', '-id')[:settings.HOME_ANNOUNCEMENT_LIMIT]
+        fields = list(PostFeedSerializer.Meta.fields)
+        return Response({
+            'announcements': AnnouncementSerializer(announcements, many=True).data,
+            'praises': self.first_page(Praise.objects.all(), PraiseSerializer, 'praise-list'),
+            'posts': self.first_page(
+                feed_queryset(Post.objects.all(), fields), PostFeedSerializer, 'post-list', fields=fields,
+            ),
+        })
+
+    def first_page(self, queryset, serializer_class, url_name, **kwargs):
+        paginator = FirstPagePagination(url_name)
+        rows = paginator.paginate_queryset(queryset, self.request, view=self)
+        return {
+            'next': paginator.get_next_link(),
+            'previous': None,
+            'results': serializer_class(rows, many=True, context={'request': self.request}, **kwargs).data,
+        }
@@ -0,0 +1,55 @@
+import gzip
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from config.middleware import brotli
+from config.renderers import ORJSONRenderer
+
+PATHS = ('/api/praises/', '/api/posts/', '/api/announcements/', '/api/home/')
+
+
+def median_ms(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = "Compare JSON render time and bytes on the wire (identity/gzip/brotli) for the main list endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=PATHS)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--page-size', type=int, help="page_size for the paginated lists.")
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        iterations = options['iterations']
+        for path in options['paths']:
+            params = {'page_size': options['page_size']} if options['page_size'] else {}
+            response = client.get(path, params, headers={'Accept-Encoding': 'identity'})
+            # Serializer output is already JSON types (datetimes are strings),
+            # so the parsed body is what the renderers see in a request.
+            data = json.loads(response.content)
+            drf_ms = median_ms(lambda: JSONRenderer().render(data), iterations)
+            orjson_ms = median_ms(lambda: ORJSONRenderer().render(data), iterations)
+            body = ORJSONRenderer().render(data)
+            gzip_ms = median_ms(lambda: gzip.compress(body, compresslevel=settings.API_GZIP_LEVEL), iterations)
+            line = (
+                f"{path}: render {drf_ms:.3f} ms (DRF) -> {orjson_ms:.3f} ms (orjson), "
+                f"{len(body)} bytes, gzip {len(gzip.compress(body, compresslevel=settings.API_GZIP_LEVEL))} bytes "
+                f"in {gzip_ms:.3f} ms"
+            )
+            if brotli is not None:
+                br_ms = median_ms(lambda: brotli.compress(body, quality=settings.API_BROTLI_QUALITY), iterations)
+                line += f", br {len(brotli.compress(body, quality=settings.API_BROTLI_QUALITY))} bytes in {br_ms:.3f} ms"
+            self.stdout.write(line)
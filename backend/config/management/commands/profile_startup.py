@@ -0,0 +1,37 @@
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.startup import by_package, measure
+
+
+class Command(BaseCommand):
+    help = "Measure worker cold start in fresh interpreters and break it down by import (-X importtime)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Plain runs to take the median of.")
+        parser.add_argument('--limit', type=int, default=25, help="Rows per table.")
+        parser.add_argument('--check', action='store_true',
+                            help="Exit with an error when the median exceeds STARTUP_BUDGET_MS.")
+
+    def handle(self, *args, **options):
+        runs = [measure() for _ in range(max(options['runs'], 1))]
+        median = statistics.median(run.total_ms for run in runs)
+        phases = ', '.join(
+            f"{name} {statistics.median(run.phases[name] for run in runs):.0f}" for name in runs[0].phases
+        )
+        self.stdout.write(f"Cold start: {median:.0f} ms median of {len(runs)} ({phases} ms); "
+                          f"budget {settings.STARTUP_BUDGET_MS:.0f} ms")
+
+        imports = measure(importtime=True).imports
+        limit = options['limit']
+        self.stdout.write("\nSlowest imports (cumulative ms, under -X importtime):")
+        for row in sorted(imports, key=lambda row: row.cumulative_us, reverse=True)[:limit]:
+            self.stdout.write(f"{row.cumulative_us / 1000:9.1f}  {'  ' * row.depth}{row.module}")
+        self.stdout.write("\nSelf time by top-level package (ms):")
+        for package, self_us in by_package(imports)[:limit]:
+            self.stdout.write(f"{self_us / 1000:9.1f}  {package}")
+
+        if options['check'] and median > settings.STARTUP_BUDGET_MS:
+            raise CommandError(f"Cold start {median:.0f} ms exceeds STARTUP_BUDGET_MS ({settings.STARTUP_BUDGET_MS:.0f} ms)")
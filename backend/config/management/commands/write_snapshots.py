@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.snapshots import SNAPSHOTS, clear_snapshots, write_snapshots
+
+
+class Command(BaseCommand):
+    help = "Write the precompressed JSON snapshots of the public feeds that nginx serves."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Snapshots to write (default: all of {', '.join(SNAPSHOTS)}).")
+        parser.add_argument('--clear', action='store_true', help="Delete the snapshots so nginx falls back to Django.")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            clear_snapshots()
+            self.stdout.write("Snapshots removed.")
+            return
+        unknown = set(options['names']) - set(SNAPSHOTS)
+        if unknown:
+            raise CommandError(f"Unknown snapshot(s): {', '.join(sorted(unknown))}")
+        names = options['names'] or list(SNAPSHOTS)
+        written = write_snapshots(names)
+        for name, size in written.items():
+            self.stdout.write(f"{name}: {size} bytes")
+        if len(written) < len(names):
+            raise CommandError(f"{len(names) - len(written)} snapshot(s) failed; see the log.")
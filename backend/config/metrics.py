@@ -0,0 +1,273 @@
+"""
+Per-request performance instrumentation.
+
+``RequestMetricsMiddleware`` measures wall time, database queries and query
+time, render (serialization) time and response size for every request. It
+adds a ``Server-Timing`` header, writes one structured log line to the
+``config.metrics`` logger and feeds per-endpoint rolling windows exposed by
+``config.views.request_metrics``. ``db_stats`` counts connections and
+database errors per alias for ``config.views.database_stats``.
+
+With ``PROFILE_SLOW_REQUESTS_MS`` set, a ``PROFILE_SAMPLE_RATE`` fraction of
+requests runs under cProfile and the profile is dumped to ``PROFILE_DIR`` when
+the request took longer than the threshold.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, InterfaceError, OperationalError, connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointStats:
+    """Rolling window of request durations per endpoint (process local)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = defaultdict(self._window)
+        self._counts = defaultdict(int)
+
+    @staticmethod
+    def _window():
+        return deque(maxlen=settings.REQUEST_METRICS_WINDOW)
+
+    def record(self, endpoint, duration_ms):
+        with self._lock:
+            self._durations[endpoint].append(duration_ms)
+            self._counts[endpoint] += 1
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+
+    def snapshot(self):
+        with self._lock:
+            windows = {endpoint: list(durations) for endpoint, durations in self._durations.items()}
+            counts = dict(self._counts)
+        result = {}
+        for endpoint, durations in sorted(windows.items()):
+            if len(durations) > 1:
+                cuts = statistics.quantiles(durations, n=100, method='inclusive')
+                p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+            else:
+                p50 = p95 = p99 = durations[0]
+            result[endpoint] = {
+                'count': counts[endpoint],
+                'window': len(durations),
+                'p50_ms': round(p50, 2),
+                'p95_ms': round(p95, 2),
+                'p99_ms': round(p99, 2),
+                'max_ms': round(max(durations), 2),
+            }
+        return result
+
+
+endpoint_stats = EndpointStats()
+
+
+class DatabaseStats:
+    """
+    Connection counters per database alias (process local).
+
+    ``connects`` counts Django opening a connection: a new server connection
+    in the "persistent" and "none" modes, a pool checkout in "pool" mode.
+    ``requests`` counts requests that queried the alias and ``errors`` those
+    that failed with a connection-level error. In "pool" mode the psycopg
+    pool's own counters (waits, wait time, timeouts, size) are added under
+    ``pool``.
+    """
+
+    fields = ('connects', 'requests', 'errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: dict.fromkeys(self.fields, 0))
+
+    def record(self, alias, **counts):
+        with self._lock:
+            for field, count in counts.items():
+                self._counts[alias][field] += count
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    def snapshot(self):
+        result = {}
+        for connection in connections.all():
+            with self._lock:
+                stats = {'mode': settings.DB_CONN_MODE, **self._counts[connection.alias]}
+            pool = getattr(connection, 'pool', None)
+            if pool is not None:
+                stats['pool'] = pool.get_stats()
+            result[connection.alias] = stats
+        return result
+
+
+db_stats = DatabaseStats()
+
+
+class QueryTimer:
+    """Counts the queries of one request and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.aliases = set()
+
+
+# The timer of the request being handled. A context variable rather than a
+# per-connection wrapper installed for the request, so queries the async ORM
+# runs in a worker thread (on that thread's connection) are counted too.
+current_timer = ContextVar('query_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.seconds += time.perf_counter() - started
+        timer.count += 1
+        timer.aliases.add(context['connection'].alias)
+
+
+def install_query_timer(connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        # First, so a later execute_wrapper() block pops its own wrapper
+        connection.execute_wrappers.insert(0, time_query)
+
+
+def count_connect(connection, **kwargs):
+    db_stats.record(connection.alias, connects=1)
+
+
+connection_created.connect(install_query_timer)
+connection_created.connect(count_connect)
+
+
+def endpoint_name(request):
+    """``"GET post-list"``: the URL name groups every path of one endpoint."""
+    match = request.resolver_match
+    if match is None:
+        return f"{request.method} unresolved"
+    return f"{request.method} {match.view_name or match.route}"
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        # Connections opened before this module was imported
+        for connection in connections.all():
+            install_query_timer(connection)
+        state = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(state[0])
+        return self.finish(request, response, *state[1:])
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(state[0])
+        return self.finish(request, response, *state[1:])
+
+    def start(self, request):
+        request._render_seconds = 0.0
+        queries = QueryTimer()
+        token = current_timer.set(queries)
+        profiler = self.start_profiler()
+        return token, queries, profiler, time.perf_counter()
+
+    def finish(self, request, response, queries, profiler, started):
+        total = time.perf_counter() - started
+        if profiler:
+            profiler.disable()
+
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries"',
+            f'render;dur={request._render_seconds * 1000:.1f}',
+        ])
+
+        endpoint = endpoint_name(request)
+        endpoint_stats.record(endpoint, total * 1000)
+        for alias in queries.aliases:
+            db_stats.record(alias, requests=1)
+        logger.info(json.dumps({
+            'endpoint': endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(queries.seconds * 1000, 2),
+            'queries': queries.count,
+            'render_ms': round(request._render_seconds * 1000, 2),
+            'bytes': size,
+        }))
+        if profiler and total * 1000 >= settings.PROFILE_SLOW_REQUESTS_MS:
+            self.dump_profile(profiler, endpoint)
+        return response
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, (OperationalError, InterfaceError)):
+            # Failed connects never reach the query timer; charge the default alias
+            db_stats.record(DEFAULT_DB_ALIAS, errors=1)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook; time it with a
+        # post-render callback.
+        render_started = time.perf_counter()
+
+        def record_render_time(rendered):
+            request._render_seconds += time.perf_counter() - render_started
+
+        response.add_post_render_callback(record_render_time)
+        return response
+
+    def start_profiler(self):
+        if not settings.PROFILE_SLOW_REQUESTS_MS or random.random() >= settings.PROFILE_SAMPLE_RATE:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread
+            return None
+        return profiler
+
+    def dump_profile(self, profiler, endpoint):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        slug = ''.join(c if c.isalnum() else '_' for c in endpoint).strip('_')
+        path = os.path.join(settings.PROFILE_DIR, f'{time.strftime("%Y%m%d-%H%M%S")}-{slug}.prof')
+        profiler.dump_stats(path)
+        logger.warning("Slow request profile written to %s", path)
@@ -0,0 +1,220 @@
+"""
+Async-capable middleware, including replacements for sync-only third-party
+and Django middleware.
+
+Under ASGI a single sync-only middleware makes Django run the rest of the
+chain in a worker thread for every request, which would undo the async views
+in ``config/async_views.py``. Django's own ``MiddlewareMixin`` classes are
+async-capable but hand each hook to ``sync_to_async``, so the stack in
+``MIDDLEWARE`` uses the ``InlineHooksMixin`` versions below instead.
+"""
+import gzip
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, common, csrf, security
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    ``WhiteNoiseMiddleware`` that stays on the event loop for anything that is
+    not a static file. Static files are looked up in memory and served exactly
+    as upstream does.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class InlineHooksMixin:
+    """
+    Runs a ``MiddlewareMixin``'s hooks on the event loop under ASGI.
+
+    ``MiddlewareMixin`` runs ``process_request`` and ``process_response`` in a
+    thread through ``sync_to_async``, and Django does the same for a sync
+    ``process_view``: up to three thread hops per middleware and request. The
+    hooks of the middleware below only read headers and cookies and set
+    attributes, so they are called inline. ``needs_thread`` returns true when
+    a hook may do blocking I/O after all (a session save, say); that call
+    still goes to a thread.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode and hasattr(self, 'process_view'):
+            process_view = self.process_view
+
+            async def aprocess_view(request, view_func, view_args, view_kwargs):
+                return process_view(request, view_func, view_args, view_kwargs)
+
+            # Django adapts the instance attribute, and leaves a coroutine as is
+            self.process_view = aprocess_view
+
+    def needs_thread(self, request, response=None):
+        return False
+
+    async def call_hook(self, hook, request, *args):
+        if self.needs_thread(request, *args):
+            return await sync_to_async(hook, thread_sensitive=True)(request, *args)
+        return hook(request, *args)
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, 'process_request'):
+            response = await self.call_hook(self.process_request, request)
+        response = response or await self.get_response(request)
+        if hasattr(self, 'process_response'):
+            response = await self.call_hook(self.process_response, request, response)
+        return response
+
+
+class SecurityMiddleware(InlineHooksMixin, security.SecurityMiddleware):
+    pass
+
+
+class SessionMiddleware(InlineHooksMixin, sessions_middleware.SessionMiddleware):
+    def needs_thread(self, request, response=None):
+        # The session is loaded lazily; only saving it touches the store
+        if response is None:
+            return False
+        session = getattr(request, 'session', None)
+        return session is not None and (session.modified or settings.SESSION_SAVE_EVERY_REQUEST)
+
+
+class CommonMiddleware(InlineHooksMixin, common.CommonMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(InlineHooksMixin, csrf.CsrfViewMiddleware):
+    def needs_thread(self, request, response=None):
+        # With CSRF_USE_SESSIONS the secret is read from and written to the session
+        return settings.CSRF_USE_SESSIONS
+
+
+class AuthenticationMiddleware(InlineHooksMixin, auth_middleware.AuthenticationMiddleware):
+    # request.user is lazy: loaded on first access, by the view
+    pass
+
+
+class MessageMiddleware(InlineHooksMixin, messages_middleware.MessageMiddleware):
+    def needs_thread(self, request, response=None):
+        # Storing messages may load the ones already in the session
+        storage = getattr(request, '_messages', None)
+        return response is not None and storage is not None and (storage.used or storage.added_new)
+
+
+class XFrameOptionsMiddleware(InlineHooksMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
+
+
+def preferred_encoding(accept_encoding, available):
+    """
+    The coding in ``available`` (in order of preference) the client rates
+    highest in its Accept-Encoding header, or ``None`` for identity.
+    """
+    ratings = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            ratings[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in available:
+        q = ratings.get(coding, ratings.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip for API responses, negotiated from Accept-Encoding.
+
+    Django's ``GZipMiddleware`` has no brotli and, as a ``MiddlewareMixin``,
+    runs ``process_response`` in a worker thread under ASGI. Only responses
+    under ``/api/`` of at least ``API_COMPRESS_MIN_BYTES`` are compressed;
+    streaming responses (the praise SSE stream) are left alone. Brotli is used
+    when the optional ``brotli`` package is installed and the client accepts
+    it. As in ``GZipMiddleware``, strong ETags become weak, which the
+    conditional GET handling in ``config/cache.py`` still matches.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.available = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if (
+            not settings.API_COMPRESSION
+            or not request.path_info.startswith('/api/')
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.API_COMPRESS_MIN_BYTES
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = preferred_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.available)
+        if encoding == 'br':
+            content = brotli.compress(response.content, quality=settings.API_BROTLI_QUALITY)
+        elif encoding == 'gzip':
+            content = gzip.compress(response.content, compresslevel=settings.API_GZIP_LEVEL, mtime=0)
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class ModelVersion(models.Model):
+    """Version counter of one model for the API cache (``config.cache``), shared by every worker."""
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f'{self.label}={self.version}'
@@ -0,0 +1,30 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Opaque cursor pagination over ``(-created_at, -id)``.
+
+    The cursor only ever compares against the last seen position, so deep
+    pages cost the same as the first one and rows inserted while a client is
+    paging do not shift the pages it has not fetched yet.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # DRF's own paginate_queryset, in a thread like any async ORM query.
+        # Reimplementing it on the async ORM would mean copying its body and
+        # private helpers, which would drift silently on DRF upgrades.
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+
+class SearchPagination(PageNumberPagination):
+    """Page numbers for ranked results, which have no stable cursor position."""
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
@@ -0,0 +1,41 @@
+"""
+``JSONRenderer`` backed by orjson.
+
+orjson encodes the serializer output several times faster than the standard
+library encoder DRF uses. The output is the same compact, non-ASCII-escaping
+JSON DRF produces: datetimes, decimals and anything else orjson does not
+handle natively go through DRF's own ``JSONEncoder``, and U+2028/U+2029 are
+escaped the same way. Only float exponents are spelled differently (``1e20``
+rather than ``1e+20``), and NaN/Infinity become ``null`` instead of raising.
+Indented output (the browsable API), ASCII-only output and values orjson
+rejects (integers over 64 bits) fall back to DRF's renderer, which is also
+used outright when orjson is not installed.
+"""
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to DRF's json.dumps renderer
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: these are valid JSON but not valid
+        # JavaScript string literals.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -13,12 +13,16 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 import os
 from pathlib import Path
 
-from dotenv import load_dotenv
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv(BASE_DIR / '.env')
+# docker compose passes .env as env_file, and .dockerignore keeps it out of
+# the image. Reading it (python-dotenv, ~40 ms to import) is opt-in:
+# manage.py turns it on for local runs, the wsgi/asgi entry points do not.
+if os.getenv('DJANGO_READ_DOTENV', 'False').lower() in ('1', 'true', 'yes') and (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / '.env')
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -40,6 +44,11 @@ CSRF_TRUSTED_ORIGINS = [
     'https://ymtech.kr',
 ]
 
+# nginx terminates TLS and overwrites X-Forwarded-Proto on every proxied
+# location (nginx/nginx.conf), and the backend is only reachable through it.
+# Trusting it makes absolute URLs, such as the cursor `next` links, https.
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
 
 # Application definition
 
@@ -50,22 +59,28 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
+    'config',
     'posts',
     'announcements',
     'praises',
     'inquiries',
 ]
 
+# Django's middleware through the config.middleware subclasses, whose hooks
+# run on the event loop under ASGI instead of in a thread each
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.metrics.RequestMetricsMiddleware',
+    'config.middleware.SecurityMiddleware',
+    'config.middleware.WhiteNoiseMiddleware',
+    'config.middleware.CompressionMiddleware',
+    'config.middleware.SessionMiddleware',
+    'config.middleware.CommonMiddleware',
+    'config.middleware.CsrfViewMiddleware',
+    'config.middleware.AuthenticationMiddleware',
+    'config.middleware.MessageMiddleware',
+    'config.middleware.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -102,6 +117,76 @@ DATABASES = {
     }
 }
 
+# Connection handling (DB_CONN_MODE):
+#   "persistent"  each worker thread keeps its connection for DB_CONN_MAX_AGE
+#                 seconds and pings it before reuse (the default; WSGI only)
+#   "pool"        per-process psycopg pool; needs psycopg 3 with the pool
+#                 extra and is the mode to use under ASGI
+#   "none"        a new connection for every request
+DB_CONN_MODE = os.getenv("DB_CONN_MODE", "persistent")
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() in ("1", "true", "yes")
+if DB_CONN_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = DB_CONN_HEALTH_CHECKS
+elif DB_CONN_MODE == "pool":
+    from psycopg_pool import ConnectionPool
+
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            # Seconds a request waits for a free connection before erroring
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+            "check": ConnectionPool.check_connection if DB_CONN_HEALTH_CHECKS else None,
+        }
+    }
+
+# DJANGO_DB_ENGINE=sqlite runs against a local file (tests, benchmarks) with
+# no Postgres server
+if os.getenv("DJANGO_DB_ENGINE", "postgresql") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        }
+    }
+
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# The 'api' alias holds the cached list responses (config/cache.py). Their
+# model versions are kept in the database, so a write invalidates them in
+# every worker. FileBasedCache or DatabaseCache (after `createcachetable`)
+# additionally shares the responses themselves between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.getenv('API_CACHE_BACKEND', 'config.cache.LRUCache'),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'api-responses'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', '1000')),
+        },
+    },
+    # Token buckets of config/throttling.py
+    'throttle': {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', 'throttle-buckets'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('THROTTLE_CACHE_MAX_ENTRIES', '10000')),
+        },
+    },
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', '300'))
+
+# Cache-Control max-age for public API responses (lets nginx proxy_cache them)
+API_HTTP_MAX_AGE = int(os.getenv('API_HTTP_MAX_AGE', '5'))
 
 
 # Password validation
@@ -145,6 +230,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Serve MEDIA_URL from Django (config.views.serve_media) outside DEBUG too
+SERVE_MEDIA = os.getenv('DJANGO_SERVE_MEDIA', 'False').lower() in ('1', 'true', 'yes')
+# e.g. '/protected-media/': hand media transfers to an nginx internal location
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -165,9 +254,149 @@ else:
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
 ADMIN_EMAIL = os.getenv('ADMIN_EMAIL') # Recipient
 
+# Notification outbox, drained by `manage.py send_outbox`
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '20'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '6'))
+OUTBOX_BACKOFF_SECONDS = int(os.getenv('OUTBOX_BACKOFF_SECONDS', '30'))
+OUTBOX_MAX_BACKOFF_SECONDS = int(os.getenv('OUTBOX_MAX_BACKOFF_SECONDS', '3600'))
+
+# Rows fetched per round trip by the streaming inquiry export
+INQUIRY_EXPORT_CHUNK_SIZE = int(os.getenv('INQUIRY_EXPORT_CHUNK_SIZE', '2000'))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Brotli/gzip for /api/ responses (config.middleware.CompressionMiddleware)
+API_COMPRESSION = os.getenv('API_COMPRESSION', 'True').lower() in ('1', 'true', 'yes')
+API_COMPRESS_MIN_BYTES = int(os.getenv('API_COMPRESS_MIN_BYTES', '1024'))
+API_GZIP_LEVEL = int(os.getenv('API_GZIP_LEVEL', '6'))
+# Dynamic content: quality 4-5 is close to gzip -9 in size at gzip -6 speed
+API_BROTLI_QUALITY = int(os.getenv('API_BROTLI_QUALITY', '5'))
+
+# GET list/retrieve of the read-heavy viewsets as native async views
+# (config/async_views.py). config/asgi.py turns this on; under WSGI each async
+# view would only pay for an event loop per request.
+API_ASYNC_VIEWS = os.getenv('DJANGO_ASYNC_VIEWS', 'False').lower() in ('1', 'true', 'yes')
+
+# Live praise wall over SSE (praises/stream.py)
+SSE_KEEPALIVE_SECONDS = float(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+# Connections are closed after this long so clients rebalance across workers
+SSE_MAX_SECONDS = float(os.getenv('SSE_MAX_SECONDS', '600'))
+SSE_RETRY_MS = int(os.getenv('SSE_RETRY_MS', '3000'))
+# Reconnect interval when served by WSGI workers, which do not hold streams
+SSE_FALLBACK_RETRY_MS = int(os.getenv('SSE_FALLBACK_RETRY_MS', '15000'))
+SSE_REPLAY_LIMIT = int(os.getenv('SSE_REPLAY_LIMIT', '100'))
+# A reconnect replays from this long before its cursor, so praises whose
+# insert committed after a newer one was sent are not lost; keep it above the
+# longest praise insert transaction (PRAISE_BATCH_WINDOW_MS included)
+SSE_REPLAY_OVERLAP_SECONDS = float(os.getenv('SSE_REPLAY_OVERLAP_SECONDS', '10'))
+SSE_QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', '100'))
+
+# Token buckets for anonymous writes (config/throttling.py):
+# "<rate>/<period>[:<burst>]", per client IP and, with _global, for everyone
+API_THROTTLE_RATES = {
+    'praise': os.getenv('THROTTLE_PRAISE', '10/min:20'),
+    'praise_global': os.getenv('THROTTLE_PRAISE_GLOBAL', '600/min:300'),
+    'inquiry': os.getenv('THROTTLE_INQUIRY', '5/hour:5'),
+    'inquiry_global': os.getenv('THROTTLE_INQUIRY_GLOBAL', '120/min:60'),
+}
+# Only safe behind nginx, which sets X-Real-IP to the peer address
+THROTTLE_TRUST_X_REAL_IP = os.getenv('THROTTLE_TRUST_X_REAL_IP', 'True').lower() in ('1', 'true', 'yes')
+
+# Coalesce concurrent praise creates into one bulk INSERT (config/batching.py).
+# Requests wait up to PRAISE_BATCH_WINDOW_MS for others to join the batch.
+PRAISE_BATCH_WRITES = os.getenv('PRAISE_BATCH_WRITES', 'False').lower() in ('1', 'true', 'yes')
+PRAISE_BATCH_SIZE = int(os.getenv('PRAISE_BATCH_SIZE', '50'))
+PRAISE_BATCH_WINDOW_MS = float(os.getenv('PRAISE_BATCH_WINDOW_MS', '20'))
+
+# Monthly partitions of praises on PostgreSQL (praises/partitions.py), kept by
+# manage.py praise_partitions: this many future months exist at all times
+PRAISE_PARTITIONS_AHEAD = int(os.getenv('PRAISE_PARTITIONS_AHEAD', '3'))
+# Months older than this are archived and dropped; 0 keeps everything
+PRAISE_RETENTION_MONTHS = int(os.getenv('PRAISE_RETENTION_MONTHS', '0'))
+PRAISE_ARCHIVE_DIR = os.getenv('PRAISE_ARCHIVE_DIR', str(BASE_DIR / 'archive' / 'praises'))
+
+# Announcements included in the /api/home/ bundle (config/home.py)
+HOME_ANNOUNCEMENT_LIMIT = int(os.getenv('HOME_ANNOUNCEMENT_LIMIT', '20'))
+
+# Admin changelists (config/admin.py): above this many rows the PostgreSQL
+# planner estimate is shown instead of an exact COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', '10000'))
+# Pages starting this many rows in are read with a keyset seek, not OFFSET
+ADMIN_KEYSET_MIN_OFFSET = int(os.getenv('ADMIN_KEYSET_MIN_OFFSET', '1000'))
+
+# Precompressed JSON of the public feeds, served by nginx (config/snapshots.py)
+SNAPSHOTS_ENABLED = os.getenv('SNAPSHOTS_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+SNAPSHOT_ROOT = os.getenv('SNAPSHOT_ROOT', str(MEDIA_ROOT / 'snapshots'))
+# Host and scheme the snapshot requests are built with (absolute URLs in the JSON)
+SNAPSHOT_HOST = os.getenv('SNAPSHOT_HOST', 'ymtech.kr')
+SNAPSHOT_SECURE = os.getenv('SNAPSHOT_SECURE', 'True').lower() in ('1', 'true', 'yes')
+# Wait this long after a change so a burst of writes regenerates once; 0 = inline
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv('SNAPSHOT_DEBOUNCE_SECONDS', '2'))
+# Hosts each gunicorn worker primes the API cache for (config/warmup.py), over
+# https as nginx forwards them (see SECURE_PROXY_SSL_HEADER)
+WARMUP_HOSTS = [host for host in os.getenv('WARMUP_HOSTS', 'ymtech.kr,www.ymtech.kr').split(',') if host]
+
+# Cursor pagination for the public list endpoints (see config/pagination.py)
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '20'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))
+
+# Post.image pipeline (posts/images.py)
+POST_IMAGE_MAX_EDGE = int(os.getenv('POST_IMAGE_MAX_EDGE', '2048'))
+POST_IMAGE_WIDTHS = [int(w) for w in os.getenv('POST_IMAGE_WIDTHS', '320,640,1280').split(',')]
+POST_IMAGE_QUALITY = int(os.getenv('POST_IMAGE_QUALITY', '80'))
+
+# Post.video processing (posts/videos.py)
+POST_VIDEO_POSTER_AT = float(os.getenv('POST_VIDEO_POSTER_AT', '1.0'))
+POST_VIDEO_TIMEOUT = int(os.getenv('POST_VIDEO_TIMEOUT', '600'))
+# A media worker's claim on a post older than this is taken over by another
+# (the worker died mid-way); keep it above the longest pipeline run
+POST_MEDIA_CLAIM_TIMEOUT = int(os.getenv('POST_MEDIA_CLAIM_TIMEOUT', '3600'))
+
+# Resumable chunked uploads for post media (posts/uploads.py). Keep
+# POST_UPLOAD_DIR on the media volume so uploads survive backend restarts.
+POST_UPLOAD_DIR = os.getenv('POST_UPLOAD_DIR', str(MEDIA_ROOT / 'uploads'))
+POST_UPLOAD_MAX_BYTES = int(os.getenv('POST_UPLOAD_MAX_BYTES', str(200 * 1024 * 1024)))
+# Largest PATCH body; must fit nginx's client_max_body_size
+POST_UPLOAD_CHUNK_MAX_BYTES = int(os.getenv('POST_UPLOAD_CHUNK_MAX_BYTES', str(8 * 1024 * 1024)))
+# Unfinished uploads untouched this long are removed by gc_media
+POST_UPLOAD_EXPIRE_HOURS = float(os.getenv('POST_UPLOAD_EXPIRE_HOURS', '24'))
+
+# Length of post content returned by the feed in preview mode (?preview=1)
+POST_PREVIEW_LENGTH = int(os.getenv('POST_PREVIEW_LENGTH', '200'))
+
+# Request instrumentation (config/metrics.py)
+REQUEST_METRICS_WINDOW = int(os.getenv('REQUEST_METRICS_WINDOW', '1000'))
+# Profile a PROFILE_SAMPLE_RATE fraction of requests; keep the cProfile dump
+# when one takes at least PROFILE_SLOW_REQUESTS_MS (0 disables the sampler)
+PROFILE_SLOW_REQUESTS_MS = float(os.getenv('PROFILE_SLOW_REQUESTS_MS', '0'))
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0.05'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+# Cold start of a worker (settings, django.setup, middleware, URLconf) that
+# manage.py profile_startup --check and the startup test allow (config/startup.py)
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', '1500'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'config.metrics': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
 }
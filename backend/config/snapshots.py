@@ -0,0 +1,181 @@
+"""
+Precompressed JSON snapshots of the public feeds for nginx to serve.
+
+Each snapshot is the exact body of a public GET endpoint without query
+parameters (``/api/praises/`` and so on), rendered through the real view and
+written to ``SNAPSHOT_ROOT`` next to ``.gz`` (and, with the optional
+``brotli`` package, ``.br``) variants. Every file is written to a temporary
+name and renamed into place, so readers never see a partial file. nginx
+answers parameterless GETs from these files with ``gzip_static`` and passes
+everything else, including misses, to Django.
+
+Snapshots are rewritten after commit whenever ``config.cache.bump_version``
+runs for a model they are built from, debounced by
+``SNAPSHOT_DEBOUNCE_SECONDS`` so a burst of writes costs one regeneration.
+Regenerations still pending when the process exits (a worker recycled by
+``max_requests`` or shut down) are written by ``flush_pending``, which runs
+from gunicorn's ``worker_exit`` hook and, for other processes, ``atexit``.
+``manage.py write_snapshots`` rebuilds them on demand, and
+``--clear`` removes them. Clear them before turning ``SNAPSHOTS_ENABLED`` off;
+stale files would otherwise keep being served.
+"""
+import asyncio
+import atexit
+import gzip
+import logging
+import os
+import tempfile
+import threading
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connections, transaction
+from django.urls import resolve
+
+try:
+    import brotli
+except ImportError:  # optional: .br variants are skipped without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# file name -> (path, models it is built from)
+SNAPSHOTS = {
+    'announcements.json': ('/api/announcements/', {'announcements.Announcement'}),
+    'praises.json': ('/api/praises/', {'praises.Praise'}),
+    'posts.json': ('/api/posts/', {'posts.Post'}),
+    'home.json': ('/api/home/', {'announcements.Announcement', 'praises.Praise', 'posts.Post'}),
+}
+
+_lock = threading.Lock()
+_pending = set()
+_timer = None
+
+
+def render(path, host=None, secure=None):
+    """
+    The JSON body ``GET path`` returns to a client of the public site, by
+    default as requested from ``SNAPSHOT_HOST`` over ``SNAPSHOT_SECURE``.
+    """
+    # django.test is heavy, and config.cache imports this module in every worker
+    from django.test import RequestFactory
+
+    request = RequestFactory().get(
+        path, HTTP_HOST=host or settings.SNAPSHOT_HOST, HTTP_ACCEPT='application/json',
+        secure=settings.SNAPSHOT_SECURE if secure is None else secure,
+    )
+    match = resolve(path)
+    view = match.func
+    if asyncio.iscoroutinefunction(view):
+        # API_ASYNC_VIEWS wraps the read viewsets in coroutine views.
+        view = async_to_sync(view)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        raise RuntimeError(f'GET {path} returned {response.status_code}')
+    return response.content
+
+
+def write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_snapshot(name):
+    path, _ = SNAPSHOTS[name]
+    body = render(path)
+    target = os.path.join(settings.SNAPSHOT_ROOT, name)
+    os.makedirs(settings.SNAPSHOT_ROOT, exist_ok=True)
+    # Compressed variants first: nginx prefers them, so the moment the plain
+    # file changes every variant already matches it.
+    write_atomic(target + '.gz', gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_atomic(target + '.br', brotli.compress(body, quality=11))
+    write_atomic(target, body)
+    return len(body)
+
+
+def write_snapshots(names=None):
+    written = {}
+    for name in names or SNAPSHOTS:
+        try:
+            written[name] = write_snapshot(name)
+        except Exception:
+            logger.exception("Could not write snapshot %s", name)
+    return written
+
+
+def clear_snapshots():
+    for name in SNAPSHOTS:
+        for suffix in ('', '.gz', '.br'):
+            try:
+                os.unlink(os.path.join(settings.SNAPSHOT_ROOT, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def _flush():
+    global _timer
+    with _lock:
+        names, _timer = set(_pending), None
+        _pending.clear()
+    if names:
+        write_snapshots(names)
+
+
+def _flush_in_thread():
+    try:
+        _flush()
+    finally:
+        # The timer thread's connections would otherwise stay open until the
+        # server times them out; a new thread is started for every burst.
+        connections.close_all()
+
+
+def flush_pending():
+    """Write the debounced regenerations now instead of waiting for the timer."""
+    with _lock:
+        timer = _timer
+    if timer is not None:
+        timer.cancel()
+        if timer is not threading.current_thread():
+            # Already firing: let it finish writing rather than racing it
+            timer.join()
+    _flush()
+
+
+atexit.register(flush_pending)
+
+
+def _schedule(names):
+    global _timer
+    with _lock:
+        _pending.update(names)
+        if _timer is not None:
+            return
+        if settings.SNAPSHOT_DEBOUNCE_SECONDS <= 0:
+            run_now = True
+        else:
+            run_now = False
+            _timer = threading.Timer(settings.SNAPSHOT_DEBOUNCE_SECONDS, _flush_in_thread)
+            _timer.daemon = True
+            _timer.start()
+    if run_now:
+        _flush()
+
+
+def model_changed(label):
+    """Regenerate the snapshots built from ``label`` once the change commits."""
+    if not settings.SNAPSHOTS_ENABLED:
+        return
+    names = {name for name, (_, labels) in SNAPSHOTS.items() if label in labels}
+    if names:
+        transaction.on_commit(lambda: _schedule(names))
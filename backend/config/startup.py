@@ -0,0 +1,88 @@
+"""
+Cold-start measurement: what a fresh worker pays before its first request.
+
+``measure`` starts a new interpreter with the current environment, minus
+the local .env (``DJANGO_READ_DOTENV``, off under gunicorn as well). It times
+the same steps as ``config.wsgi`` followed by the first URL resolve: importing
+the settings, ``django.setup()`` (app registry, models, ``ready()`` hooks,
+admin autodiscovery), building the middleware chain, and loading the URLconf.
+With ``importtime=True`` the child runs under ``-X importtime``, and its
+report is parsed into ``ImportTime`` rows. That run is slower, so its phase
+times are not comparable with a plain run.
+
+Used by ``manage.py profile_startup`` and the startup budget test
+(``STARTUP_BUDGET_MS``).
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in the child; prints {"phases": {name: ms}, "total_ms": ms}
+SCRIPT = '''
+import json, os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+start = last = time.perf_counter()
+phases = {}
+
+def mark(name):
+    global last
+    now = time.perf_counter()
+    phases[name] = (now - last) * 1000
+    last = now
+
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+mark('settings')
+django.setup(set_prefix=False)
+mark('django.setup')
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+mark('middleware')
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark('urlconf')
+sys.stdout.write(json.dumps({'phases': phases, 'total_ms': (time.perf_counter() - start) * 1000}))
+'''
+
+Startup = namedtuple('Startup', 'total_ms phases imports')
+# Microseconds, as reported by -X importtime; depth 0 is a top-level import
+ImportTime = namedtuple('ImportTime', 'module self_us cumulative_us depth')
+
+
+def parse_importtime(report):
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    env = {**os.environ, 'DJANGO_READ_DOTENV': 'False'}
+    result = subprocess.run(command + ['-c', SCRIPT], cwd=BASE_DIR, env=env, capture_output=True, text=True, check=False)
+    if result.returncode:
+        raise RuntimeError(f'Startup failed:\n{result.stderr}')
+    data = json.loads(result.stdout)
+    imports = parse_importtime(result.stderr) if importtime else []
+    return Startup(data['total_ms'], data['phases'], imports)
+
+
+def by_package(imports):
+    """Self time per top-level package, in microseconds, slowest first."""
+    totals = {}
+    for row in imports:
+        package = row.module.split('.')[0]
+        totals[package] = totals.get(package, 0) + row.self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,757 @@
+import datetime
+import decimal
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import threading
+from unittest import mock
+
+from asgiref.sync import SyncToAsync, iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import OperationalError, connection, connections
+from django.db.models import F, QuerySet
+from django.http import Http404, HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from rest_framework.renderers import JSONRenderer
+
+from announcements.models import Announcement
+from config.admin import LargeTablePaginator
+from config.batching import BulkCreateBatcher, bulk_created
+from config.cache import LRUCache, get_cache, get_versions, stats
+from config.home import HomeView
+from config.metrics import RequestMetricsMiddleware, db_stats, endpoint_stats
+from config.middleware import WhiteNoiseMiddleware, preferred_encoding
+from config.models import ModelVersion
+from config.renderers import ORJSONRenderer
+from config.snapshots import SNAPSHOTS, flush_pending, write_snapshots
+from config.startup import measure, parse_importtime
+from config.throttling import THROTTLE_CACHE_ALIAS, parse_rate
+from config.views import serve_media
+from config.warmup import warm
+from inquiries.models import Inquiry
+from posts.models import Post
+from posts.views import PostViewSet
+from praises.models import Praise
+from praises.views import PraiseViewSet
+
+
+class ListQueryPlanTests(TestCase):
+    """
+    The public lists must be served straight off the (created_at, id) indexes.
+
+    The planner would happily sequential-scan tables this small, so on
+    Postgres seq scans and sorts are priced out for the duration of the test;
+    if one still shows up, no usable index exists.
+    """
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+        return queryset.explain()
+
+    def assertIndexOrdered(self, queryset):
+        plan = self.explain(queryset)
+        if connection.vendor == 'postgresql':
+            self.assertNotIn('Seq Scan', plan)
+            self.assertIsNone(re.search(r'^\s*(->\s*)?(Incremental )?Sort\b', plan, re.M), plan)
+        elif connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+            self.assertIsNone(re.search(r'\bSCAN \w+$', plan, re.M), plan)
+        return plan
+
+    def test_post_list(self):
+        self.assertIndexOrdered(Post.objects.order_by('-created_at', '-id')[:21])
+
+    def test_visible_post_list(self):
+        plan = self.assertIndexOrdered(
+            Post.objects.filter(is_blocked=False).order_by('-created_at', '-id')[:21]
+        )
+        self.assertIn('post_visible_created_id_idx', plan)
+
+    def test_praise_list(self):
+        self.assertIndexOrdered(Praise.objects.all()[:21])
+
+    def test_praise_list_after_cursor(self):
+        praise = Praise.objects.create(message='cursor')
+        self.assertIndexOrdered(Praise.objects.filter(created_at__lt=praise.created_at)[:21])
+
+    def test_announcement_list(self):
+        self.assertIndexOrdered(Announcement.objects.order_by('-created_at', '-id'))
+
+    def test_inquiry_list(self):
+        self.assertIndexOrdered(Inquiry.objects.order_by('-created_at', '-id')[:21])
+
+
+class CachedListTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        stats.reset()
+
+    def test_repeat_request_is_served_from_cache(self):
+        Announcement.objects.create(content='first')
+        self.client.get('/api/announcements/')
+        # Only the shared model version is read
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/announcements/')
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(stats.snapshot()['hits'], 1)
+        self.assertEqual(stats.snapshot()['misses'], 1)
+
+    def test_save_and_delete_invalidate(self):
+        announcement = Announcement.objects.create(content='first')
+        self.client.get('/api/announcements/')
+        Announcement.objects.create(content='second')
+        self.assertEqual(len(self.client.get('/api/announcements/').json()), 2)
+        announcement.delete()
+        self.assertEqual(len(self.client.get('/api/announcements/').json()), 1)
+        self.assertEqual(stats.snapshot()['hits'], 0)
+
+    def test_bump_from_another_worker_invalidates(self):
+        Praise.objects.create(message='first')
+        self.client.get('/api/praises/')
+        # Another process: new row and version bump, nothing in this process's memory
+        Praise.objects.bulk_create([Praise(message='second')])
+        ModelVersion.objects.filter(label='praises.Praise').update(version=F('version') + 1)
+        messages = [row['message'] for row in self.client.get('/api/praises/').json()['results']]
+        self.assertEqual(messages, ['second', 'first'])
+
+    def test_deeper_pages_are_not_cached(self):
+        Praise.objects.bulk_create(Praise(message=str(i)) for i in range(5))
+        next_url = self.client.get('/api/praises/?page_size=2').json()['next']
+        self.client.get(next_url)
+        self.client.get(next_url)
+        self.assertEqual(stats.snapshot()['misses'], 1)
+
+    def test_lru_evictions_are_counted(self):
+        cache = LRUCache('test-lru', {'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2}})
+        for i in range(3):
+            cache.set(f'key{i}', i)
+        self.assertEqual(stats.snapshot()['evictions'], 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.post = Post.objects.create(title='post', content='content')
+
+    def test_list_etag_round_trip(self):
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age', response['Cache-Control'])
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_if_modified_since(self):
+        response = self.client.get(f'/api/posts/{self.post.id}/')
+        response = self.client.get(
+            f'/api/posts/{self.post.id}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_invalidates_etag(self):
+        etag = self.client.get('/api/posts/')['ETag']
+        self.post.is_blocked = True
+        self.post.save()
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_change_in_another_worker_invalidates_validators(self):
+        response = self.client.get('/api/posts/')
+        # Change recorded by another process (update() sends no signal)
+        Post.objects.filter(pk=self.post.pk).update(title='renamed')
+        ModelVersion.objects.filter(label='posts.Post').update(version=F('version') + 1)
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['title'], 'renamed')
+
+    def test_etag_varies_with_query(self):
+        self.assertNotEqual(
+            self.client.get('/api/posts/')['ETag'],
+            self.client.get('/api/posts/?fields=id')['ETag'],
+        )
+
+    def test_inquiries_are_not_publicly_cacheable(self):
+        response = self.client.get('/api/inquiries/')
+        self.assertIn('private', response['Cache-Control'])
+
+
+class ServeMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        with open(os.path.join(self.media_root, 'clip.mp4'), 'wb') as f:
+            f.write(bytes(range(256)) * 4)
+
+    def get(self, **headers):
+        request = RequestFactory().get('/media/clip.mp4', headers=headers)
+        with self.settings(MEDIA_ROOT=self.media_root, MEDIA_ACCEL_REDIRECT=''):
+            response = serve_media(request, 'clip.mp4')
+            return response, b''.join(response.streaming_content) if response.streaming else b''
+
+    def test_full_file(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(len(body), 1024)
+
+    def test_byte_range(self):
+        response, body = self.get(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(body, bytes(range(10, 20)))
+
+    def test_open_ended_and_suffix_ranges(self):
+        response, body = self.get(Range='bytes=1000-')
+        self.assertEqual(response['Content-Range'], 'bytes 1000-1023/1024')
+        self.assertEqual(len(body), 24)
+        response, body = self.get(Range='bytes=-4')
+        self.assertEqual(body, bytes(range(252, 256)))
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(Range='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_path_traversal_is_rejected(self):
+        request = RequestFactory().get('/media/../settings.py')
+        with self.settings(MEDIA_ROOT=self.media_root), self.assertRaises(Http404):
+            serve_media(request, '../settings.py')
+
+    def test_accel_redirect(self):
+        request = RequestFactory().get('/media/clip.mp4')
+        with self.settings(MEDIA_ROOT=self.media_root, MEDIA_ACCEL_REDIRECT='/protected-media/'):
+            response = serve_media(request, 'clip.mp4')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/clip.mp4')
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        endpoint_stats.reset()
+
+    def test_server_timing_and_log_line(self):
+        Praise.objects.create(message='hello')
+        with self.assertLogs('config.metrics', 'INFO') as logs:
+            response = self.client.get('/api/praises/')
+        self.assertRegex(response['Server-Timing'], r'total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+')
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['endpoint'], 'GET praise-list')
+        self.assertEqual(line['bytes'], len(response.content))
+        self.assertGreater(line['queries'], 0)
+
+    def test_rolling_percentiles(self):
+        with self.assertLogs('config.metrics', 'INFO'):
+            for _ in range(3):
+                self.client.get('/api/announcements/')
+        stats = endpoint_stats.snapshot()['GET announcement-list']
+        self.assertEqual(stats['count'], 3)
+        self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+
+    def test_metrics_endpoint_is_staff_only(self):
+        with self.assertLogs('config.metrics', 'INFO'):
+            response = self.client.get('/api/internal/metrics/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_database_stats(self):
+        db_stats.reset()
+        with self.assertLogs('config.metrics', 'INFO'):
+            self.client.get('/api/inquiries/')
+            RequestMetricsMiddleware(lambda request: None).process_exception(None, OperationalError())
+            self.client.force_login(User.objects.create_user('staff', is_staff=True))
+            response = self.client.get('/api/internal/db-stats/')
+        stats = response.json()['default']
+        self.assertEqual(stats['mode'], 'persistent')
+        # Only the inquiry list; the stats request is counted after it responds
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['errors'], 1)
+
+    def test_slow_request_profile_is_dumped(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        with self.settings(PROFILE_SLOW_REQUESTS_MS=0.001, PROFILE_SAMPLE_RATE=1.0, PROFILE_DIR=profile_dir):
+            with self.assertLogs('config.metrics', 'INFO'):
+                self.client.get('/api/announcements/')
+        self.assertEqual(len(os.listdir(profile_dir)), 1)
+
+
+class AsyncViewTests(TestCase):
+    """The async list/retrieve handlers must answer exactly like the DRF views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Praise.objects.bulk_create(Praise(message=f'praise {i}') for i in range(25))
+        cls.post = Post.objects.create(title='visible', content='x' * 300)
+        Post.objects.create(title='blocked', content='x', is_blocked=True)
+
+    def setUp(self):
+        get_cache().clear()
+        self.factory = AsyncRequestFactory()
+
+    def views(self, viewset, actions):
+        sync_view = viewset.as_view(actions)
+        with self.settings(API_ASYNC_VIEWS=True):
+            async_view = viewset.as_view(actions)
+        self.assertFalse(iscoroutinefunction(sync_view))
+        self.assertTrue(iscoroutinefunction(async_view))
+        return sync_view, async_view
+
+    async def assertSameResponse(self, viewset, actions, path, **kwargs):
+        sync_view, async_view = self.views(viewset, actions)
+        expected = await sync_to_async(sync_view)(self.factory.get(path), **kwargs)
+        expected.render()
+        get_cache().clear()
+        response = await async_view(self.factory.get(path), **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        return response
+
+    async def test_list_pages(self):
+        response = await self.assertSameResponse(PraiseViewSet, {'get': 'list'}, '/api/praises/')
+        next_url = json.loads(response.content)['next']
+        await self.assertSameResponse(PraiseViewSet, {'get': 'list'}, next_url)
+
+    async def test_feed_options(self):
+        await self.assertSameResponse(PostViewSet, {'get': 'list'}, '/api/posts/?fields=id,title,content&preview=1')
+        response = await self.assertSameResponse(PostViewSet, {'get': 'list'}, '/api/posts/?fields=nope')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_retrieve(self):
+        await self.assertSameResponse(PostViewSet, {'get': 'retrieve'}, '/api/posts/', pk=self.post.pk)
+        response = await self.assertSameResponse(PostViewSet, {'get': 'retrieve'}, '/api/posts/', pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_conditional_get(self):
+        _, view = self.views(PraiseViewSet, {'get': 'list'})
+        response = await view(self.factory.get('/api/praises/'))
+        response = await view(self.factory.get('/api/praises/', headers={'If-None-Match': response['ETag']}))
+        self.assertEqual(response.status_code, 304)
+
+    async def test_database_cache_backend(self):
+        # The sync-only DatabaseCache that shares the API cache between workers
+        api_cache = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'api_cache'}
+        with self.settings(CACHES={**settings.CACHES, 'api': api_cache}):
+            await sync_to_async(call_command)('createcachetable', verbosity=0)
+            _, view = self.views(PraiseViewSet, {'get': 'list'})
+            first = await view(self.factory.get('/api/praises/'))
+            second = await view(self.factory.get('/api/praises/', headers={'If-None-Match': first['ETag']}))
+            cached = await view(self.factory.get('/api/praises/'))
+        self.assertEqual((first.status_code, second.status_code, cached.status_code), (200, 304, 200))
+        self.assertEqual(json.loads(cached.content), json.loads(first.content))
+
+    async def test_writes_and_browsable_api_use_drf_view(self):
+        _, view = self.views(PraiseViewSet, {'get': 'list', 'post': 'create'})
+        response = await view(self.factory.post('/api/praises/', {'message': 'async'}, content_type='application/json'))
+        self.assertEqual(response.status_code, 201)
+        response = await view(self.factory.get('/api/praises/', headers={'Accept': 'text/html'}))
+        response.render()
+        self.assertContains(response, 'async')
+
+    async def test_request_thread_hops_are_bounded(self):
+        with self.settings(API_ASYNC_VIEWS=True):
+            class urls:
+                urlpatterns = [path('api/praises/', PraiseViewSet.as_view({'get': 'list'}))]
+
+        hops = []
+        real_call = SyncToAsync.__call__
+
+        def counting_call(self, *args, **kwargs):
+            hops.append(self.func)
+            return real_call(self, *args, **kwargs)
+
+        with self.settings(ROOT_URLCONF=urls), mock.patch.object(SyncToAsync, '__call__', counting_call):
+            with self.assertLogs('config.metrics', 'INFO'):
+                response = await self.async_client.get('/api/praises/')
+        self.assertEqual(response.status_code, 200)
+        # Through the whole MIDDLEWARE stack, none of which may hop on its own
+        self.assertEqual([func for func in hops if 'middleware' in getattr(func, '__module__', '')], [])
+        # Django's request_started/finished receivers, the versions, the cache
+        # lookup, the page and the cache store
+        self.assertLessEqual(len(hops), 6, hops)
+
+    async def test_metrics_middleware_counts_async_queries(self):
+        async def view(request):
+            await Praise.objects.acount()
+            return HttpResponse('ok')
+
+        middleware = RequestMetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with self.assertLogs('config.metrics', 'INFO'):
+            response = await middleware(self.factory.get('/api/praises/'))
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+    async def test_whitenoise_stays_async(self):
+        async def view(request):
+            return HttpResponse('ok')
+
+        middleware = WhiteNoiseMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(self.factory.get('/api/praises/'))
+        self.assertEqual(response.content, b'ok')
+
+
+class ThrottleTests(TestCase):
+    def setUp(self):
+        caches[THROTTLE_CACHE_ALIAS].clear()
+
+    def post(self, ip):
+        return self.client.post('/api/praises/', {'message': 'hi'}, headers={'X-Real-IP': ip})
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('6/min'), (0.1, 6))
+        self.assertEqual(parse_rate('1/s:5'), (1.0, 5))
+
+    def test_per_client_bucket(self):
+        with self.settings(API_THROTTLE_RATES={'praise': '2/min'}):
+            self.assertEqual(self.post('10.0.0.1').status_code, 201)
+            self.assertEqual(self.post('10.0.0.1').status_code, 201)
+            response = self.post('10.0.0.1')
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '30')
+            self.assertEqual(self.post('10.0.0.2').status_code, 201)
+            # Reads are never throttled
+            self.assertEqual(self.client.get('/api/praises/', headers={'X-Real-IP': '10.0.0.1'}).status_code, 200)
+
+    def test_bucket_refills(self):
+        with self.settings(API_THROTTLE_RATES={'praise': '1/s'}), mock.patch('config.throttling.time.time') as now:
+            now.return_value = 1000.0
+            self.assertEqual(self.post('10.0.0.1').status_code, 201)
+            self.assertEqual(self.post('10.0.0.1').status_code, 429)
+            now.return_value = 1001.0
+            self.assertEqual(self.post('10.0.0.1').status_code, 201)
+
+    def test_global_bucket(self):
+        with self.settings(API_THROTTLE_RATES={'inquiry_global': '1/min'}):
+            payload = {'name': 'a', 'company': 'b', 'phone': '010', 'email': 'a@example.com', 'message': 'm'}
+            self.assertEqual(self.client.post('/api/inquiries/', payload, headers={'X-Real-IP': '10.0.0.1'}).status_code, 201)
+            self.assertEqual(self.client.post('/api/inquiries/', payload, headers={'X-Real-IP': '10.0.0.2'}).status_code, 429)
+
+    def test_rejected_requests_do_not_drain_global_bucket(self):
+        with self.settings(API_THROTTLE_RATES={'praise': '1/min:1', 'praise_global': '5/min:5'}):
+            statuses = [self.post('10.0.0.1').status_code for _ in range(6)]
+            self.assertEqual(statuses, [201] + [429] * 5)
+            # The abuser's rejected requests took nothing from everyone's bucket
+            self.assertEqual([self.post(f'10.0.1.{i}').status_code for i in range(4)], [201] * 4)
+            self.assertEqual(self.post('10.0.1.9').status_code, 429)
+
+
+class BatchedCreateTests(TransactionTestCase):
+    def test_concurrent_creates_share_one_insert(self):
+        batcher = BulkCreateBatcher(Praise, size=5, window=5)
+        signalled = []
+        results = []
+
+        def record(sender, instances, **kwargs):
+            signalled.append([praise.pk for praise in instances])
+
+        def submit(i):
+            try:
+                results.append(batcher.submit(Praise(message=f'batched {i}')))
+            finally:
+                connections.close_all()
+
+        bulk_created.connect(record, sender=Praise)
+        self.addCleanup(bulk_created.disconnect, record, sender=Praise)
+        with mock.patch('praises.signals.bump_version') as bump, mock.patch('praises.signals.announce') as announce:
+            with mock.patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=QuerySet.bulk_create) as bulk_create:
+                threads = [threading.Thread(target=submit, args=(i,)) for i in range(5)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        # The batch filled up, so nobody waited out the 5 second window
+        bulk_create.assert_called_once()
+        self.assertEqual(len({praise.pk for praise in results}), 5)
+        self.assertEqual(len(signalled), 1)
+        self.assertCountEqual(signalled[0], [praise.pk for praise in results])
+        self.assertEqual(Praise.objects.count(), 5)
+        # One version bump and one announcement for the whole batch
+        bump.assert_called_once_with('praises.Praise')
+        announce.assert_called_once()
+        self.assertCountEqual([data['id'] for data in announce.call_args.args[0]], [praise.pk for praise in results])
+
+    def test_endpoint_returns_created_row(self):
+        with mock.patch('praises.views.PraiseViewSet.batch_create', True):
+            response = self.client.post('/api/praises/', {'message': 'solo'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Praise.objects.get(pk=response.json()['id']).message, 'solo')
+
+
+class HomeBundleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Announcement.objects.create(content='notice')
+        Praise.objects.bulk_create(Praise(message=f'praise {i}') for i in range(25))
+        cls.post = Post.objects.create(title='visible', content='x')
+        Post.objects.create(title='blocked', content='x', is_blocked=True)
+        # bulk_create sends no signal, so seed the praise version here
+        get_versions(list(HomeView.cache_models))
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_bundle_matches_list_endpoints(self):
+        # The model versions, then one query per list
+        with self.assertNumQueries(4):
+            bundle = self.client.get('/api/home/').json()
+        self.assertEqual(bundle['announcements'], self.client.get('/api/announcements/').json())
+        self.assertEqual(bundle['posts']['results'], self.client.get('/api/posts/').json()['results'])
+        praises = self.client.get('/api/praises/').json()
+        self.assertEqual(bundle['praises']['results'], praises['results'])
+        # Paging continues on the praise endpoint itself
+        self.assertEqual(bundle['praises']['next'], praises['next'])
+
+    def test_cached_and_conditional(self):
+        response = self.client.get('/api/home/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/home/')
+            not_modified = self.client.get('/api/home/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_change_in_another_worker_invalidates(self):
+        etag = self.client.get('/api/home/')['ETag']
+        Praise.objects.bulk_create([Praise(message='elsewhere')])
+        ModelVersion.objects.filter(label='praises.Praise').update(version=F('version') + 1)
+        response = self.client.get('/api/home/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['praises']['results'][0]['message'], 'elsewhere')
+
+    def test_any_model_change_invalidates(self):
+        for create in (
+            lambda: Announcement.objects.create(content='new'),
+            lambda: Praise.objects.create(message='new'),
+            lambda: Post.objects.create(title='new', content='x'),
+        ):
+            etag = self.client.get('/api/home/')['ETag']
+            create()
+            response = self.client.get('/api/home/', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = self.settings(
+            SNAPSHOTS_ENABLED=True, SNAPSHOT_ROOT=self.root, SNAPSHOT_DEBOUNCE_SECONDS=0,
+            SNAPSHOT_HOST='testserver', SNAPSHOT_SECURE=False,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        Praise.objects.bulk_create(Praise(message=f'praise {i}') for i in range(25))
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), 'rb') as f:
+            return f.read()
+
+    def test_snapshots_match_api(self):
+        self.assertEqual(set(write_snapshots()), set(SNAPSHOTS))
+        for name, (path, _) in SNAPSHOTS.items():
+            body = self.read(name)
+            self.assertEqual(gzip.decompress(self.read(name + '.gz')), body)
+            self.assertEqual(json.loads(body), self.client.get(path).json())
+        # No temporary files left behind by the atomic writes
+        self.assertFalse([name for name in os.listdir(self.root) if name.startswith('.')])
+
+    def test_model_change_rewrites_dependent_snapshots(self):
+        write_snapshots()
+        posts = self.read('posts.json')
+        with self.captureOnCommitCallbacks(execute=True):
+            Praise.objects.create(message='fresh')
+        self.assertEqual(json.loads(self.read('praises.json'))['results'][0]['message'], 'fresh')
+        self.assertEqual(json.loads(self.read('home.json'))['praises']['results'][0]['message'], 'fresh')
+        self.assertEqual(self.read('posts.json'), posts)
+
+    def test_pending_regeneration_is_flushed(self):
+        write_snapshots()
+        with self.settings(SNAPSHOT_DEBOUNCE_SECONDS=3600):
+            with self.captureOnCommitCallbacks(execute=True):
+                Praise.objects.create(message='fresh')
+            self.assertNotEqual(json.loads(self.read('praises.json'))['results'][0]['message'], 'fresh')
+            # What a worker does on its way out instead of waiting for the timer
+            flush_pending()
+        self.assertEqual(json.loads(self.read('praises.json'))['results'][0]['message'], 'fresh')
+
+    def test_command_writes_and_clears(self):
+        call_command('write_snapshots', 'praises.json', stdout=io.StringIO())
+        written = set(os.listdir(self.root))
+        self.assertLessEqual({'praises.json', 'praises.json.gz'}, written)
+        self.assertNotIn('posts.json', written)
+        call_command('write_snapshots', '--clear', stdout=io.StringIO())
+        self.assertEqual(os.listdir(self.root), [])
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Praise.objects.bulk_create(Praise(message=f'칭찬 메시지 {i}') for i in range(25))
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_preferred_encoding(self):
+        available = ('br', 'gzip')
+        self.assertEqual(preferred_encoding('gzip, deflate, br', available), 'br')
+        self.assertEqual(preferred_encoding('br;q=0.5, gzip', available), 'gzip')
+        self.assertEqual(preferred_encoding('br;q=0, *', available), 'gzip')
+        self.assertIsNone(preferred_encoding('identity', available))
+        self.assertIsNone(preferred_encoding('', available))
+
+    def test_gzip_list(self):
+        plain = self.client.get('/api/praises/')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        response = self.client.get('/api/praises/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertTrue(response['ETag'].startswith('W/'))
+        not_modified = self.client.get(
+            '/api/praises/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_small_and_non_api_responses_untouched(self):
+        response = self.client.get('/api/praises/?page_size=1', headers={'Accept-Encoding': 'gzip'})
+        self.assertFalse(response.has_header('Content-Encoding'))
+        with self.settings(API_COMPRESSION=False):
+            response = self.client.get('/api/praises/', headers={'Accept-Encoding': 'gzip'})
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_renderer(self):
+        data = {
+            'message': '칭찬 \u2028 합니다', 'created_at': datetime.datetime(2024, 5, 1, 9, 30, tzinfo=datetime.timezone.utc),
+            'amount': decimal.Decimal('1.50'), 'items': [1, None, True], 1: 'key', 'big': 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_falls_back(self):
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=4'
+        self.assertEqual(ORJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Post.objects.bulk_create(Post(title=f'post {i}', content='x') for i in range(45))
+        # Pairs of equal timestamps so the seek has to fall back to the id
+        for post in Post.objects.all():
+            Post.objects.filter(pk=post.pk).update(created_at=post.created_at.replace(microsecond=post.pk // 2))
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+
+    def setUp(self):
+        cache.clear()
+        get_cache().clear()
+        self.queryset = Post.objects.order_by('-created_at', '-id')
+
+    def ids(self, page):
+        return [post.id for post in page.object_list]
+
+    def test_keyset_pages_match_offset_pages(self):
+        expected = Paginator(self.queryset, 10)
+        with self.settings(ADMIN_KEYSET_MIN_OFFSET=0):
+            for number in range(1, 6):
+                self.assertEqual(
+                    self.ids(LargeTablePaginator(self.queryset, 10).page(number)), self.ids(expected.page(number))
+                )
+            # Page 3's anchor was remembered while showing page 2: a pure seek
+            with CaptureQueriesContext(connection) as queries:
+                page = LargeTablePaginator(self.queryset, 10).page(3)
+            self.assertEqual(self.ids(page), self.ids(expected.page(3)))
+            self.assertNotIn('OFFSET', ' '.join(query['sql'] for query in queries.captured_queries))
+            # Jumping straight to a page without a remembered anchor
+            cache.clear()
+            self.assertEqual(self.ids(LargeTablePaginator(self.queryset, 10).page(4)), self.ids(expected.page(4)))
+
+    def test_estimated_count_skips_count_queries(self):
+        self.client.force_login(self.admin)
+        with mock.patch('config.admin.estimated_count', return_value=50_000):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/admin/posts/post/')
+            self.assertEqual(response.context['cl'].result_count, 50_000)
+            self.assertFalse([q for q in queries.captured_queries if 'COUNT(' in q['sql']])
+            # Pages past the end of a too-high estimate are empty, not an error
+            response = self.client.get('/admin/posts/post/', {'p': 2000})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(list(response.context['cl'].result_list), [])
+
+    def test_date_hierarchy(self):
+        self.client.force_login(self.admin)
+        year = Post.objects.first().created_at.year
+        for url in ('/admin/posts/post/', '/admin/praises/praise/', '/admin/inquiries/inquiry/'):
+            self.assertEqual(self.client.get(url, {'created_at__year': year}).status_code, 200)
+
+    def test_bulk_block_is_one_update(self):
+        self.client.force_login(self.admin)
+        etag = self.client.get('/api/posts/')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/admin/posts/post/', {
+                'action': 'block_posts', 'select_across': '1', 'index': '0',
+                '_selected_action': [Post.objects.first().pk],
+            })
+        self.assertEqual(response.status_code, 302)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "posts_post"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Post.objects.filter(is_blocked=False).count(), 0)
+        response = self.client.get('/api/posts/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def test_warm_fills_the_api_cache(self):
+        Praise.objects.create(message='hello')
+        # Kept open: closing would end the test's transaction
+        warm(keep_connections=True)
+        # As nginx proxies them: plain HTTP with the client's Host and X-Forwarded-Proto
+        for host in ('ymtech.kr', 'www.ymtech.kr'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/praises/', headers={'Host': host, 'X-Forwarded-Proto': 'https'})
+            self.assertEqual(response.status_code, 200)
+            # Just the model version
+            self.assertEqual(len(queries), 1)
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        rows = parse_importtime(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   psycopg.pq\n'
+            'import time:      1500 |       1620 | psycopg\n'
+        )
+        self.assertEqual([(row.module, row.self_us, row.cumulative_us, row.depth) for row in rows],
+                         [('psycopg.pq', 120, 120, 1), ('psycopg', 1500, 1620, 0)])
+
+    def test_cold_start_within_budget(self):
+        # Median of fresh interpreters, so one slow run on a busy machine doesn't fail it
+        total = statistics.median(measure().total_ms for _ in range(3))
+        self.assertLess(total, settings.STARTUP_BUDGET_MS)
+
+    def test_workers_do_not_import_offline_only_modules(self):
+        # Pillow is only used by the media worker and when attaching an
+        # upload; the test client only by snapshot rendering.
+        modules = {row.module for row in measure(importtime=True).imports}
+        for module in ('PIL', 'django.test', 'dotenv'):
+            self.assertNotIn(module, modules)
@@ -0,0 +1,258 @@
+"""
+Query-count budgets and latency regression checks for every API endpoint.
+
+``QueryBudgetTests`` always runs: each router endpoint must stay within its
+query ceiling, and any newly registered endpoint must be given one.
+
+``LatencyRegressionTests`` only runs with ``BENCHMARK=1``. It seeds realistic
+volumes (scaled by ``BENCHMARK_SCALE``), records p50/p95 latency and response
+size per endpoint to ``BENCHMARK_OUTPUT`` and compares them with the baseline
+in ``BENCHMARK_BASELINE``, failing on regressions beyond
+``BENCHMARK_TOLERANCE``. ``BENCHMARK_UPDATE_BASELINE=1`` writes the baseline
+instead; without one the suite fails rather than passing with nothing to
+compare. Baselines are machine specific, so none is committed; record one on
+the machine that runs the comparison. Works on SQLite (``DJANGO_DB_ENGINE=sqlite``)
+or a throwaway local Postgres.
+"""
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from collections import namedtuple
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from announcements.models import Announcement
+from config.cache import get_cache, get_versions
+from inquiries.models import Inquiry
+from posts.models import Post
+from posts.uploads import create_upload
+from praises.models import Praise
+
+# Non-JSON request bodies (resumable upload chunks)
+RawPayload = namedtuple('RawPayload', 'body content_type headers')
+
+# (url name, method, path, query ceiling, payload). Cached reads include the
+# model version lookup and writes the version bump (config.cache); the
+# {deletable_post} ceiling includes creating the post.
+ENDPOINTS = [
+    ('post-list', 'get', '/api/posts/', 2, None),
+    ('post-list', 'get', '/api/posts/?preview=1&fields=id,title,content,image_srcset', 2, None),
+    ('post-list', 'post', '/api/posts/', 2, {'title': 'bench', 'content': 'bench'}),
+    ('post-search', 'get', '/api/posts/search/?q=게시글', 2, None),
+    ('post-detail', 'get', '/api/posts/{post}/', 2, None),
+    ('post-detail', 'patch', '/api/posts/{post}/', 4, {'title': 'patched'}),
+    ('post-detail', 'delete', '/api/posts/{deletable_post}/', 5, None),
+    ('upload-list', 'post', '/api/posts/uploads/', 1, RawPayload(
+        b'', None, {'Upload-Length': '1024', 'Upload-Metadata': 'field aW1hZ2U=,filename YS5qcGc='},
+    )),
+    # {upload} ceilings include the INSERT creating the upload; PATCH also
+    # counts the SAVEPOINT/RELEASE of its row-locking transaction
+    ('upload-detail', 'head', '/api/posts/uploads/{upload}/', 2, None),
+    ('upload-detail', 'patch', '/api/posts/uploads/{upload}/', 5, RawPayload(
+        b'x' * 1024, 'application/offset+octet-stream', {'Upload-Offset': '0'},
+    )),
+    ('upload-detail', 'delete', '/api/posts/uploads/{upload}/', 3, None),
+    ('praise-list', 'get', '/api/praises/', 2, None),
+    # Postgres adds the NOTIFY for the live praise stream
+    ('praise-list', 'post', '/api/praises/', 3, {'message': 'bench'}),
+    ('praise-detail', 'get', '/api/praises/{praise}/', 2, None),
+    ('announcement-list', 'get', '/api/announcements/', 2, None),
+    ('home', 'get', '/api/home/', 4, None),
+    ('inquiry-list', 'get', '/api/inquiries/', 2, None),
+    ('inquiry-list', 'post', '/api/inquiries/', 3, {
+        'name': '홍길동', 'company': 'YM', 'phone': '01012345678',
+        'email': 'bench@example.com', 'message': 'bench',
+    }),
+    ('inquiry-detail', 'get', '/api/inquiries/{inquiry}/', 2, None),
+]
+
+VOLUMES = {'praises': 50_000, 'posts': 5_000, 'inquiries': 10_000, 'announcements': 50}
+
+
+def seed(scale=1.0):
+    """Bulk insert realistic rows; signals are skipped on purpose."""
+    now = timezone.now()
+
+    def count(key):
+        return max(1, int(VOLUMES[key] * scale))
+
+    Praise.objects.bulk_create(
+        (Praise(message=f'칭찬 메시지 {i} ' * 4) for i in range(count('praises'))), batch_size=2000
+    )
+    Post.objects.bulk_create(
+        (
+            Post(
+                title=f'게시글 {i}',
+                location='서울',
+                achieved_at='2024',
+                content='본문 내용 ' * 80,
+                image=f'post_images/{i % 256:02x}/{i:064x}.jpg',
+                image_variants={
+                    'width': 1280, 'height': 960,
+                    'sources': {
+                        fmt: [[w, f'post_images/variants/{i:064x}-{w}.{fmt}'] for w in (320, 640, 1280)]
+                        for fmt in ('avif', 'webp', 'jpeg')
+                    },
+                },
+                is_blocked=i % 50 == 0,
+            )
+            for i in range(count('posts'))
+        ),
+        batch_size=1000,
+    )
+    Inquiry.objects.bulk_create(
+        (
+            Inquiry(
+                name=f'고객{i}', company=f'회사{i}', phone='010-1234-5678',
+                email=f'user{i}@example.com', message='문의 내용 ' * 30,
+            )
+            for i in range(count('inquiries'))
+        ),
+        batch_size=2000,
+    )
+    Announcement.objects.bulk_create(
+        Announcement(content=f'공지 {i}') for i in range(count('announcements'))
+    )
+    # Spread created_at so the ordering indexes do real work
+    for model in (Praise, Post, Inquiry, Announcement):
+        model.objects.update(created_at=now)
+    for model, step in ((Praise, 1), (Post, 10), (Inquiry, 5), (Announcement, 600)):
+        ids = list(model.objects.values_list('id', flat=True))
+        model.objects.filter(id__in=ids[::2]).update(created_at=now - timedelta(seconds=step))
+
+
+def endpoint_ids():
+    return {
+        'post': Post.objects.filter(is_blocked=False).latest('id').id,
+        'praise': Praise.objects.latest('id').id,
+        'inquiry': Inquiry.objects.latest('id').id,
+    }
+
+
+class EndpointClientMixin:
+    def setUp(self):
+        super().setUp()
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir)
+        override = self.settings(POST_UPLOAD_DIR=upload_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def request(self, method, path, payload):
+        if '{deletable_post}' in path:
+            path = path.replace('{deletable_post}', str(Post.objects.create(title='x', content='x').id))
+        if '{upload}' in path:
+            # A fresh, empty upload each time so every PATCH starts at offset 0
+            path = path.replace('{upload}', str(create_upload('1024', 'field aW1hZ2U=').pk))
+        path = path.format(**self.ids)
+        if isinstance(payload, RawPayload):
+            return self.client.generic(
+                method.upper(), path, payload.body, content_type=payload.content_type, headers=payload.headers
+            )
+        if method in ('post', 'patch'):
+            return getattr(self.client, method)(path, data=json.dumps(payload), content_type='application/json')
+        return getattr(self.client, method)(path)
+
+
+class QueryBudgetTests(EndpointClientMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Enough rows that an N+1 query would blow every ceiling
+        seed(scale=0.005)
+        cls.ids = endpoint_ids()
+        # Version rows exist in any running site; don't count their creation
+        get_versions(['announcements.Announcement', 'inquiries.Inquiry', 'posts.Post', 'praises.Praise'])
+
+    def test_every_router_endpoint_has_a_budget(self):
+        from announcements.urls import router as announcements
+        from inquiries.urls import router as inquiries
+        from posts.urls import router as posts
+        from praises.urls import router as praises
+
+        registered = {
+            url.name for router in (posts, praises, announcements, inquiries)
+            for url in router.urls if url.name != 'api-root'
+        }
+        self.assertEqual(registered - {name for name, *_ in ENDPOINTS}, set())
+
+    def test_query_budgets(self):
+        for name, method, path, ceiling, payload in ENDPOINTS:
+            with self.subTest(endpoint=name, method=method, path=path):
+                get_cache().clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.request(method, path, payload)
+                self.assertLess(response.status_code, 300, response.content[:200])
+                self.assertLessEqual(
+                    len(queries), ceiling,
+                    '\n'.join(query['sql'] for query in queries.captured_queries),
+                )
+
+
+@skipUnless(os.getenv('BENCHMARK') == '1', 'set BENCHMARK=1 to run the latency regression suite')
+class LatencyRegressionTests(EndpointClientMixin, TestCase):
+    iterations = int(os.getenv('BENCHMARK_ITERATIONS', 30))
+    tolerance = float(os.getenv('BENCHMARK_TOLERANCE', 0.25))
+    # Absolute slack so sub-millisecond endpoints don't fail on timer noise
+    slack_ms = float(os.getenv('BENCHMARK_SLACK_MS', 2))
+    baseline_path = os.getenv('BENCHMARK_BASELINE', settings.BASE_DIR / 'perf_baseline.json')
+    output_path = os.getenv('BENCHMARK_OUTPUT', settings.BASE_DIR / 'perf_results.json')
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(scale=float(os.getenv('BENCHMARK_SCALE', 1)))
+        cls.ids = endpoint_ids()
+
+    def measure(self, method, path, payload):
+        timings, size = [], 0
+        for _ in range(self.iterations):
+            # Cold API cache: measure the database path, not a dict lookup
+            get_cache().clear()
+            started = time.perf_counter()
+            response = self.request(method, path, payload)
+            timings.append((time.perf_counter() - started) * 1000)
+            size = len(response.content)
+        timings.sort()
+        return {
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            'bytes': size,
+        }
+
+    def test_latency_against_baseline(self):
+        results = {
+            f'{method.upper()} {path}': self.measure(method, path, payload)
+            for _, method, path, _, payload in ENDPOINTS
+        }
+        with open(self.output_path, 'w') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+        if os.getenv('BENCHMARK_UPDATE_BASELINE') == '1':
+            with open(self.baseline_path, 'w') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            return
+        if not os.path.exists(self.baseline_path):
+            self.fail(f'No baseline at {self.baseline_path}; record one with BENCHMARK_UPDATE_BASELINE=1')
+
+        with open(self.baseline_path) as f:
+            baseline = json.load(f)
+        regressions = []
+        for key, result in results.items():
+            previous = baseline.get(key)
+            if previous is None:
+                continue
+            for metric in ('p50_ms', 'p95_ms'):
+                limit = previous[metric] * (1 + self.tolerance) + self.slack_ms
+                if result[metric] > limit:
+                    regressions.append(f'{key} {metric}: {result[metric]} > {limit:.3f}')
+            if result['bytes'] > previous['bytes'] * (1 + self.tolerance):
+                regressions.append(f'{key} bytes: {result["bytes"]} > {previous["bytes"]}')
+        self.assertEqual(regressions, [])
@@ -0,0 +1,103 @@
+"""
+Token-bucket throttling for anonymous writes.
+
+A viewset opts in with::
+
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'praise'
+
+and ``API_THROTTLE_RATES`` maps ``'praise'`` (one bucket per client IP) and
+``'praise_global'`` (one bucket shared by everyone) to ``"<rate>/<period>"``
+with an optional ``":<burst>"`` bucket size, e.g. ``"6/min:10"``. A scope
+without a rate is not throttled. Only writes are throttled; reads are cached.
+A request takes a token from both buckets or from neither.
+
+Buckets live in the ``throttle`` cache alias. With the default in-process
+backend each worker has its own buckets, so the effective limit is the rate
+times the number of workers; point ``THROTTLE_CACHE_BACKEND`` at a shared
+backend to enforce it across workers. Updates are serialized within a
+process only, so concurrent workers sharing a backend can overshoot slightly.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_CACHE_ALIAS = 'throttle'
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """``"6/min:10"`` -> (tokens per second, bucket size)."""
+    rate, _, burst = rate.partition(':')
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count / PERIODS[period], int(burst or count)
+
+
+def take_tokens(buckets):
+    """
+    Take one token from every ``(key, rate, burst)`` bucket, or from none of
+    them; returns seconds until all of them have one, or 0 if taken.
+    """
+    cache = caches[THROTTLE_CACHE_ALIAS]
+    now = time.time()
+    with _lock:
+        states = cache.get_many([key for key, _, _ in buckets])
+        levels = []
+        for key, rate, burst in buckets:
+            tokens, updated = states.get(key, (burst, now))
+            levels.append(min(burst, tokens + (now - updated) * rate))
+        wait = max((1 - tokens) / rate for tokens, (_, rate, _) in zip(levels, buckets))
+        taken = wait <= 0
+        for tokens, (key, rate, burst) in zip(levels, buckets):
+            # Expire once the bucket would have refilled anyway
+            cache.set(key, (tokens - 1 if taken else tokens, now), timeout=int(burst / rate) + 1)
+    return 0 if taken else wait
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Charges the client's bucket (``<scope>``, per IP) and the shared one
+    (``<scope>_global``) together, so a request the client bucket turns away
+    costs the global bucket nothing: one client hammering the endpoint can't
+    lock everyone else out.
+    """
+    methods = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def get_ident(self, request):
+        # nginx overwrites X-Real-IP with the peer address, so unlike
+        # X-Forwarded-For it cannot be supplied by the client.
+        if settings.THROTTLE_TRUST_X_REAL_IP and request.META.get('HTTP_X_REAL_IP'):
+            return request.META['HTTP_X_REAL_IP'].strip()
+        return request.META.get('REMOTE_ADDR', '')
+
+    def get_buckets(self, request, scope):
+        ident = self.get_ident(request)
+        buckets = []
+        for name, key in ((scope, f'throttle:{scope}:{ident}'), (f'{scope}_global', f'throttle:{scope}_global')):
+            rate = settings.API_THROTTLE_RATES.get(name)
+            if rate:
+                buckets.append((key, *parse_rate(rate)))
+        return buckets
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if request.method not in self.methods:
+            return True
+        scope = getattr(view, 'throttle_scope', None)
+        buckets = self.get_buckets(request, scope) if scope else []
+        if not buckets:
+            return True
+        wait = take_tokens(buckets)
+        if wait:
+            self.wait_seconds = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
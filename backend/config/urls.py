@@ -15,9 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+from config.home import HomeView
+from config.views import cache_stats, database_stats, request_metrics, serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,7 +26,13 @@ urlpatterns = [
     path('api/announcements/', include('announcements.urls')),
     path('api/praises/', include('praises.urls')),
     path('api/inquiries/', include('inquiries.urls')),
+    path('api/home/', HomeView.as_view(), name='home'),
+    path('api/internal/cache-stats/', cache_stats, name='cache-stats'),
+    path('api/internal/metrics/', request_metrics, name='request-metrics'),
+    path('api/internal/db-stats/', database_stats, name='database-stats'),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+if settings.DEBUG or settings.SERVE_MEDIA:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
+    ]
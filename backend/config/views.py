@@ -0,0 +1,138 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+from config import cache, metrics
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+@staff_member_required
+def cache_stats(request):
+    """Hit/miss/eviction counters of the API cache for this worker process."""
+    return JsonResponse(cache.stats.snapshot())
+
+
+@staff_member_required
+def request_metrics(request):
+    """Rolling per-endpoint latency percentiles for this worker process."""
+    return JsonResponse(metrics.endpoint_stats.snapshot())
+
+
+@staff_member_required
+def database_stats(request):
+    """Connection and pool counters for this worker process."""
+    return JsonResponse(metrics.db_stats.snapshot())
+
+
+class RangeFile:
+    """
+    Read-only slice of an open file.
+
+    ``fileno()`` is kept so a WSGI server's ``wsgi.file_wrapper`` (gunicorn)
+    can still ``sendfile()`` it: the slice starts at the current offset and
+    the response's Content-Length caps how much is sent.
+    """
+
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self.file = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """``(start, end)`` of a single satisfiable byte range, ``None`` to send the whole file."""
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file from MEDIA_ROOT with single-range ``Range`` support so video
+    seeking works. With ``MEDIA_ACCEL_REDIRECT`` set the transfer is handed to
+    nginx via ``X-Accel-Redirect``; otherwise the file object is passed to the
+    WSGI server, which uses ``sendfile()`` when it can.
+    """
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    stat = os.stat(fullpath)
+    last_modified = http_date(stat.st_mtime)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT + path
+        del response['Content-Type']  # let nginx pick it from the file
+        return response
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    size = stat.st_size
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and (not if_range or parse_http_date_safe(if_range) == int(stat.st_mtime)):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    f = open(fullpath, 'rb')
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(RangeFile(f, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        response = FileResponse(f, content_type=content_type)
+        response['Content-Length'] = size
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = last_modified
+    return response
@@ -0,0 +1,68 @@
+"""
+Worker warmup for gunicorn (``backend/gunicorn.conf.py``).
+
+``prepare`` runs once in the master after the preloaded app is imported. It
+builds the URL resolver and imports DRF's lazily loaded classes, so every
+worker shares them copy-on-write instead of each loading them on its first
+request. It then closes whatever database connections or pools the master
+opened: a socket inherited through ``fork`` would be shared by every worker.
+
+``warm`` runs in each worker right after the fork. It connects to every
+database (filling the pool in ``DB_CONN_MODE=pool``) and renders the public
+feeds through their views for every host in ``WARMUP_HOSTS``, which fills
+the API cache. The cache is keyed by the absolute URL, so the requests are
+built as Django sees proxied ones: https (``SECURE_PROXY_SSL_HEADER``) with
+the client's Host header. A warmup failure is logged rather than raised: the
+worker then simply starts cold.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver, resolve
+from rest_framework.settings import IMPORT_STRINGS, api_settings
+
+from config import snapshots
+
+logger = logging.getLogger(__name__)
+
+
+def prepare():
+    get_resolver().reverse_dict
+    for path, _ in snapshots.SNAPSHOTS.values():
+        resolve(path)
+    for name in IMPORT_STRINGS:
+        getattr(api_settings, name)
+    close_connections(pools=True)
+
+
+def close_connections(pools=False):
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        if pools and hasattr(connection, 'close_pool'):
+            connection.close_pool()
+
+
+def warm(keep_connections=False):
+    """
+    Connect and prime the API cache. ``keep_connections`` leaves the
+    connections open for a worker that serves requests on this thread (sync
+    workers); otherwise they go back to the pool or are closed.
+    """
+    start = time.perf_counter()
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+        except Exception:
+            logger.warning("Warmup could not connect to database %r", connection.alias, exc_info=True)
+            return
+    for host in settings.WARMUP_HOSTS:
+        for path, _ in snapshots.SNAPSHOTS.values():
+            try:
+                snapshots.render(path, host=host, secure=True)
+            except Exception:
+                logger.warning("Warmup could not render %s for %s", path, host, exc_info=True)
+    if not keep_connections:
+        close_connections()
+    logger.info("Worker warmed up in %.0f ms", (time.perf_counter() - start) * 1000)
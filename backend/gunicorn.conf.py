@@ -0,0 +1,83 @@
+# gunicorn settings, all overridable from the environment:
+#
+#   gunicorn -c gunicorn.conf.py config.wsgi:application
+#   GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker gunicorn -c gunicorn.conf.py config.asgi:application
+#
+# Every worker holds up to `threads` database connections (DB_CONN_MODE=pool:
+# DB_POOL_MAX_SIZE), so keep workers * threads within Postgres'
+# max_connections, next to the mail and media workers.
+import os
+
+
+def env_bool(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+# CPUs this container may run on, not the host's
+cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+# sync (the default), gthread, or uvicorn_worker.UvicornWorker for config.asgi
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+if worker_class == 'gthread':
+    # Threads overlap database waits; fewer processes keep memory down
+    workers = int(os.getenv('WEB_CONCURRENCY', str(cpus + 1)))
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+else:
+    workers = int(os.getenv('WEB_CONCURRENCY', str(cpus * 2 + 1)))
+    # More than one turns a sync worker into gthread
+    threads = int(os.getenv('GUNICORN_THREADS', '1'))
+
+# Seconds a worker may spend on one request before it is killed and restarted.
+# Upload chunks are buffered by nginx first (POST_UPLOAD_CHUNK_MAX_BYTES), so
+# this only needs to cover writing one chunk, not the client's upload.
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# Seconds an idle keep-alive connection is held open
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Restart each worker after this many requests (0 = never) to cap slow
+# memory growth; the jitter spreads restarts so workers don't recycle together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', str(max_requests // 10)))
+
+# Import Django once in the master so workers share its memory copy-on-write
+# and start instantly. Code changes then need a restart, not a HUP.
+preload_app = env_bool('GUNICORN_PRELOAD', 'True')
+# Connect and fill the API cache in each new worker before it takes requests
+# (config/warmup.py)
+warmup = env_bool('GUNICORN_WARMUP', 'True')
+
+# The heartbeat file lives in memory rather than on the container's overlay fs
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    if preload_app:
+        from config import warmup as warmup_module
+
+        warmup_module.prepare()
+
+
+def post_worker_init(worker):
+    # Runs in the forked worker once the app is loaded (with or without
+    # preload_app), before it accepts connections
+    if not warmup:
+        return
+    from config import warmup as warmup_module
+
+    # Only a single-threaded sync worker serves requests on this thread
+    warmup_module.warm(keep_connections=worker_class == 'sync' and threads == 1)
+
+
+def worker_exit(server, worker):
+    # Write snapshot regenerations still waiting out their debounce
+    # (config/snapshots.py) before the worker's process goes away
+    from config import snapshots
+
+    snapshots.flush_pending()
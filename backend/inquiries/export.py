@@ -0,0 +1,72 @@
+"""
+Streaming CSV export of inquiries, shared by the admin action and the
+``export_inquiries`` management command.
+
+Rows are read with ``.iterator(chunk_size=...)`` (a server-side cursor on
+Postgres) and written one at a time, so memory stays flat however many
+inquiries are exported.
+"""
+import csv
+import re
+
+EXPORT_FIELDS = ('category', 'company', 'name', 'phone', 'email', 'message', 'created_at')
+HEADER = ['문의 유형', '회사명', '성함', '연락처', '이메일', '문의 내용', '접수일시']
+BOM = '\ufeff'
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def format_phone(phone):
+    if not phone:
+        return ""
+    # 숫자만 추출
+    clean_phone = _NON_DIGITS.sub('', str(phone))
+
+    # 엑셀/DB 저장 시 숫자형으로 되어 앞의 0이 없어진 경우 (예: 10xxxxxxx -> 010xxxxxxx)
+    if len(clean_phone) == 10 and clean_phone.startswith('1'):
+        clean_phone = '0' + clean_phone
+
+    if len(clean_phone) == 11:
+        return f"{clean_phone[:3]}-{clean_phone[3:7]}-{clean_phone[7:]}"
+    elif len(clean_phone) == 10:
+        # 02-xxxx-xxxx (서울) or 011-xxx-xxxx
+        if clean_phone.startswith('02'):
+            return f"{clean_phone[:2]}-{clean_phone[2:6]}-{clean_phone[6:]}"
+        else:
+            return f"{clean_phone[:3]}-{clean_phone[3:6]}-{clean_phone[6:]}"
+    elif len(clean_phone) == 9:
+        # 02-xxx-xxxx
+        if clean_phone.startswith('02'):
+            return f"{clean_phone[:2]}-{clean_phone[2:5]}-{clean_phone[5:]}"
+
+    # 포맷팅이 안되는 경우(해외번호 등)는 원본을 유지.
+    return phone
+
+
+def inquiry_rows(queryset, chunk_size=2000):
+    queryset = queryset.only(*EXPORT_FIELDS).order_by('created_at', 'id')
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield [
+            obj.get_category_display(),
+            obj.company,
+            obj.name,
+            format_phone(obj.phone),
+            obj.email,
+            obj.message,
+            obj.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        ]
+
+
+class Echo:
+    """File-like object whose write() hands the formatted line back."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, chunk_size=2000):
+    """Yield the export as CSV text lines, starting with a UTF-8 BOM for Excel."""
+    writer = csv.writer(Echo())
+    yield BOM + writer.writerow(HEADER)
+    for row in inquiry_rows(queryset, chunk_size):
+        yield writer.writerow(row)
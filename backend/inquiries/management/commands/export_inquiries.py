@@ -0,0 +1,44 @@
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inquiries.export import stream_csv
+from inquiries.models import Inquiry
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Stream inquiries as CSV to a file or stdout, optionally limited to a date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=parse_date, help="First day to include (YYYY-MM-DD).")
+        parser.add_argument('--until', type=parse_date, help="Last day to include (YYYY-MM-DD).")
+        parser.add_argument('--category', choices=[choice for choice, _ in Inquiry.CATEGORY_CHOICES])
+        parser.add_argument('-o', '--output', help="Output file (default: stdout).")
+        parser.add_argument('--chunk-size', type=int, default=settings.INQUIRY_EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Inquiry.objects.all()
+        tz = timezone.get_current_timezone()
+        if options['since']:
+            queryset = queryset.filter(created_at__gte=datetime.combine(options['since'], time.min, tz))
+        if options['until']:
+            queryset = queryset.filter(created_at__lte=datetime.combine(options['until'], time.max, tz))
+        if options['category']:
+            queryset = queryset.filter(category=options['category'])
+
+        lines = stream_csv(queryset, options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                f.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
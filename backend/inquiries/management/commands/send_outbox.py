@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inquiries.models import OutboundEmail
+from inquiries.outbox import deliver_due
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification emails from the inquiry outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the due emails and exit instead of polling.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Emails sent per SMTP connection.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--report', action='store_true', help="List dead letters and exit.")
+
+    def handle(self, *args, **options):
+        if options['report']:
+            return self.report()
+
+        while True:
+            sent, failed, dead = deliver_due(options['batch_size'])
+            if sent or failed or dead:
+                self.stdout.write(f"sent={sent} retry={failed} dead={dead}")
+            if dead:
+                self.stderr.write(self.style.ERROR(f"{dead} email(s) moved to dead letters; see --report"))
+            if not (sent or failed or dead):
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+
+    def report(self):
+        dead_letters = OutboundEmail.objects.filter(status=OutboundEmail.STATUS_DEAD).order_by('-created_at')
+        for email in dead_letters:
+            self.stdout.write(f"#{email.pk} {email.created_at:%Y-%m-%d %H:%M:%S} attempts={email.attempts} {email.subject}")
+            self.stdout.write(f"    {email.last_error}")
+        self.stdout.write(f"{dead_letters.count()} dead letter(s)")
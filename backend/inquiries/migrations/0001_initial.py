@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Inquiry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('company', models.CharField(max_length=100)),
+                ('phone', models.CharField(max_length=50)),
+                ('email', models.EmailField(max_length=254)),
+                ('category', models.CharField(choices=[('quote', '솔루션 견적/도입 문의'), ('maintenance', '유지보수/장애 접수'), ('partnership', '협력/제안'), ('other', '기타 문의')], default='quote', max_length=20)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
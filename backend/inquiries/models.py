@@ -1,4 +1,6 @@
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
+from django.utils import timezone
 
 class Inquiry(models.Model):
     CATEGORY_CHOICES = [
@@ -16,5 +18,60 @@ class Inquiry(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='inquiry_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"[{self.get_category_display()}] {self.name} - {self.company}"
+
+
+class OutboundEmail(models.Model):
+    """
+    Outbox row for a notification mail, delivered by ``manage.py send_outbox``.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '발송 대기'),
+        (STATUS_SENT, '발송 완료'),
+        (STATUS_DEAD, '발송 실패'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='outbox_due_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"[{self.get_status_display()}] {self.subject}"
+
+    def to_message(self, connection=None):
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email or None,
+            to=self.recipients,
+            connection=connection,
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, 'text/html')
+        return message
@@ -0,0 +1,84 @@
+"""
+Delivery side of the inquiry notification outbox.
+
+``deliver_due`` claims one batch of due ``OutboundEmail`` rows (skipping rows
+another worker has locked), sends them over a single SMTP connection and
+reschedules failures with exponential backoff until ``OUTBOX_MAX_ATTEMPTS``,
+after which they are kept as dead letters.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempts):
+    delay = settings.OUTBOX_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboundEmail.STATUS_DEAD
+        logger.error("Outbox email %s is a dead letter after %s attempts: %s", email.pk, email.attempts, error)
+    else:
+        email.next_attempt_at = now + backoff_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def deliver_due(batch_size=None):
+    """
+    Send one batch of due emails. Returns ``(sent, failed, dead)`` counts.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    sent = failed = dead = 0
+
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not batch:
+            return sent, failed, dead
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            for email in batch:
+                _record_failure(email, e, now)
+        else:
+            try:
+                for email in batch:
+                    try:
+                        connection.send_messages([email.to_message(connection)])
+                    except Exception as e:
+                        _record_failure(email, e, now)
+                    else:
+                        email.status = OutboundEmail.STATUS_SENT
+                        email.sent_at = timezone.now()
+                        email.attempts += 1
+                        email.last_error = ''
+                        email.save(update_fields=['status', 'sent_at', 'attempts', 'last_error'])
+            finally:
+                connection.close()
+
+    for email in batch:
+        if email.status == OutboundEmail.STATUS_SENT:
+            sent += 1
+        elif email.status == OutboundEmail.STATUS_DEAD:
+            dead += 1
+        else:
+            failed += 1
+    return sent, failed, dead
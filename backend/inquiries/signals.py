@@ -1,8 +1,14 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.conf import settings
-from .models import Inquiry
+from config.cache import bump_version
+from .models import Inquiry, OutboundEmail
+
+
+@receiver([post_save, post_delete], sender=Inquiry)
+def invalidate_list_cache(sender, **kwargs):
+    bump_version(sender._meta.label)
+
 
 @receiver(post_save, sender=Inquiry)
 def send_inquiry_notification(sender, instance, created, **kwargs):
@@ -86,14 +92,12 @@ def send_inquiry_notification(sender, instance, created, **kwargs):
         
         recipient_list = [settings.ADMIN_EMAIL]
         
-        try:
-            send_mail(
-                subject=subject,
-                message=text_message, # Fallback for plain text clients
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=recipient_list,
-                html_message=html_message, # Main HTML content
-                fail_silently=False,
-            )
-        except Exception as e:
-            print(f"Failed to send email notification: {e}")
+        # Only queue the mail here; `manage.py send_outbox` delivers it so the
+        # request never waits on the SMTP server.
+        OutboundEmail.objects.create(
+            subject=subject,
+            body=text_message, # Fallback for plain text clients
+            html_body=html_message, # Main HTML content
+            from_email=settings.DEFAULT_FROM_EMAIL or '',
+            recipients=recipient_list,
+        )
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Inquiry, OutboundEmail
+from .outbox import deliver_due
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('smtp unavailable')
+
+
+def create_inquiry():
+    return Inquiry.objects.create(
+        name='홍길동', company='YM', phone='010-1234-5678',
+        email='hong@example.com', message='문의합니다',
+    )
+
+
+@override_settings(ADMIN_EMAIL='admin@example.com', DEFAULT_FROM_EMAIL='noreply@example.com')
+class OutboxTests(TestCase):
+    def test_inquiry_only_enqueues(self):
+        response = self.client.post('/api/inquiries/', {
+            'name': '홍길동', 'company': 'YM', 'phone': '01012345678',
+            'email': 'hong@example.com', 'message': '문의합니다',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.STATUS_PENDING).count(), 1)
+
+    def test_worker_sends_batch(self):
+        for _ in range(3):
+            create_inquiry()
+        call_command('send_outbox', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].to, ['admin@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+
+    @override_settings(
+        EMAIL_BACKEND='inquiries.tests.FailingBackend',
+        OUTBOX_MAX_ATTEMPTS=2, OUTBOX_BACKOFF_SECONDS=60,
+    )
+    def test_failures_back_off_then_dead_letter(self):
+        create_inquiry()
+        self.assertEqual(deliver_due(), (0, 1, 0))
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=30))
+        self.assertEqual(deliver_due(), (0, 0, 0))
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_due(), (0, 0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_DEAD)
+        self.assertIn('smtp unavailable', email.last_error)
+
+        out = StringIO()
+        call_command('send_outbox', '--report', stdout=out)
+        self.assertIn('1 dead letter(s)', out.getvalue())
+
+
+class ExportTests(TestCase):
+    def test_format_phone(self):
+        from .export import format_phone
+        self.assertEqual(format_phone('01012345678'), '010-1234-5678')
+        self.assertEqual(format_phone('1012345678'), '010-1234-5678')
+        self.assertEqual(format_phone('0212345678'), '02-1234-5678')
+        self.assertEqual(format_phone('021234567'), '02-123-4567')
+        self.assertEqual(format_phone('+1 555'), '+1 555')
+
+    def test_command_filters_by_date(self):
+        old = create_inquiry()
+        Inquiry.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+        create_inquiry()
+        out = StringIO()
+        since = (timezone.localdate() - timedelta(days=30)).isoformat()
+        call_command('export_inquiries', '--since', since, '--chunk-size', '1', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('\ufeff문의 유형'))
+        self.assertEqual(len(lines), 2)
+        self.assertIn('010-1234-5678', lines[1])
+
+    def test_admin_action_streams(self):
+        from django.contrib.admin.sites import site
+        inquiry = create_inquiry()
+        response = site._registry[Inquiry].export_to_csv(None, Inquiry.objects.all())
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn(inquiry.company, content)
@@ -1,8 +1,14 @@
 from rest_framework import viewsets, permissions
+from config.cache import ConditionalListMixin, ConditionalRetrieveMixin
+from config.throttling import TokenBucketThrottle
 from .models import Inquiry
 from .serializers import InquirySerializer
 
-class InquiryViewSet(viewsets.ModelViewSet):
-    queryset = Inquiry.objects.all().order_by('-created_at')
+class InquiryViewSet(ConditionalListMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet):
+    queryset = Inquiry.objects.all().order_by('-created_at', '-id')
     serializer_class = InquirySerializer
     permission_classes = [permissions.AllowAny] # Allow frontend to post without auth for now
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'inquiry'
+    # Contact details must never land in a shared cache
+    cache_control = {'private': True, 'no_cache': True}
@@ -7,6 +7,7 @@ import sys
 def main():
     """Run administrative tasks."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    os.environ.setdefault('DJANGO_READ_DOTENV', 'True')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
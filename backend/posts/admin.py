@@ -1,9 +1,36 @@
 from django.contrib import admin
+from config.admin import ScalableAdminMixin
+from config.cache import bump_version
 from .models import Post
+from .search import search_posts, search_supported
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ScalableAdminMixin, admin.ModelAdmin):
   list_display = ('title', 'location', 'achieved_at', 'is_blocked', 'created_at')
-  list_editable = ('is_blocked',)
   search_fields = ('title', 'location', 'content')
   list_filter = ('is_blocked', 'created_at')
+  date_hierarchy = 'created_at'
+  ordering = ('-created_at', '-id')
+  actions = ['block_posts', 'unblock_posts']
+
+  def set_blocked(self, request, queryset, blocked):
+    # One UPDATE for the whole selection ("select all" included) instead of
+    # a save() per row. update() sends no post_save, so invalidate here.
+    updated = queryset.exclude(is_blocked=blocked).update(is_blocked=blocked)
+    bump_version(Post._meta.label)
+    self.message_user(request, f"{updated}건을 {'차단' if blocked else '차단 해제'}했습니다.")
+
+  def block_posts(self, request, queryset):
+    self.set_blocked(request, queryset, True)
+  block_posts.short_description = "선택된 게시글 차단"
+
+  def unblock_posts(self, request, queryset):
+    self.set_blocked(request, queryset, False)
+  unblock_posts.short_description = "선택된 게시글 차단 해제"
+
+  def get_search_results(self, request, queryset, search_term):
+    # Same tsvector/trigram indexes as /api/posts/search/; the admin keeps its
+    # own ordering. search_fields stays set so the search box is shown.
+    if not search_supported() or not search_term.strip():
+      return super().get_search_results(request, queryset, search_term)
+    return search_posts(queryset, search_term, rank=False), False
@@ -0,0 +1,109 @@
+"""
+Upload-time image pipeline for ``Post.image``.
+
+``process_post_image`` re-encodes the upload as an EXIF-free JPEG capped at
+``POST_IMAGE_MAX_EDGE`` pixels, then renders AVIF (when Pillow supports it),
+WebP and JPEG variants at each of ``POST_IMAGE_WIDTHS`` narrower than the
+image. Storage names of the variants are kept in ``Post.image_variants`` and
+exposed by the serializers as ``srcset`` strings.
+
+It runs in ``manage.py process_media`` (via ``posts.media``), never on the
+request thread.
+"""
+import io
+import os
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+# (key, Pillow format, file extension)
+VARIANT_FORMATS = [
+    ('avif', 'AVIF', 'avif'),
+    ('webp', 'WEBP', 'webp'),
+    ('jpeg', 'JPEG', 'jpg'),
+]
+
+
+def available_formats():
+    return [fmt for fmt in VARIANT_FORMATS if fmt[0] == 'jpeg' or features.check(fmt[0])]
+
+
+def _flatten(image):
+    """JPEG has no alpha channel: composite transparent images onto white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _encode(image, pillow_format):
+    buffer = io.BytesIO()
+    # No exif= argument: Pillow only writes EXIF that is passed explicitly.
+    image.save(buffer, pillow_format, quality=settings.POST_IMAGE_QUALITY, optimize=pillow_format == 'JPEG')
+    return buffer.getvalue()
+
+
+def build_variants(fileobj, stem, storage=default_storage):
+    """
+    Run the pipeline on an open image file and save the results to ``storage``.
+
+    Returns ``(master_name, variants, stats)``.
+    """
+    started = time.perf_counter()
+    fileobj.seek(0, os.SEEK_END)
+    original_bytes = fileobj.tell()
+    fileobj.seek(0)
+
+    with Image.open(fileobj) as source:
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((settings.POST_IMAGE_MAX_EDGE, settings.POST_IMAGE_MAX_EDGE), Image.LANCZOS)
+        image.load()
+
+    master = _flatten(image)
+    master_name = storage.save(f'post_images/{stem}.jpg', ContentFile(_encode(master, 'JPEG')))
+    output_bytes = storage.size(master_name)
+
+    widths = [w for w in settings.POST_IMAGE_WIDTHS if w < image.width] + [image.width]
+    sources = {}
+    for key, pillow_format, extension in available_formats():
+        sources[key] = []
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            if pillow_format == 'JPEG':
+                resized = _flatten(resized)
+            elif resized.mode not in ('RGB', 'RGBA'):
+                resized = resized.convert('RGBA' if 'A' in resized.getbands() else 'RGB')
+            name = storage.save(
+                f'post_images/variants/{stem}-{width}.{extension}',
+                ContentFile(_encode(resized, pillow_format)),
+            )
+            sources[key].append([width, name])
+
+    variants = {'width': image.width, 'height': image.height, 'sources': sources}
+    stats = {
+        'original_bytes': original_bytes,
+        'output_bytes': output_bytes,
+        'bytes_saved': original_bytes - output_bytes,
+        'seconds': time.perf_counter() - started,
+    }
+    return master_name, variants, stats
+
+
+def process_post_image(post):
+    """
+    Store the re-encoded master of ``post.image`` and its variants; returns
+    the ``Post`` fields to update and stats. ``process_post_media`` writes them.
+    """
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    with post.image.open('rb') as fileobj:
+        master_name, variants, stats = build_variants(fileobj, stem, post.image.storage)
+
+    # The original is not deleted here: other posts may share it, so its
+    # reference is dropped by process_post_media and gc_media removes it.
+    return {'image': master_name, 'image_variants': variants}, stats
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from posts.images import build_variants
+
+
+class Command(BaseCommand):
+    help = "Run the post image pipeline on local files and report bytes saved and time per image."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Image files to process.")
+
+    def handle(self, *args, **options):
+        total_in = total_out = total_variants = 0
+        total_seconds = 0.0
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = FileSystemStorage(location=tmp)
+            for path in options['paths']:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                with open(path, 'rb') as f:
+                    _, variants, stats = build_variants(f, stem, storage)
+                variant_bytes = sum(
+                    storage.size(name) for entries in variants['sources'].values() for _, name in entries
+                )
+                total_in += stats['original_bytes']
+                total_out += stats['output_bytes']
+                total_variants += variant_bytes
+                total_seconds += stats['seconds']
+                self.stdout.write(
+                    f"{path}: {stats['original_bytes']} -> {stats['output_bytes']} bytes master, "
+                    f"{variant_bytes} bytes in variants, {stats['seconds'] * 1000:.0f} ms"
+                )
+
+        count = len(options['paths'])
+        saved = 1 - total_out / total_in if total_in else 0
+        self.stdout.write(
+            f"{count} image(s): {total_in - total_out} bytes saved on the master ({saved:.0%}), "
+            f"{total_variants} bytes of variants, {total_seconds / count * 1000:.0f} ms per image"
+        )
@@ -0,0 +1,163 @@
+import json
+import os
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts.media import variant_names
+from posts.models import MediaBlob, Post, Upload
+from posts.storage import TEMP_PREFIX, media_storage
+
+MEDIA_DIRS = ('post_images', 'post_images/variants', 'post_videos', 'post_videos/posters')
+STATE_FILE = '.gc_media_state.json'
+
+
+def shards():
+    """Directories swept one at a time: each media dir and its 256 hash buckets."""
+    result = []
+    for base in MEDIA_DIRS:
+        result.append(base)
+        result.extend(posixpath.join(base, f'{i:02x}') for i in range(256))
+    return result
+
+
+class Command(BaseCommand):
+    help = "Delete post media files that are no longer referenced by any post."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24.0,
+                            help="Only delete files unreferenced/unmodified for this long.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-shards', type=int, default=64,
+                            help="Directories to sweep this run; the next run resumes where this one stopped.")
+        parser.add_argument('--all', action='store_true', help="Sweep every directory in one run.")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        self.storage = media_storage()
+        self.dry_run = options['dry_run']
+        self.cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+
+        released = self.collect_released(options['batch_size'])
+        all_shards = shards()
+        count = len(all_shards) if options['all'] else options['max_shards']
+        start = self.load_cursor() % len(all_shards)
+        swept = 0
+        for offset in range(min(count, len(all_shards))):
+            swept += self.sweep(all_shards[(start + offset) % len(all_shards)])
+        if not self.dry_run:
+            self.save_cursor((start + count) % len(all_shards))
+
+        expired = self.expire_uploads()
+
+        verb = "Would delete" if self.dry_run else "Deleted"
+        self.stdout.write(
+            f"{verb} {released} released file(s), {swept} orphaned file(s) and {expired} expired upload(s)"
+        )
+
+    def expire_uploads(self):
+        """Resumable uploads nobody has written to or attached for POST_UPLOAD_EXPIRE_HOURS."""
+        expired = Upload.objects.filter(
+            updated_at__lt=timezone.now() - timedelta(hours=settings.POST_UPLOAD_EXPIRE_HOURS)
+        )
+        if self.dry_run:
+            return expired.count()
+        # Deleting through the ORM sends post_delete, which removes the files
+        return expired.delete()[0]
+
+    def delete_files(self, names):
+        cutoff = self.cutoff.timestamp()
+        deleted = []
+        for name in names:
+            path = self.storage.path(name)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue  # re-uploaded within the grace period
+            except FileNotFoundError:
+                deleted.append(name)
+                continue
+            if not self.dry_run:
+                self.storage.delete(name)
+            deleted.append(name)
+        return deleted
+
+    def collect_released(self, batch_size):
+        """Files whose reference count dropped to zero before the cutoff."""
+        total = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    MediaBlob.objects.select_for_update(skip_locked=True)
+                    .filter(refcount__lte=0, updated_at__lt=self.cutoff, id__gt=last_id)
+                    .order_by('id')[:batch_size]
+                )
+                if not batch:
+                    return total
+                last_id = batch[-1].id
+                deleted = self.delete_files([blob.name for blob in batch])
+                if not self.dry_run:
+                    MediaBlob.objects.filter(name__in=deleted, refcount__lte=0).delete()
+                total += len(deleted)
+
+    def sweep(self, shard):
+        """Files in one directory that no post references at all (e.g. legacy uploads)."""
+        directory = self.storage.path(shard)
+        if not os.path.isdir(directory):
+            return 0
+
+        cutoff = self.cutoff.timestamp()
+        candidates = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                    continue
+                name = posixpath.join(shard, entry.name)
+                if entry.name.startswith(TEMP_PREFIX):
+                    # Left behind by an interrupted upload
+                    if not self.dry_run:
+                        os.unlink(entry.path)
+                    continue
+                candidates.append(name)
+        if not candidates:
+            return 0
+
+        referenced = set(
+            MediaBlob.objects.filter(name__in=candidates, refcount__gt=0).values_list('name', flat=True)
+        )
+        for field in ('image', 'video', 'video_poster'):
+            referenced.update(
+                Post.objects.filter(**{f'{field}__in': candidates}).values_list(field, flat=True)
+            )
+        # Variants are only named inside the JSON: one query for the posts
+        # that mention this directory rather than one per candidate
+        for image_variants in Post.objects.filter(image_variants__icontains=f'{shard}/').values_list(
+            'image_variants', flat=True
+        ):
+            referenced.update(variant_names(image_variants))
+        orphans = [name for name in candidates if name not in referenced]
+        deleted = self.delete_files(orphans)
+        if deleted and not self.dry_run:
+            MediaBlob.objects.filter(name__in=deleted, refcount__lte=0).delete()
+        return len(deleted)
+
+    def state_path(self):
+        return self.storage.path(STATE_FILE)
+
+    def load_cursor(self):
+        try:
+            with open(self.state_path()) as f:
+                return int(json.load(f).get('next_shard', 0))
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def save_cursor(self, value):
+        os.makedirs(os.path.dirname(self.state_path()), exist_ok=True)
+        tmp_path = self.state_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'next_shard': value}, f)
+        os.replace(tmp_path, self.state_path())
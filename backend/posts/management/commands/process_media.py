@@ -0,0 +1,52 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.media import claim_post_media, fail_post_media, process_post_media
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Process uploaded post media (image variants, video remux and poster) queued by the API."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process the queue and exit instead of polling.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            if not self.process_next():
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+
+    def process_next(self):
+        # Claimed and finished in short transactions of their own; the
+        # pipeline in between holds neither a transaction nor a row lock.
+        post = claim_post_media()
+        if post is None:
+            return False
+        try:
+            stats = process_post_media(post)
+        except Exception as e:
+            logger.exception("Media processing failed for post %s", post.pk)
+            fail_post_media(post)
+            self.stderr.write(self.style.ERROR(f"post #{post.pk}: {e}"))
+            return True
+        if stats is None:
+            self.stdout.write(f"post #{post.pk} changed while processing; discarded")
+            return True
+        if 'image' in stats:
+            image = stats['image']
+            self.stdout.write(
+                f"post #{post.pk} image: {image['original_bytes']} -> {image['output_bytes']} bytes "
+                f"({image['bytes_saved']} saved) in {image['seconds'] * 1000:.0f} ms"
+            )
+        if 'video' in stats:
+            video = stats['video']
+            self.stdout.write(
+                f"post #{post.pk} video: {video['duration']}s, remuxed={video['remuxed']}"
+            )
+        return True
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from config.cache import bump_version
+from .models import MediaBlob, Post
+
+MEDIA_FIELDS = ('image', 'video', 'video_poster')
+
+
+def variant_names(image_variants):
+    """Storage names of the variants in a ``Post.image_variants`` value."""
+    return {name for entries in (image_variants or {}).get('sources', {}).values() for _, name in entries}
+
+
+def media_names(post):
+    """Every stored file a post references, including its image variants."""
+    names = {getattr(post, field).name for field in MEDIA_FIELDS if getattr(post, field)}
+    return names | variant_names(post.image_variants)
+
+
+def stored_media_names(pk):
+    post = Post.objects.filter(pk=pk).only(*MEDIA_FIELDS, 'image_variants').first()
+    return media_names(post) if post else set()
+
+
+def update_refcounts(added=(), removed=()):
+    added, removed = set(added) - set(removed), set(removed) - set(added)
+    if added:
+        MediaBlob.objects.bulk_create([MediaBlob(name=name) for name in added], ignore_conflicts=True)
+        MediaBlob.objects.filter(name__in=added).update(refcount=F('refcount') + 1)
+    if removed:
+        MediaBlob.objects.filter(name__in=removed).update(refcount=F('refcount') - 1)
+
+
+def claim_post_media():
+    """
+    The oldest post waiting for media processing, marked ``MEDIA_PROCESSING``
+    in a transaction of its own. A claim older than POST_MEDIA_CLAIM_TIMEOUT
+    (a worker that died mid-way) is taken over.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.POST_MEDIA_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        post = (
+            Post.objects.select_for_update(skip_locked=True)
+            .filter(Q(media_status=Post.MEDIA_PENDING) | Q(media_status=Post.MEDIA_PROCESSING, media_claimed_at__lt=stale))
+            .order_by('id')
+            .first()
+        )
+        if post is None:
+            return None
+        post.media_status, post.media_claimed_at = Post.MEDIA_PROCESSING, timezone.now()
+        Post.objects.filter(pk=post.pk).update(media_status=post.media_status, media_claimed_at=post.media_claimed_at)
+    return post
+
+
+def process_post_media(post):
+    """
+    Run every pending media step for a post from ``claim_post_media`` and mark
+    it ready; returns the stats, or ``None`` when the post changed meanwhile.
+
+    The steps (Pillow, ffmpeg) hold no transaction or row lock. Their results
+    are written in one short transaction, and only if the post still has the
+    media they were made from; otherwise they are dropped (an edit queues the
+    post again) and gc_media removes the unreferenced files.
+    """
+    # Imported here: posts.signals loads this module in every web worker,
+    # which never runs the pipeline and so never needs Pillow.
+    from .images import process_post_image
+    from .videos import process_post_video
+
+    before = media_names(post)
+    fields, stats = {}, {}
+    if post.image and not post.image_variants:
+        image_fields, stats['image'] = process_post_image(post)
+        fields.update(image_fields)
+    if post.video and post.video_duration is None:
+        video_fields, stats['video'] = process_post_video(post)
+        fields.update(video_fields)
+
+    with transaction.atomic():
+        current = (
+            Post.objects.select_for_update()
+            .filter(pk=post.pk, media_status=Post.MEDIA_PROCESSING, media_claimed_at=post.media_claimed_at)
+            .only(*MEDIA_FIELDS, 'image_variants')
+            .first()
+        )
+        if current is None:
+            return None
+        if media_names(current) != before:
+            # Edited without being queued again (e.g. an upload removed)
+            Post.objects.filter(pk=post.pk).update(media_status=Post.MEDIA_PENDING)
+            return None
+        Post.objects.filter(pk=post.pk).update(media_status=Post.MEDIA_READY, **fields)
+        update_refcounts(added=stored_media_names(post.pk), removed=before)
+        bump_version(Post._meta.label)
+    return stats
+
+
+def fail_post_media(post):
+    """Mark a claimed post ``MEDIA_FAILED``, unless it changed meanwhile."""
+    Post.objects.filter(
+        pk=post.pk, media_status=Post.MEDIA_PROCESSING, media_claimed_at=post.media_claimed_at
+    ).update(media_status=Post.MEDIA_FAILED)
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_remove_praise'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_blocked',
+            field=models.BooleanField(default=False),
+        ),
+    ]
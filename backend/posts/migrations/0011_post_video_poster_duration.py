@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+def queue_existing_videos(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.exclude(video='').exclude(video__isnull=True).update(media_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='video_duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='video_poster',
+            field=models.ImageField(blank=True, null=True, upload_to='post_videos/posters/'),
+        ),
+        migrations.RunPython(queue_existing_videos, migrations.RunPython.noop),
+    ]
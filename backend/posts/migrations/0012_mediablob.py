@@ -0,0 +1,56 @@
+from collections import Counter
+
+import posts.storage
+from django.db import migrations, models
+
+
+def count_existing_references(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    MediaBlob = apps.get_model('posts', 'MediaBlob')
+    counts = Counter()
+    for post in Post.objects.only('image', 'video', 'video_poster', 'image_variants').iterator():
+        names = {field.name for field in (post.image, post.video, post.video_poster) if field}
+        for entries in (post.image_variants or {}).get('sources', {}).values():
+            names.update(name for _, name in entries)
+        counts.update(names)
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(name=name, refcount=count) for name, count in counts.items()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_video_poster_duration'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=posts.storage.media_storage, upload_to='post_images/'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=posts.storage.media_storage, upload_to='post_videos/'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='video_poster',
+            field=models.ImageField(blank=True, null=True, storage=posts.storage.media_storage, upload_to='post_videos/posters/'),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refcount', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('refcount__lte', 0)), fields=['updated_at'], name='mediablob_orphan_idx')],
+            },
+        ),
+        migrations.RunPython(count_existing_references, migrations.RunPython.noop),
+    ]
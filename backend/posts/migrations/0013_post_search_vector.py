@@ -0,0 +1,52 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# GIN indexes are Postgres only, so they are created here rather than
+# declared in Post.Meta, which would break migrating a SQLite database. The
+# trigram indexes are on UPPER(col::text) because that is what Django's
+# icontains compiles to (UPPER(col::text) LIKE UPPER(%s)) on Postgres.
+INDEXES = {
+    'post_search_vector_idx': 'USING gin (search_vector)',
+    'post_title_trgm_idx': 'USING gin ((UPPER(title::text)) gin_trgm_ops)',
+    'post_location_trgm_idx': 'USING gin ((UPPER(location::text)) gin_trgm_ops)',
+    'post_content_trgm_idx': 'USING gin ((UPPER(content::text)) gin_trgm_ops)',
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='simple')
+        + SearchVector('location', weight='B', config='simple')
+        + SearchVector('content', weight='C', config='simple')
+    ))
+    for name, definition in INDEXES.items():
+        schema_editor.execute(f'CREATE INDEX {name} ON posts_post {definition}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_mediablob'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
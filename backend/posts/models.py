@@ -1,15 +1,104 @@
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from .storage import media_storage
 
 
 class Post(models.Model):
+    MEDIA_PENDING = 'pending'
+    MEDIA_PROCESSING = 'processing'
+    MEDIA_READY = 'ready'
+    MEDIA_FAILED = 'failed'
+    MEDIA_STATUS_CHOICES = [
+        (MEDIA_PENDING, 'Pending'),
+        (MEDIA_PROCESSING, 'Processing'),
+        (MEDIA_READY, 'Ready'),
+        (MEDIA_FAILED, 'Failed'),
+    ]
+
     title = models.CharField(max_length=255)
     location = models.CharField(max_length=255, blank=True)
     achieved_at = models.CharField(max_length=100, blank=True)
     content = models.TextField()
-    image = models.ImageField(upload_to='post_images/', blank=True, null=True)
-    video = models.FileField(upload_to='post_videos/', blank=True, null=True)
+    image = models.ImageField(upload_to='post_images/', storage=media_storage, blank=True, null=True)
+    video = models.FileField(upload_to='post_videos/', storage=media_storage, blank=True, null=True)
+    # Filled in by `manage.py process_media` (see posts/images.py, posts/videos.py)
+    image_variants = models.JSONField(default=dict, blank=True)
+    video_poster = models.ImageField(upload_to='post_videos/posters/', storage=media_storage, blank=True, null=True)
+    video_duration = models.FloatField(blank=True, null=True)
+    media_status = models.CharField(max_length=10, choices=MEDIA_STATUS_CHOICES, default=MEDIA_READY)
+    # When a media worker claimed the post (posts/media.py)
+    media_claimed_at = models.DateTimeField(blank=True, null=True, editable=False)
     is_blocked = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained on save; GIN indexed by migration 0013 (see posts/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_idx'),
+            # Public feed only ever reads visible rows
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='post_visible_created_id_idx',
+                condition=models.Q(is_blocked=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class MediaBlob(models.Model):
+    """
+    Reference count of a stored media file (name relative to MEDIA_ROOT).
+
+    Rows at zero are collected by ``manage.py gc_media`` once they have been
+    unreferenced for longer than the grace period.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='mediablob_orphan_idx', condition=models.Q(refcount__lte=0)),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class Upload(models.Model):
+    """
+    A resumable upload of a post image or video (see ``posts.uploads``).
+
+    The bytes received so far live in ``path``; ``offset`` is how many of the
+    declared ``length`` have been written.
+    """
+    FIELD_CHOICES = [
+        ('image', 'Image'),
+        ('video', 'Video'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    filename = models.CharField(max_length=255)
+    length = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def path(self):
+        return os.path.join(settings.POST_UPLOAD_DIR, f'{self.pk}.part')
+
+    @property
+    def is_complete(self):
+        return self.offset == self.length
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length})"
@@ -0,0 +1,83 @@
+"""
+Full-text search over posts.
+
+``Post.search_vector`` holds a weighted ``tsvector`` of title (A), location
+(B) and content (C) built with the ``simple`` configuration: Postgres ships
+no Korean dictionary, and ``simple`` splits on whitespace and punctuation
+without stemming. Korean attaches particles to the end of a word (서울에서,
+서울의), so every search term is matched as a prefix. Substrings that do not
+start a word are caught by the ``pg_trgm`` GIN indexes on the text columns,
+which also serve the admin's ``icontains`` search.
+
+The vector is computed in the INSERT/UPDATE that saves a post (see
+``posts.signals``), so it costs no extra query. On databases other than
+Postgres both the vector and ranking are skipped and search falls back to
+plain ``icontains``.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Q, TextField, Value
+
+SEARCH_CONFIG = 'simple'
+SEARCH_FIELDS = (('title', 'A'), ('location', 'B'), ('content', 'C'))
+TERM_RE = re.compile(r'\w+')
+
+
+def search_supported():
+    return connection.vendor == 'postgresql'
+
+
+def document_vector(instance=None):
+    """
+    The ``search_vector`` expression: over the columns for bulk updates, or
+    over an instance's current values so it can be part of that row's INSERT.
+    """
+    parts = [
+        SearchVector(
+            F(field) if instance is None else Value(getattr(instance, field) or '', output_field=TextField()),
+            weight=weight,
+            config=SEARCH_CONFIG,
+        )
+        for field, weight in SEARCH_FIELDS
+    ]
+    vector = parts[0]
+    for part in parts[1:]:
+        vector = vector + part
+    return vector
+
+
+def search_terms(text):
+    return TERM_RE.findall(text or '')[:10]
+
+
+def search_query(terms):
+    # Terms are \w+ only, so the raw tsquery cannot be malformed
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+
+
+def substring_match(terms):
+    """Every term appears somewhere in the title, location or content."""
+    match = Q()
+    for term in terms:
+        match &= Q(title__icontains=term) | Q(location__icontains=term) | Q(content__icontains=term)
+    return match
+
+
+def search_posts(queryset, text, rank=True):
+    """Posts matching ``text``, best match first when ``rank`` is set."""
+    text = (text or '').strip()
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    if not search_supported():
+        return queryset.filter(substring_match(terms))
+
+    query = search_query(terms)
+    queryset = queryset.filter(Q(search_vector=query) | substring_match(terms))
+    if not rank:
+        return queryset
+    return queryset.annotate(
+        rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(text, 'title'),
+    ).order_by('-rank', '-created_at', '-id')
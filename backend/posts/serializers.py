@@ -1,8 +1,79 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
-from .models import Post
+from .models import Post, Upload
+from .uploads import UPLOAD_FIELDS, attach_uploads, validate_upload
 
 
-class PostSerializer(serializers.ModelSerializer):
+def srcset(variants, url=None):
+    """``{format: "url 320w, url 640w"}`` for the sources in ``Post.image_variants`` (posts/images.py)."""
+    url = url or default_storage.url
+    return {
+        key: ', '.join(f'{url(name)} {width}w' for width, name in entries)
+        for key, entries in (variants or {}).get('sources', {}).items()
+    }
+
+
+class ImageSrcsetMixin(serializers.Serializer):
+    image_srcset = serializers.SerializerMethodField()
+
+    def get_image_srcset(self, obj):
+        return srcset(obj.image_variants)
+
+
+class PostSerializer(ImageSrcsetMixin, serializers.ModelSerializer):
+    # Finished resumable uploads (posts/uploads.py) instead of multipart files
+    image_upload = serializers.PrimaryKeyRelatedField(
+        queryset=Upload.objects.filter(field='image'), pk_field=serializers.UUIDField(),
+        write_only=True, required=False,
+    )
+    video_upload = serializers.PrimaryKeyRelatedField(
+        queryset=Upload.objects.filter(field='video'), pk_field=serializers.UUIDField(),
+        write_only=True, required=False,
+    )
+
     class Meta:
         model = Post
-        fields = ['id', 'title', 'location', 'achieved_at', 'content', 'image', 'video', 'is_blocked', 'created_at']
+        fields = ['id', 'title', 'location', 'achieved_at', 'content', 'image', 'image_upload', 'image_srcset', 'video', 'video_upload', 'video_poster', 'video_duration', 'is_blocked', 'created_at']
+        read_only_fields = ['video_poster', 'video_duration']
+
+    def validate_image_upload(self, upload):
+        return validate_upload(upload)
+
+    def validate_video_upload(self, upload):
+        return validate_upload(upload)
+
+    def validate(self, attrs):
+        for field in UPLOAD_FIELDS:
+            if attrs.get(field) and attrs.get(f'{field}_upload'):
+                raise serializers.ValidationError({f'{field}_upload': [f"Send either {field} or {field}_upload, not both."]})
+        return attrs
+
+    def create(self, validated_data):
+        with attach_uploads(validated_data):
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with attach_uploads(validated_data):
+            return super().update(instance, validated_data)
+
+
+class PostFeedSerializer(ImageSrcsetMixin, serializers.ModelSerializer):
+    """
+    Read-only serializer for the public feed.
+
+    ``fields`` restricts the output to a sparse fieldset and ``preview`` reads
+    ``content`` from the ``content_preview`` annotation instead of the full
+    column (see ``PostViewSet.get_queryset``).
+    """
+    class Meta:
+        model = Post
+        fields = ['id', 'title', 'location', 'achieved_at', 'content', 'image', 'image_srcset', 'video', 'video_poster', 'video_duration', 'created_at']
+        read_only_fields = fields
+
+    def __init__(self, *args, fields=None, preview=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if preview and 'content' in self.fields:
+            self.fields['content'] = serializers.CharField(source='content_preview', read_only=True)
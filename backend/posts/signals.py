@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from config.cache import bump_version
+from .media import media_names, stored_media_names, update_refcounts
+from .models import Post, Upload
+from .search import document_vector, search_supported
+from .uploads import remove_upload_file
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_list_cache(sender, **kwargs):
+    bump_version(sender._meta.label)
+
+
+@receiver(pre_save, sender=Post)
+def queue_media_processing(sender, instance, **kwargs):
+    # A freshly assigned upload is not committed to storage until the field's
+    # pre_save runs, which happens after this signal.
+    if instance.image and not instance.image._committed:
+        instance.image_variants = {}
+        instance.media_status = Post.MEDIA_PENDING
+    elif not instance.image:
+        instance.image_variants = {}
+
+    if instance.video and not instance.video._committed:
+        instance.video_poster = None
+        instance.video_duration = None
+        instance.media_status = Post.MEDIA_PENDING
+    elif not instance.video:
+        instance.video_poster = None
+        instance.video_duration = None
+
+
+@receiver(pre_save, sender=Post)
+def update_search_vector(sender, instance, **kwargs):
+    if search_supported():
+        instance.search_vector = document_vector(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_media_names(sender, instance, **kwargs):
+    instance._stored_media_names = stored_media_names(instance.pk) if instance.pk else set()
+
+
+@receiver(post_save, sender=Post)
+def track_media_references(sender, instance, **kwargs):
+    update_refcounts(added=media_names(instance), removed=getattr(instance, '_stored_media_names', ()))
+
+
+@receiver(post_delete, sender=Post)
+def release_media_references(sender, instance, **kwargs):
+    update_refcounts(removed=media_names(instance))
+
+
+@receiver(post_delete, sender=Upload)
+def delete_upload_file(sender, instance, **kwargs):
+    path = instance.path
+    transaction.on_commit(lambda: remove_upload_file(path))
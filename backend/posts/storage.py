@@ -0,0 +1,69 @@
+"""
+Content-addressed storage for post media.
+
+Uploads are hashed while they are streamed to a temporary file next to their
+destination and then renamed to ``<upload_to>/<xx>/<sha256><ext>``. Saving
+content that is already stored just drops the temporary file, so re-uploads
+of the same photo share one file. Which files are still in use is tracked by
+``MediaBlob`` reference counts (see ``posts.media``) and unreferenced files are
+removed by ``manage.py gc_media``.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+TEMP_PREFIX = '.upload-'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content has been hashed
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.path(directory), prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            final_name = posixpath.join(directory, hexdigest[:2], hexdigest + extension)
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+                # Refresh the mtime so gc_media's grace period covers the re-use
+                os.utime(final_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                if settings.FILE_UPLOAD_PERMISSIONS is not None:
+                    os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return final_name
+
+
+media_storage_instance = ContentAddressedStorage()
+
+
+def media_storage():
+    """Storage callable for the ``Post`` file fields (keeps migrations stable)."""
+    return media_storage_instance
@@ -1,3 +1,451 @@
-from django.test import TestCase
+import base64
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase
+from config.cache import get_cache
+from .images import process_post_image
+from .models import MediaBlob, Post, Upload
+
+
+class PostPaginationTests(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        Post.objects.bulk_create(
+            Post(title=f'post {i}', content='content') for i in range(25)
+        )
+
+    def test_list_is_cursor_paginated(self):
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_pages_do_not_overlap_and_cover_all_rows(self):
+        seen = []
+        url = '/api/posts/?page_size=10'
+        while url:
+            response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_insert_between_pages_does_not_shift_next_page(self):
+        first = self.client.get('/api/posts/?page_size=10').data
+        Post.objects.create(title='new', content='content')
+        second = self.client.get(first['next']).data
+        first_ids = {row['id'] for row in first['results']}
+        self.assertFalse(first_ids & {row['id'] for row in second['results']})
+
+
+class PostFeedTests(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.visible = Post.objects.create(title='visible', content='x' * 500)
+        self.blocked = Post.objects.create(title='blocked', content='hidden', is_blocked=True)
+
+    def test_blocked_posts_are_excluded_from_feed(self):
+        response = self.client.get('/api/posts/')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.visible.id])
+        self.assertNotIn('is_blocked', response.data['results'][0])
+
+    def test_blocked_post_detail_still_available(self):
+        response = self.client.get(f'/api/posts/{self.blocked.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_blocked'])
+
+    def test_sparse_fieldset(self):
+        response = self.client.get('/api/posts/?fields=id,title')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/posts/?fields=id,is_blocked')
+        self.assertEqual(response.status_code, 400)
+
+    def test_preview_truncates_content(self):
+        with self.settings(POST_PREVIEW_LENGTH=200):
+            response = self.client.get('/api/posts/?preview=1')
+        self.assertEqual(len(response.data['results'][0]['content']), 200)
+        full = self.client.get('/api/posts/').data['results'][0]['content']
+        self.assertEqual(len(full), 500)
+
+
+class PostSearchTests(APITestCase):
+    def setUp(self):
+        self.title_hit = Post.objects.create(title='서울 사업 성과', content='협약 체결')
+        self.content_hit = Post.objects.create(title='지역 협력', content='서울에서 열린 행사에 참가했습니다')
+        Post.objects.create(title='서울 비공개', content='x', is_blocked=True)
+        Post.objects.create(title='부산 행사', content='해운대')
+
+    def search(self, q):
+        response = self.client.get('/api/posts/search/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_matches_visible_posts_only(self):
+        ids = self.search('서울')
+        self.assertCountEqual(ids, [self.title_hit.id, self.content_hit.id])
+        if connection.vendor == 'postgresql':
+            # Title matches outrank content matches
+            self.assertEqual(ids, [self.title_hit.id, self.content_hit.id])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.search('서울 협약'), [self.title_hit.id])
+
+    def test_uses_feed_serializer_and_pages(self):
+        response = self.client.get('/api/posts/search/', {'q': '행사', 'fields': 'id,title', 'page_size': 1})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        self.assertIsNotNone(response.data['next'])
+
+    def test_edited_post_is_found_by_new_text(self):
+        self.title_hit.title = '대구 사업 성과'
+        self.title_hit.save()
+        self.assertEqual(self.search('대구'), [self.title_hit.id])
+
+    def test_missing_query(self):
+        response = self.client.get('/api/posts/search/', {'q': ' !? '})
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_search(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        response = self.client.get('/admin/posts/post/', {'q': '서울'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+
+
+@override_settings(POST_IMAGE_MAX_EDGE=800, POST_IMAGE_WIDTHS=[320, 640])
+class ImagePipelineTests(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = self.settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self):
+        image = Image.new('RGB', (1600, 1200), (200, 30, 30))
+        exif = Image.Exif()
+        exif[0x010F] = 'TestCamera'  # Make
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', exif=exif)
+        buffer.seek(0)
+        buffer.name = 'photo.jpg'
+        return self.client.post('/api/posts/', {'title': 't', 'content': 'c', 'image': buffer}, format='multipart')
+
+    def test_upload_is_queued_then_processed(self):
+        response = self.upload()
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get()
+        self.assertEqual(post.media_status, Post.MEDIA_PENDING)
+        self.assertEqual(response.data['image_srcset'], {})
+
+        call_command('process_media', '--once', stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        with Image.open(post.image.path) as master:
+            self.assertEqual(master.size, (800, 600))
+            self.assertNotIn(0x010F, master.getexif())
+        widths = [width for width, _ in post.image_variants['sources']['jpeg']]
+        self.assertEqual(widths, [320, 640, 800])
+        self.assertIn('webp', post.image_variants['sources'])
+
+        results = self.client.get('/api/posts/?fields=id,image_srcset').data['results']
+        self.assertIn('320w', results[0]['image_srcset']['webp'])
+
+    def test_pipeline_runs_outside_a_transaction(self):
+        self.upload()
+        depth = len(connection.atomic_blocks)  # the test case's own
+        seen = []
+
+        def pipeline(post):
+            seen.append((len(connection.atomic_blocks), Post.objects.get().media_status))
+            return process_post_image(post)
+
+        with mock.patch('posts.images.process_post_image', pipeline):
+            call_command('process_media', '--once', stdout=io.StringIO())
+        # The claim was committed before the pipeline ran, with no lock held
+        self.assertEqual(seen, [(depth, Post.MEDIA_PROCESSING)])
+        self.assertEqual(Post.objects.get().media_status, Post.MEDIA_READY)
+
+    def test_failure_marks_post_failed(self):
+        self.upload()
+        with mock.patch('posts.images.process_post_image', side_effect=OSError('corrupt')):
+            call_command('process_media', '--once', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(Post.objects.get().media_status, Post.MEDIA_FAILED)
+
+    def test_post_replaced_while_processing_is_queued_again(self):
+        self.upload()
+        replaced = []
+
+        def pipeline(post):
+            result = process_post_image(post)
+            if not replaced:
+                buffer = io.BytesIO()
+                Image.new('RGB', (400, 300)).save(buffer, 'JPEG')
+                edited = Post.objects.get()
+                edited.image = ContentFile(buffer.getvalue(), name='other.jpg')
+                edited.save()
+                replaced.append(edited.image.name)
+            return result
+
+        with mock.patch('posts.images.process_post_image', pipeline):
+            out = io.StringIO()
+            call_command('process_media', '--once', stdout=out)
+        self.assertIn('changed while processing', out.getvalue())
+        # The first result was dropped; the new upload was processed next
+        post = Post.objects.get()
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        self.assertEqual([width for width, _ in post.image_variants['sources']['jpeg']], [320, 400])
+
+    def test_stale_claim_is_taken_over(self):
+        self.upload()
+        Post.objects.update(media_status=Post.MEDIA_PROCESSING, media_claimed_at=timezone.now())
+        call_command('process_media', '--once', stdout=io.StringIO())
+        self.assertEqual(Post.objects.get().media_status, Post.MEDIA_PROCESSING)
+        Post.objects.update(media_claimed_at=timezone.now() - timedelta(seconds=settings.POST_MEDIA_CLAIM_TIMEOUT + 1))
+        call_command('process_media', '--once', stdout=io.StringIO())
+        self.assertEqual(Post.objects.get().media_status, Post.MEDIA_READY)
+
+
+@skipUnless(shutil.which('ffmpeg') and shutil.which('ffprobe'), "ffmpeg is not installed")
+class VideoPipelineTests(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = self.settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_upload_is_remuxed_with_poster_and_duration(self):
+        source = os.path.join(settings.MEDIA_ROOT, 'source.mp4')
+        subprocess.run(
+            ['ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=duration=2:size=160x120:rate=10', source],
+            check=True,
+        )
+        with open(source, 'rb') as f:
+            response = self.client.post('/api/posts/', {'title': 't', 'content': 'c', 'video': f}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+
+        call_command('process_media', '--once', stdout=io.StringIO())
+        post = Post.objects.get()
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        self.assertAlmostEqual(post.video_duration, 2.0, places=1)
+        self.assertTrue(post.video_poster)
+        with post.video.open('rb') as f:
+            head = f.read(64 * 1024)
+        # faststart: the moov atom precedes the media data
+        self.assertNotEqual(head.find(b'moov'), -1)
+        self.assertLess(head.find(b'moov'), head.find(b'mdat'))
+
+
+class MediaStorageTests(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = self.settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def create_post(self, payload=b'same bytes'):
+        return Post.objects.create(title='t', content='c', video=ContentFile(payload, name='clip.mp4'))
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command('gc_media', '--grace-hours', '0', '--all', *args, stdout=out)
+        return out.getvalue()
+
+    def test_identical_uploads_share_one_file(self):
+        first, second = self.create_post(), self.create_post()
+        self.assertEqual(first.video.name, second.video.name)
+        digest = hashlib.sha256(b'same bytes').hexdigest()
+        self.assertEqual(first.video.name, f'post_videos/{digest[:2]}/{digest}.mp4')
+        self.assertEqual(MediaBlob.objects.get(name=first.video.name).refcount, 2)
+
+    def test_file_is_collected_after_last_reference_goes(self):
+        first, second = self.create_post(), self.create_post()
+        path = first.video.path
+        first.delete()
+        self.gc()
+        self.assertTrue(os.path.exists(path))
+        second.delete()
+        self.assertIn('Deleted 1 released file(s)', self.gc())
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_replacing_media_releases_the_old_file(self):
+        post = self.create_post(b'old')
+        old_name = post.video.name
+        post.video = ContentFile(b'new', name='clip.mp4')
+        post.save()
+        self.assertEqual(MediaBlob.objects.get(name=old_name).refcount, 0)
+
+    def test_ffmpeg_runs_outside_a_transaction(self):
+        post = self.create_post()
+        depth = len(connection.atomic_blocks)  # the test case's own
+        runs = []
+
+        def run(*args):
+            runs.append((args[0], len(connection.atomic_blocks)))
+            if args[0] == 'ffprobe':
+                return '2.0\n'
+            with open(args[-1], 'wb') as f:
+                f.write(b'output of ' + args[-1].encode())
+            return ''
+
+        with mock.patch('posts.videos.shutil.which', return_value='/usr/bin/ffmpeg'):
+            with mock.patch('posts.videos._run', run):
+                call_command('process_media', '--once', stdout=io.StringIO())
+        self.assertEqual(runs, [('ffprobe', depth), ('ffmpeg', depth), ('ffmpeg', depth)])
+        post.refresh_from_db()
+        self.assertEqual((post.media_status, post.video_duration), (Post.MEDIA_READY, 2.0))
+        self.assertTrue(post.video_poster)
+
+    def test_sweep_removes_untracked_files_only(self):
+        post = self.create_post()
+        storage = post.video.storage
+        orphan = storage.save('post_videos/orphan.mp4', ContentFile(b'orphan'))
+        legacy = 'post_videos/legacy.mp4'
+        with open(storage.path(legacy), 'wb') as f:
+            f.write(b'legacy')
+        Post.objects.filter(pk=post.pk).update(video=legacy)
+        MediaBlob.objects.all().delete()
+
+        self.gc('--dry-run')
+        self.assertTrue(storage.exists(orphan))
+        self.gc()
+        self.assertFalse(storage.exists(orphan))
+        self.assertTrue(storage.exists(legacy))
+
+    def test_sweep_keeps_referenced_variants(self):
+        post = self.create_post()
+        storage = post.video.storage
+        os.makedirs(storage.path('post_images/variants'))
+        names = [f'post_images/variants/photo-{width}.webp' for width in (320, 640)]
+        orphans = [f'post_images/variants/gone-{i}.webp' for i in range(5)]
+        for name in names + orphans:
+            with open(storage.path(name), 'wb') as f:
+                f.write(b'variant')
+        Post.objects.filter(pk=post.pk).update(
+            image_variants={'sources': {'webp': [[320, names[0]], [640, names[1]]]}}
+        )
+        MediaBlob.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.gc()
+        variant_queries = [q for q in queries.captured_queries if 'image_variants' in q['sql'] and 'LIKE' in q['sql']]
+        # One per swept directory with candidates (the variants and the video's), not one per file
+        self.assertEqual(len(variant_queries), 2)
+        self.assertTrue(all(storage.exists(name) for name in names))
+        self.assertFalse(any(storage.exists(name) for name in orphans))
+
+
+class ResumableUploadTests(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = self.settings(MEDIA_ROOT=media_root, POST_UPLOAD_DIR=os.path.join(media_root, 'uploads'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def create(self, length, field='image', filename='photo.jpg'):
+        metadata = ','.join(
+            f'{key} {base64.b64encode(value.encode()).decode()}'
+            for key, value in (('field', field), ('filename', filename))
+        )
+        return self.client.post(
+            '/api/posts/uploads/', headers={'Upload-Length': str(length), 'Upload-Metadata': metadata}
+        )
+
+    def patch(self, location, offset, chunk, checksum=None, content_type='application/offset+octet-stream'):
+        headers = {'Upload-Offset': str(offset)}
+        if checksum is not None:
+            headers['Upload-Checksum'] = f'sha256 {base64.b64encode(checksum).decode()}'
+        return self.client.generic('PATCH', location, chunk, content_type=content_type, headers=headers)
+
+    def jpeg(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 48), (10, 200, 10)).save(buffer, 'JPEG')
+        return buffer.getvalue()
+
+    def test_chunked_upload_attached_to_post(self):
+        data = self.jpeg()
+        response = self.create(len(data))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Tus-Resumable'], '1.0.0')
+        location = response['Location']
+
+        half = len(data) // 2
+        response = self.patch(location, 0, data[:half], checksum=hashlib.sha256(data[:half]).digest())
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['Upload-Offset'], str(half))
+        # Resume: ask for the offset, then send the rest
+        offset = int(self.client.head(location)['Upload-Offset'])
+        self.assertEqual(self.patch(location, offset, data[offset:]).status_code, 204)
+
+        upload = Upload.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/posts/', {'title': 't', 'content': 'c', 'image_upload': str(upload.pk)}, format='multipart'
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        post = Post.objects.get()
+        self.assertEqual(post.media_status, Post.MEDIA_PENDING)
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(post.image.name, f'post_images/{digest[:2]}/{digest}.jpg')
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(os.path.exists(upload.path))
+
+    def test_chunk_rejections_leave_the_offset_alone(self):
+        location = self.create(10)['Location']
+        self.assertEqual(self.patch(location, 0, b'abcd', checksum=b'wrong').status_code, 460)
+        self.assertEqual(self.patch(location, 3, b'abcd').status_code, 409)
+        self.assertEqual(self.patch(location, 0, b'abcd', content_type='application/json').status_code, 415)
+        self.assertEqual(self.patch(location, 0, b'x' * 11).status_code, 413)
+        upload = Upload.objects.get()
+        self.assertEqual(upload.offset, 0)
+        self.assertEqual(os.path.getsize(upload.path), 0)
+
+    def test_incomplete_or_invalid_uploads_cannot_be_attached(self):
+        self.create(10, field='video', filename='clip.mp4')
+        self.create(3)
+        video, image = Upload.objects.order_by('field')[::-1]
+        self.patch(f'/api/posts/uploads/{image.pk}/', 0, b'abc')
+
+        response = self.client.post('/api/posts/', {'title': 't', 'content': 'c', 'video_upload': str(video.pk)})
+        self.assertIn('incomplete', str(response.data['video_upload']))
+        response = self.client.post('/api/posts/', {'title': 't', 'content': 'c', 'image_upload': str(image.pk)})
+        self.assertIn('valid image', str(response.data['image_upload']))
+        response = self.client.post('/api/posts/', {'title': 't', 'content': 'c', 'image_upload': str(video.pk)})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Post.objects.exists())
+
+    def test_expired_uploads_are_collected(self):
+        self.create(10)
+        upload = Upload.objects.get()
+        Upload.objects.update(updated_at=upload.updated_at - timedelta(hours=settings.POST_UPLOAD_EXPIRE_HOURS + 1))
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('gc_media', '--max-shards', '0', stdout=out)
+        self.assertIn('1 expired upload(s)', out.getvalue())
+        self.assertFalse(os.path.exists(upload.path))
@@ -0,0 +1,211 @@
+"""
+Resumable chunked uploads for post media, following the tus 1.0 protocol
+(core, creation, checksum and termination extensions).
+
+``POST /api/posts/uploads/`` with ``Upload-Length`` and ``Upload-Metadata``
+(``field`` = image|video and ``filename``, base64 encoded as in tus) creates
+an empty file under ``POST_UPLOAD_DIR``. Each ``PATCH`` with
+``Content-Type: application/offset+octet-stream`` writes one chunk at
+``Upload-Offset``. The body is copied from the request stream to the file
+``READ_SIZE`` bytes at a time, so memory per upload is constant, and a worker
+is only held for one chunk of at most ``POST_UPLOAD_CHUNK_MAX_BYTES`` (nginx
+buffers the chunk before it reaches the backend). After a dropped connection
+the client asks ``HEAD`` for the offset and carries on from there. With
+``Upload-Checksum: <algorithm> <base64 digest>`` the chunk is hashed as it is
+written and rolled back on a mismatch.
+
+A finished upload is attached by passing its id as ``image_upload`` or
+``video_upload`` when creating or updating a post. The file then goes through
+the content-addressed storage and the media pipeline exactly like a
+multipart upload. Unfinished uploads expire after ``POST_UPLOAD_EXPIRE_HOURS``
+(``manage.py gc_media``).
+"""
+import base64
+import binascii
+import hashlib
+import os
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from rest_framework.exceptions import APIException, UnsupportedMediaType, ValidationError
+from rest_framework.generics import get_object_or_404
+
+from .models import Upload
+
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = 'creation,checksum,termination'
+CHECKSUM_ALGORITHMS = ('sha1', 'sha256', 'md5')
+CHUNK_CONTENT_TYPE = 'application/offset+octet-stream'
+READ_SIZE = 64 * 1024
+UPLOAD_FIELDS = ('image', 'video')
+
+
+class OffsetConflict(APIException):
+    status_code = 409
+    default_detail = "Upload-Offset does not match the upload's current offset."
+    default_code = 'offset_conflict'
+
+
+class UploadTooLarge(APIException):
+    status_code = 413
+    default_detail = "Upload exceeds the allowed size."
+    default_code = 'too_large'
+
+
+class ChecksumMismatch(APIException):
+    # tus checksum extension
+    status_code = 460
+    default_detail = "Upload-Checksum does not match the chunk."
+    default_code = 'checksum_mismatch'
+
+
+def parse_length(value, header):
+    try:
+        length = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({header: ["Expected a non-negative integer."]})
+    if length < 0:
+        raise ValidationError({header: ["Expected a non-negative integer."]})
+    return length
+
+
+def parse_metadata(header):
+    """``Upload-Metadata``: comma separated ``key base64value`` pairs."""
+    metadata = {}
+    for pair in filter(None, (part.strip() for part in header.split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValidationError({'Upload-Metadata': [f"Invalid value for {key!r}."]})
+    return metadata
+
+
+def parse_checksum(header):
+    if not header:
+        return None
+    algorithm, _, digest = header.strip().partition(' ')
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValidationError({'Upload-Checksum': [f"Supported algorithms: {', '.join(CHECKSUM_ALGORITHMS)}."]})
+    try:
+        return algorithm, base64.b64decode(digest, validate=True)
+    except binascii.Error:
+        raise ValidationError({'Upload-Checksum': ["Digest must be base64 encoded."]})
+
+
+def create_upload(length_header, metadata_header):
+    length = parse_length(length_header, 'Upload-Length')
+    if length > settings.POST_UPLOAD_MAX_BYTES:
+        raise UploadTooLarge(f"Uploads are limited to {settings.POST_UPLOAD_MAX_BYTES} bytes.")
+    metadata = parse_metadata(metadata_header or '')
+    if metadata.get('field') not in UPLOAD_FIELDS:
+        raise ValidationError({'Upload-Metadata': [f"field must be one of: {', '.join(UPLOAD_FIELDS)}."]})
+    filename = os.path.basename(metadata.get('filename', '')) or metadata['field']
+    upload = Upload.objects.create(field=metadata['field'], filename=filename[:255], length=length)
+    os.makedirs(settings.POST_UPLOAD_DIR, exist_ok=True)
+    open(upload.path, 'wb').close()
+    return upload
+
+
+def write_chunk(path, offset, stream, length, checksum=None):
+    """Copy ``length`` bytes of ``stream`` into ``path`` at ``offset``; all or nothing."""
+    digest = hashlib.new(checksum[0]) if checksum else None
+    with open(path, 'r+b') as f:
+        try:
+            f.seek(offset)
+            remaining = length
+            while remaining:
+                chunk = stream.read(min(READ_SIZE, remaining))
+                if not chunk:
+                    raise ValidationError({'Content-Length': ["Request body ended before Content-Length bytes."]})
+                if digest:
+                    digest.update(chunk)
+                f.write(chunk)
+                remaining -= len(chunk)
+            if digest and digest.digest() != checksum[1]:
+                raise ChecksumMismatch()
+        except BaseException:
+            # The client resends the whole chunk, so drop what was written
+            f.truncate(offset)
+            raise
+
+
+def append_chunk(upload_id, request):
+    content_type = request.content_type.split(';')[0].strip()
+    if content_type != CHUNK_CONTENT_TYPE:
+        raise UnsupportedMediaType(content_type)
+    offset = parse_length(request.headers.get('Upload-Offset'), 'Upload-Offset')
+    length = parse_length(request.headers.get('Content-Length') or 0, 'Content-Length')
+    checksum = parse_checksum(request.headers.get('Upload-Checksum'))
+    if length > settings.POST_UPLOAD_CHUNK_MAX_BYTES:
+        raise UploadTooLarge(f"Chunks are limited to {settings.POST_UPLOAD_CHUNK_MAX_BYTES} bytes.")
+
+    # The row lock serializes PATCHes to one upload; different uploads
+    # proceed in parallel.
+    with transaction.atomic():
+        upload = get_object_or_404(Upload.objects.select_for_update(), pk=upload_id)
+        if offset != upload.offset:
+            raise OffsetConflict()
+        if offset + length > upload.length:
+            raise UploadTooLarge("Chunk extends past Upload-Length.")
+        if length:
+            write_chunk(upload.path, offset, request.stream, length, checksum)
+            upload.offset += length
+            upload.save(update_fields=['offset', 'updated_at'])
+    return upload
+
+
+def offset_headers(upload):
+    return {'Upload-Offset': str(upload.offset), 'Upload-Length': str(upload.length)}
+
+
+def upload_data(upload):
+    return {
+        'id': str(upload.pk),
+        'field': upload.field,
+        'filename': upload.filename,
+        'offset': upload.offset,
+        'length': upload.length,
+        'complete': upload.is_complete,
+    }
+
+
+def validate_upload(upload):
+    """Serializer validation for ``image_upload``/``video_upload``."""
+    if not upload.is_complete:
+        raise ValidationError(f"Upload is incomplete ({upload.offset} of {upload.length} bytes).")
+    if upload.field == 'image':
+        from PIL import Image
+
+        # What serializers.ImageField checks for a multipart upload
+        try:
+            with Image.open(upload.path) as image:
+                image.verify()
+        except Exception:
+            raise ValidationError("Upload a valid image. The file you uploaded was either not an image or a corrupted image.")
+    return upload
+
+
+@contextmanager
+def attach_uploads(validated_data):
+    """
+    Replace ``<field>_upload`` in ``validated_data`` with the upload's file
+    for the duration of the save, then delete the finished uploads.
+    """
+    uploads = {field: validated_data.pop(f'{field}_upload', None) for field in UPLOAD_FIELDS}
+    uploads = {field: upload for field, upload in uploads.items() if upload is not None}
+    with ExitStack() as stack:
+        for field, upload in uploads.items():
+            validated_data[field] = File(stack.enter_context(open(upload.path, 'rb')), name=upload.filename)
+        yield
+    for upload in uploads.values():
+        upload.delete()
+
+
+def remove_upload_file(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
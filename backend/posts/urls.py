@@ -1,7 +1,9 @@
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet
+from .views import PostViewSet, UploadViewSet
 
 router = DefaultRouter()
+# Before the post routes, whose detail pattern would match 'uploads/'
+router.register(r'uploads', UploadViewSet, basename='upload')
 router.register(r'', PostViewSet, basename='post')
 
 urlpatterns = router.urls
@@ -0,0 +1,79 @@
+"""
+Upload-time processing for ``Post.video``.
+
+MP4/MOV uploads are remuxed (stream copy, no re-encode) with ``+faststart`` so
+the moov atom sits in front of the media data and playback can start before
+the whole file has arrived. A poster frame and the duration are extracted for
+every video. Needs the ``ffmpeg``/``ffprobe`` binaries (see the Dockerfile).
+
+Each ffmpeg run may take up to ``POST_VIDEO_TIMEOUT``, so ``posts.media`` calls
+this with no transaction open and no row lock held.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+
+FASTSTART_EXTENSIONS = ('.mp4', '.m4v', '.mov')
+
+
+def _run(*args):
+    return subprocess.run(
+        args, check=True, capture_output=True, text=True, timeout=settings.POST_VIDEO_TIMEOUT,
+    ).stdout
+
+
+def probe_duration(path):
+    output = _run(
+        'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', path,
+    )
+    try:
+        return float(output.strip())
+    except ValueError:
+        return None
+
+
+def remux_faststart(src, dst):
+    _run('ffmpeg', '-y', '-v', 'error', '-i', src, '-map', '0', '-c', 'copy', '-movflags', '+faststart', dst)
+
+
+def extract_poster(src, dst, at):
+    _run('ffmpeg', '-y', '-v', 'error', '-ss', f'{at:.2f}', '-i', src, '-frames:v', '1', '-q:v', '3', dst)
+
+
+def process_post_video(post):
+    """
+    Remux ``post.video`` for progressive playback and store a poster; returns
+    the ``Post`` fields to update and stats. ``process_post_media`` writes them.
+    """
+    if not shutil.which('ffmpeg') or not shutil.which('ffprobe'):
+        raise RuntimeError("ffmpeg/ffprobe not found on PATH")
+
+    storage = post.video.storage
+    stem, extension = os.path.splitext(os.path.basename(post.video.name))
+    fields = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f'source{extension.lower()}')
+        with post.video.open('rb') as src, open(source, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+        duration = probe_duration(source)
+        fields['video_duration'] = duration
+
+        if extension.lower() in FASTSTART_EXTENSIONS:
+            remuxed = os.path.join(tmp, f'{stem}.mp4')
+            remux_faststart(source, remuxed)
+            with open(remuxed, 'rb') as f:
+                fields['video'] = storage.save(f'post_videos/{stem}.mp4', File(f))
+
+        poster = os.path.join(tmp, 'poster.jpg')
+        extract_poster(source, poster, min(settings.POST_VIDEO_POSTER_AT, (duration or 0) / 2))
+        with open(poster, 'rb') as f:
+            fields['video_poster'] = post.video_poster.storage.save(f'post_videos/posters/{stem}.jpg', File(f))
+
+    return fields, {'duration': duration, 'remuxed': 'video' in fields}
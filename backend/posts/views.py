@@ -1,8 +1,139 @@
-from rest_framework import viewsets
-from .models import Post
-from .serializers import PostSerializer
+from django.conf import settings
+from django.db.models.functions import Substr
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from config.async_views import AsyncListModelMixin, AsyncRetrieveModelMixin
+from config.cache import CachedListMixin, ConditionalListMixin, ConditionalRetrieveMixin
+from config.pagination import CreatedAtCursorPagination, SearchPagination
+from .models import Post, Upload
+from .search import search_posts, search_terms
+from .serializers import PostFeedSerializer, PostSerializer
+from .uploads import (
+    CHECKSUM_ALGORITHMS, TUS_EXTENSIONS, TUS_VERSION, append_chunk, create_upload, offset_headers, upload_data,
+)
 
+# Feed fields that are not backed by a column of the same name
+FEED_COLUMNS = {'image_srcset': 'image_variants'}
+# Actions that return feed rows (PostFeedSerializer, visible posts only)
+FEED_ACTIONS = ('list', 'search')
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all().order_by('-created_at')
+
+def feed_queryset(queryset, fields, preview=False):
+    """Visible posts, fetching only the columns ``PostFeedSerializer(fields=fields)`` reads."""
+    # The cursor needs id and created_at even when they are not serialized
+    columns = {FEED_COLUMNS.get(name, name) for name in fields} | {'id', 'created_at'}
+    queryset = queryset.filter(is_blocked=False)
+    if preview and 'content' in columns:
+        columns.discard('content')
+        queryset = queryset.annotate(
+            content_preview=Substr('content', 1, settings.POST_PREVIEW_LENGTH)
+        )
+    return queryset.only(*columns)
+
+
+class PostViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    CachedListMixin,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    The list action is the public feed: blocked posts are excluded in SQL and
+    only the columns being serialized are fetched. ``?fields=id,title,...``
+    selects a sparse fieldset and ``?preview=1`` truncates ``content`` to
+    ``POST_PREVIEW_LENGTH`` characters in the database. Every other action
+    uses the full ``PostSerializer``.
+
+    ``search/?q=`` returns the same feed rows ranked by relevance (see
+    ``posts/search.py``) with page-number pagination.
+    """
+    queryset = Post.objects.all().order_by('-created_at', '-id')
     serializer_class = PostSerializer
+    pagination_class = CreatedAtCursorPagination
+
+    def get_feed_fields(self):
+        requested = self.request.query_params.get('fields')
+        if not requested:
+            return list(PostFeedSerializer.Meta.fields)
+        fields = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = set(fields) - set(PostFeedSerializer.Meta.fields)
+        if unknown:
+            raise ValidationError({'fields': [f"Unknown field(s): {', '.join(sorted(unknown))}"]})
+        return fields
+
+    def is_preview(self):
+        return self.request.query_params.get('preview', '').lower() in ('1', 'true', 'yes')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in FEED_ACTIONS:
+            return queryset
+
+        return feed_queryset(queryset, self.get_feed_fields(), self.is_preview())
+
+    def get_serializer_class(self):
+        if self.action in FEED_ACTIONS:
+            return PostFeedSerializer
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in FEED_ACTIONS:
+            kwargs.setdefault('fields', self.get_feed_fields())
+            kwargs.setdefault('preview', self.is_preview())
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=['get'], pagination_class=SearchPagination)
+    def search(self, request):
+        text = request.query_params.get('q', '')
+        if not search_terms(text):
+            raise ValidationError({'q': ['Enter a search term.']})
+        page = self.paginate_queryset(search_posts(self.get_queryset(), text))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class UploadViewSet(viewsets.ViewSet):
+    """
+    Resumable media uploads (see ``posts/uploads.py``): POST creates an
+    upload, HEAD/GET report its offset, PATCH appends a chunk and DELETE
+    abandons it.
+    """
+    lookup_value_regex = '[0-9a-f-]{36}'
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        response['Tus-Resumable'] = TUS_VERSION
+        # Offsets change with every chunk; keep nginx's API cache out of it
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def options(self, request, *args, **kwargs):
+        response = super().options(request, *args, **kwargs)
+        response['Tus-Version'] = TUS_VERSION
+        response['Tus-Extension'] = TUS_EXTENSIONS
+        response['Tus-Max-Size'] = str(settings.POST_UPLOAD_MAX_BYTES)
+        response['Tus-Checksum-Algorithm'] = ','.join(CHECKSUM_ALGORITHMS)
+        return response
+
+    def create(self, request):
+        upload = create_upload(request.headers.get('Upload-Length'), request.headers.get('Upload-Metadata'))
+        headers = {**offset_headers(upload), 'Location': reverse('upload-detail', args=[upload.pk], request=request)}
+        return Response(upload_data(upload), status=status.HTTP_201_CREATED, headers=headers)
+
+    def retrieve(self, request, pk=None):
+        upload = get_object_or_404(Upload, pk=pk)
+        return Response(upload_data(upload), headers=offset_headers(upload))
+
+    def partial_update(self, request, pk=None):
+        upload = append_chunk(pk, request)
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=offset_headers(upload))
+
+    def destroy(self, request, pk=None):
+        get_object_or_404(Upload, pk=pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,9 +1,11 @@
 from django.contrib import admin
+from config.admin import ScalableAdminMixin
 from .models import Praise
 
 
 @admin.register(Praise)
-class PraiseAdmin(admin.ModelAdmin):
+class PraiseAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = ('message', 'created_at')
     search_fields = ('message',)
-    ordering = ('-created_at',)
+    ordering = ('-created_at', '-id')
+    date_hierarchy = 'created_at'
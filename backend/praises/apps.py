@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PraisesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'praises'
+
+    def ready(self):
+        import praises.signals
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from config.cache import bump_version
+from praises import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly praise partitions, freeze last month's and "
+        "archive the ones past PRAISE_RETENTION_MONTHS. Run at least monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=settings.PRAISE_PARTITIONS_AHEAD,
+                            help="Future months to keep partitions for.")
+        parser.add_argument('--retention-months', type=int, default=settings.PRAISE_RETENTION_MONTHS,
+                            help="Archive and drop months older than this; 0 keeps everything.")
+        parser.add_argument('--archive-dir', default=settings.PRAISE_ARCHIVE_DIR)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            raise CommandError("praises_praise is not partitioned (PostgreSQL only, see praises/migrations/0003).")
+        dry_run = options['dry_run']
+        today = timezone.now().astimezone(timezone.utc).date()
+        current = partitions.month_start(today)
+
+        if dry_run:
+            existing = set(partitions.partition_months())
+            created = [m for m in (partitions.add_months(current, i) for i in range(options['ahead'] + 1))
+                       if m not in existing]
+        else:
+            created = partitions.ensure_partitions(today, options['ahead'])
+        for month in created:
+            self.stdout.write(f"{'Would create' if dry_run else 'Created'} {partitions.partition_name(month)}")
+
+        previous = partitions.add_months(current, -1)
+        if not dry_run and partitions.freeze_partition(previous):
+            self.stdout.write(f"Froze {partitions.partition_name(previous)}")
+
+        if options['retention_months'] <= 0:
+            return
+        expired = partitions.expired_months(today, options['retention_months'])
+        for month in expired:
+            if dry_run:
+                self.stdout.write(f"Would archive {partitions.partition_name(month)}")
+                continue
+            path, rows = partitions.archive_partition(month, options['archive_dir'])
+            self.stdout.write(f"Archived {rows} praise(s) to {path}")
+        if expired and not dry_run:
+            bump_version('praises.Praise')
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('praises', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='praise',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='praise',
+            index=models.Index(fields=['-created_at', '-id'], name='praise_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+import datetime
+
+from django.db import migrations
+
+# Turns praises_praise into a table range partitioned by month on created_at
+# (see praises/partitions.py). Postgres only; SQLite keeps the plain table.
+# The partitioned table cannot be altered in place, so the rows are copied
+# into a new one. Partitions cover the oldest existing row's month up to
+# AHEAD months from now; manage.py praise_partitions keeps that window
+# moving.
+AHEAD = 3
+
+COLUMNS = 'id, message, created_at'
+
+
+def next_month(month):
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT pg_get_serial_sequence('praises_praise', 'id')")
+        old_sequence = cursor.fetchone()[0]
+        cursor.execute('SELECT min(created_at), max(id), now() FROM praises_praise')
+        oldest, max_id, now = cursor.fetchone()
+
+    execute('ALTER TABLE praises_praise RENAME TO praises_praise_unpartitioned')
+    execute('ALTER TABLE praises_praise_unpartitioned RENAME CONSTRAINT praises_praise_pkey TO praises_praise_unpartitioned_pkey')
+    execute('ALTER INDEX praise_created_id_idx RENAME TO praise_created_id_idx_unpartitioned')
+    execute(f'ALTER SEQUENCE {old_sequence} RENAME TO praises_praise_unpartitioned_id_seq')
+    execute('CREATE SEQUENCE praises_praise_id_seq')
+    execute(
+        'CREATE TABLE praises_praise ('
+        "id bigint NOT NULL DEFAULT nextval('praises_praise_id_seq'), "
+        'message varchar(280) NOT NULL, '
+        'created_at timestamp with time zone NOT NULL, '
+        'PRIMARY KEY (id, created_at)'
+        ') PARTITION BY RANGE (created_at)'
+    )
+    execute('ALTER SEQUENCE praises_praise_id_seq OWNED BY praises_praise.id')
+    execute('CREATE INDEX praise_created_id_idx ON praises_praise (created_at DESC, id DESC)')
+
+    now = now.astimezone(datetime.timezone.utc)
+    oldest = oldest.astimezone(datetime.timezone.utc) if oldest else now
+    last = datetime.date(now.year, now.month, 1)
+    for _ in range(AHEAD):
+        last = next_month(last)
+    month = datetime.date(oldest.year, oldest.month, 1)
+    while month <= last:
+        execute(
+            f'CREATE TABLE praises_praise_{month:%Y%m} PARTITION OF praises_praise '
+            f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{next_month(month)} 00:00:00+00')"
+        )
+        month = next_month(month)
+
+    execute(f'INSERT INTO praises_praise ({COLUMNS}) SELECT {COLUMNS} FROM praises_praise_unpartitioned')
+    if max_id is not None:
+        execute(f"SELECT setval('praises_praise_id_seq', {int(max_id)})")
+    execute('DROP TABLE praises_praise_unpartitioned')
+    execute('ANALYZE praises_praise')
+
+
+def unpartition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    execute = schema_editor.execute
+    execute('ALTER TABLE praises_praise RENAME TO praises_praise_partitioned')
+    execute('ALTER TABLE praises_praise_partitioned RENAME CONSTRAINT praises_praise_pkey TO praises_praise_partitioned_pkey')
+    execute('ALTER INDEX praise_created_id_idx RENAME TO praise_created_id_idx_partitioned')
+    execute('ALTER SEQUENCE praises_praise_id_seq RENAME TO praises_praise_partitioned_id_seq')
+    execute(
+        'CREATE TABLE praises_praise ('
+        'id bigint NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY, '
+        'message varchar(280) NOT NULL, '
+        'created_at timestamp with time zone NOT NULL'
+        ')'
+    )
+    execute(f'INSERT INTO praises_praise ({COLUMNS}) SELECT {COLUMNS} FROM praises_praise_partitioned')
+    execute(
+        "SELECT setval(pg_get_serial_sequence('praises_praise', 'id'), "
+        "(SELECT last_value FROM praises_praise_partitioned_id_seq))"
+    )
+    execute('CREATE INDEX praise_created_id_idx ON praises_praise (created_at DESC, id DESC)')
+    execute('DROP TABLE praises_praise_partitioned')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('praises', '0002_praise_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
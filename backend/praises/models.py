@@ -6,7 +6,10 @@ class Praise(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='praise_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.message[:50]
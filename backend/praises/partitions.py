@@ -0,0 +1,155 @@
+"""
+Monthly range partitions of ``praises_praise`` on PostgreSQL.
+
+Migration 0003 turns the table into ``PARTITION BY RANGE (created_at)`` with
+one ``praises_praise_YYYYMM`` partition per calendar month (UTC). The primary
+key becomes ``(id, created_at)`` because a partitioned table's unique
+constraints must include the partition key; ids still come from a single
+sequence, and Django keeps treating ``id`` as the primary key.
+
+Newest-first reads (``ORDER BY created_at DESC, id DESC LIMIT n``) become an
+ordered Append that starts at the newest partition and stops once it has
+``n`` rows, so the feed only touches the current month or two. There is
+deliberately no DEFAULT partition: it would disable those ordered scans.
+Instead ``manage.py praise_partitions`` pre-creates ``PRAISE_PARTITIONS_AHEAD``
+months, and an insert past the last partition fails loudly.
+
+Each partition is vacuumed and indexed on its own. Once a month is over its
+partition stops changing, so the command freezes it once and marks it with
+the table comment ``FROZEN_COMMENT``; later runs see the mark and skip it.
+After that, autovacuum skips it, and anti-wraparound vacuums never rescan it. With
+``PRAISE_RETENTION_MONTHS`` set, partitions older than that are detached,
+copied to ``<PRAISE_ARCHIVE_DIR>/praises_praise_YYYYMM.csv.gz`` and dropped;
+dropping a partition leaves no dead tuples behind, unlike ``DELETE``.
+"""
+import datetime
+import gzip
+import os
+import re
+import tempfile
+
+from django.db import connection
+
+TABLE = 'praises_praise'
+PARTITION_RE = re.compile(rf'^{TABLE}_(\d{{4}})(\d{{2}})$')
+# COMMENT ON TABLE of a partition that freeze_partition has vacuumed
+FROZEN_COMMENT = 'frozen'
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_{month:%Y%m}'
+
+
+def bounds(month):
+    return f"'{month:%Y-%m-%d} 00:00:00+00'", f"'{add_months(month, 1):%Y-%m-%d} 00:00:00+00'"
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def partition_months():
+    """Months that currently have a partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = %s::regclass',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            months.append(datetime.date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def create_partition_sql(month):
+    lower, upper = bounds(month)
+    return (
+        f'CREATE TABLE IF NOT EXISTS {partition_name(month)} '
+        f'PARTITION OF {TABLE} FOR VALUES FROM ({lower}) TO ({upper})'
+    )
+
+
+def ensure_partitions(today, ahead):
+    """Create the partitions from ``today``'s month to ``ahead`` months later; returns the new months."""
+    existing = set(partition_months())
+    first = month_start(today)
+    missing = [add_months(first, i) for i in range(ahead + 1) if add_months(first, i) not in existing]
+    with connection.cursor() as cursor:
+        for month in missing:
+            cursor.execute(create_partition_sql(month))
+    return missing
+
+
+def is_frozen(month):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT obj_description(%s::regclass, 'pg_class')", [partition_name(month)])
+        return cursor.fetchone()[0] == FROZEN_COMMENT
+
+
+def freeze_partition(month):
+    """VACUUM (FREEZE, ANALYZE) a month that no longer takes inserts, unless it already was."""
+    if month not in partition_months() or is_frozen(month):
+        return False
+    name = partition_name(month)
+    with connection.cursor() as cursor:
+        cursor.execute(f'VACUUM (FREEZE, ANALYZE) {name}')
+        # Partitioned parents are not analyzed by autovacuum; the planner and
+        # the admin's estimated counts read these statistics.
+        cursor.execute(f'ANALYZE {TABLE}')
+        cursor.execute(f"COMMENT ON TABLE {name} IS '{FROZEN_COMMENT}'")
+    return True
+
+
+def archive_partition(month, archive_dir):
+    """Detach ``month``, copy it to a gzipped CSV and drop it; returns (path, rows)."""
+    name = partition_name(month)
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{name}.csv.gz')
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+        cursor.execute(f'SELECT count(*) FROM {name}')
+        expected = cursor.fetchone()[0]
+        fd, tmp = tempfile.mkstemp(dir=archive_dir, prefix=f'.{name}-')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                with cursor.copy(
+                    f'COPY (SELECT id, message, created_at FROM {name} ORDER BY created_at, id) '
+                    'TO STDOUT (FORMAT csv, HEADER)'
+                ) as copy:
+                    for data in copy:
+                        f.write(data)
+            copied = cursor.rowcount
+            if copied != expected:
+                raise RuntimeError(f'{name}: copied {copied} of {expected} rows')
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            # Put the month back so nothing is lost
+            lower, upper = bounds(month)
+            cursor.execute(f'ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})')
+            raise
+        cursor.execute(f'DROP TABLE {name}')
+    return path, expected
+
+
+def expired_months(today, retention_months):
+    cutoff = add_months(month_start(today), -retention_months)
+    return [month for month in partition_months() if month < cutoff]
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from config.batching import bulk_created
+from config.cache import bump_version
+from .models import Praise
+from .serializers import PraiseSerializer
+from .stream import announce
+
+
+@receiver([post_save, post_delete, bulk_created], sender=Praise)
+def invalidate_list_cache(sender, **kwargs):
+    bump_version(sender._meta.label)
+
+
+@receiver(post_save, sender=Praise)
+def announce_new_praise(sender, instance, created, **kwargs):
+    if created:
+        announce([PraiseSerializer(instance).data])
+
+
+@receiver(bulk_created, sender=Praise)
+def announce_new_praises(sender, instances, **kwargs):
+    announce(PraiseSerializer(instances, many=True).data)
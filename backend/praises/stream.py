@@ -0,0 +1,234 @@
+"""
+Live praise wall over Server-Sent Events.
+
+Every worker process runs one ``Broadcaster`` that fans newly created praises
+out to the SSE connections it holds. On Postgres new rows are announced with
+``NOTIFY praise_created`` (sent in the creating transaction, so delivered on
+commit; a batched insert shares one) and each process keeps a single
+``LISTEN`` connection, which makes a praise posted to any worker reach
+viewers on every worker. Elsewhere the creating process publishes to its own
+subscribers after commit.
+
+Event ids are cursors, ``<created_at in epoch microseconds>-<praise id>``
+of the newest praise sent so far. Ids and timestamps are taken before the
+inserting transaction commits, so concurrent inserts can commit out of
+order: a praise can become visible after a newer one was already sent. A
+reconnecting ``EventSource`` sends its cursor as ``Last-Event-ID`` and is
+sent every praise created since ``SSE_REPLAY_OVERLAP_SECONDS`` before it,
+which covers those late commits; the client drops the ones it already has
+by id, and a live stream never sends the same id twice. When more than
+``SSE_REPLAY_LIMIT`` rows would be replayed a ``reset`` event tells the
+client to reload the list instead.
+"""
+import asyncio
+import datetime
+import json
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'praise_created'
+# NOTIFY payloads must be shorter than 8000 bytes
+NOTIFY_MAX_BYTES = 7999
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def format_cursor(created_at, praise_id):
+    return f'{(created_at - EPOCH) // MICROSECOND}-{praise_id}'
+
+
+def parse_cursor(value):
+    """``(created_at, praise id)`` from an event id, or ``None`` if it is not one."""
+    try:
+        micros, praise_id = (int(part) for part in value.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + micros * MICROSECOND, praise_id
+
+
+def event_cursor(data):
+    """The cursor of a serialized praise (``PraiseSerializer`` data)."""
+    return datetime.datetime.fromisoformat(data['created_at']), data['id']
+
+
+def format_event(data=None, event=None, event_id=None, comment=None):
+    lines = []
+    if comment is not None:
+        lines.append(f': {comment}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if data is not None:
+        lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscriber:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=settings.SSE_QUEUE_SIZE)
+        # Set when the client could not keep up and events were dropped
+        self.overflowed = False
+
+    def put(self, data):
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broadcaster:
+    """Fans new praises out to the SSE subscribers of this process."""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.listener = None
+
+    def subscribe(self):
+        subscriber = Subscriber(asyncio.get_running_loop())
+        self.subscribers.add(subscriber)
+        if connection.vendor == 'postgresql' and (self.listener is None or self.listener.done()):
+            self.listener = asyncio.get_running_loop().create_task(self.listen())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, data):
+        """Thread-safe: called from request threads as well as the event loop."""
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.put, data)
+            except RuntimeError:
+                # The subscriber's event loop has shut down
+                self.subscribers.discard(subscriber)
+
+    async def listen(self):
+        import psycopg
+        from psycopg.conninfo import make_conninfo
+
+        db = settings.DATABASES['default']
+        conninfo = make_conninfo(
+            dbname=db['NAME'], user=db['USER'], password=db['PASSWORD'], host=db['HOST'], port=db['PORT']
+        )
+        delay = 1
+        while self.subscribers:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f'LISTEN {CHANNEL}')
+                    delay = 1
+                    async for notify in conn.notifies():
+                        for data in json.loads(notify.payload):
+                            self.publish(data)
+                        if not self.subscribers:
+                            break
+            except (OSError, psycopg.Error):
+                logger.exception("Praise LISTEN connection failed; retrying in %ss", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+broadcaster = Broadcaster()
+
+
+def notify_payloads(items):
+    """JSON arrays of ``items``, as few as fit in ``NOTIFY_MAX_BYTES`` each."""
+    payloads, chunk, size = [], [], 2
+    for item in items:
+        encoded = json.dumps(item, ensure_ascii=False)
+        item_size = len(encoded.encode()) + 1
+        if chunk and size + item_size > NOTIFY_MAX_BYTES:
+            payloads.append('[' + ','.join(chunk) + ']')
+            chunk, size = [], 2
+        chunk.append(encoded)
+        size += item_size
+    if chunk:
+        payloads.append('[' + ','.join(chunk) + ']')
+    return payloads
+
+
+def announce(items):
+    """
+    Publish newly created praises to every process (called from post_save
+    and, once per batch, from bulk_created).
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for payload in notify_payloads(items):
+                cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+    else:
+        def publish():
+            for data in items:
+                broadcaster.publish(data)
+
+        transaction.on_commit(publish)
+
+
+async def replay(cursor):
+    """
+    Events for the praises created since ``SSE_REPLAY_OVERLAP_SECONDS``
+    before ``cursor``, oldest first, the cursor to continue from and the
+    ids sent. Without ``cursor`` this is only an ``id:`` line with the
+    current time, which sets the client's Last-Event-ID without dispatching
+    an event, so its next reconnect can resume from there.
+    """
+    from .models import Praise
+    from .serializers import PraiseSerializer
+
+    if cursor is None:
+        cursor = (timezone.now(), 0)
+        return [format_event(event_id=format_cursor(*cursor))], cursor, set()
+
+    limit = settings.SSE_REPLAY_LIMIT
+    since = cursor[0] - datetime.timedelta(seconds=settings.SSE_REPLAY_OVERLAP_SECONDS)
+    rows = [
+        praise async for praise in Praise.objects.filter(created_at__gte=since)
+        .exclude(id=cursor[1]).order_by('created_at', 'id')[:limit + 1]
+    ]
+    if len(rows) > limit:
+        return [format_event(event='reset', data={})], cursor, set()
+    events = []
+    for praise in rows:
+        cursor = max(cursor, (praise.created_at, praise.id))
+        events.append(format_event(PraiseSerializer(praise).data, event_id=format_cursor(*cursor)))
+    return events, cursor, {praise.id for praise in rows}
+
+
+async def event_stream(cursor):
+    subscriber = broadcaster.subscribe()
+    try:
+        # Subscribe before replaying so nothing created in between is lost;
+        # duplicates are skipped by id. The ids sent are kept for the life
+        # of the connection (SSE_MAX_SECONDS).
+        yield f'retry: {settings.SSE_RETRY_MS}\n\n'
+        events, cursor, sent = await replay(cursor)
+        for event in events:
+            yield event
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.SSE_MAX_SECONDS
+        while loop.time() < deadline:
+            if subscriber.overflowed:
+                yield format_event(event='reset', data={})
+                return
+            try:
+                data = await asyncio.wait_for(subscriber.queue.get(), settings.SSE_KEEPALIVE_SECONDS)
+            except TimeoutError:
+                yield format_event(comment='keepalive')
+                continue
+            if data['id'] in sent:
+                continue
+            sent.add(data['id'])
+            # A late commit keeps the cursor where it is: replaying from the
+            # newest praise sent already covers it.
+            cursor = max(cursor, event_cursor(data))
+            yield format_event(data, event_id=format_cursor(*cursor))
+        # Closing lets the client reconnect with Last-Event-ID, possibly to
+        # another worker, which keeps long-lived connections balanced.
+    finally:
+        broadcaster.unsubscribe(subscriber)
@@ -0,0 +1,170 @@
+import asyncio
+import datetime
+import gzip
+import json
+import re
+import tempfile
+from unittest import skipUnless
+
+from asgiref.sync import sync_to_async
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from config.cache import get_cache
+from . import partitions
+from .models import Praise
+from .serializers import PraiseSerializer
+from .stream import NOTIFY_MAX_BYTES, broadcaster, format_cursor, notify_payloads, parse_cursor
+from .views import praise_stream
+
+
+class PraisePaginationTests(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def test_list_is_newest_first_and_paginated(self):
+        Praise.objects.bulk_create(Praise(message=f'praise {i}') for i in range(30))
+        response = self.client.get('/api/praises/?page_size=5')
+        self.assertEqual(response.status_code, 200)
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertIsNotNone(response.data['next'])
+
+    def test_next_link_keeps_the_proxied_scheme(self):
+        Praise.objects.bulk_create(Praise(message=f'praise {i}') for i in range(3))
+        # As nginx forwards a request it received over TLS
+        response = self.client.get(
+            '/api/praises/?page_size=1', headers={'Host': 'ymtech.kr', 'X-Forwarded-Proto': 'https'}
+        )
+        self.assertTrue(response.data['next'].startswith('https://ymtech.kr/api/praises/?'))
+
+
+class PraiseStreamTests(APITestCase):
+    def cursor(self, praise):
+        return format_cursor(praise.created_at, praise.id)
+
+    def ids(self, body):
+        return [int(praise_id) for praise_id in re.findall(r'^data: \{"id": (\d+)', body, re.M)]
+
+    def test_wsgi_fallback_replays_after_last_event_id(self):
+        first, second, third = (Praise.objects.create(message=f'praise {i}') for i in range(3))
+        with self.settings(SSE_REPLAY_OVERLAP_SECONDS=0):
+            response = self.client.get('/api/praises/stream/', headers={'Last-Event-ID': self.cursor(first)})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('retry: 15000\n\n'))
+        self.assertEqual(self.ids(body), [second.id, third.id])
+        self.assertEqual(re.findall(r'^id: (\S+)$', body, re.M), [self.cursor(second), self.cursor(third)])
+        self.assertIn('"message": "praise 2"', body)
+
+    def test_late_commit_is_replayed(self):
+        # `late` got the lower id and earlier timestamp but committed after
+        # `sent` had reached the client
+        late, sent = Praise.objects.create(message='late'), Praise.objects.create(message='sent')
+        Praise.objects.filter(pk=late.pk).update(created_at=sent.created_at - datetime.timedelta(seconds=1))
+        body = self.client.get('/api/praises/stream/', headers={'Last-Event-ID': self.cursor(sent)}).content.decode()
+        self.assertEqual(self.ids(body), [late.id])
+        # The cursor does not move back
+        self.assertIn(f'id: {self.cursor(sent)}\n', body)
+
+    def test_first_connect_bookmarks_current_time(self):
+        Praise.objects.create(message='latest')
+        body = self.client.get('/api/praises/stream/').content.decode()
+        created_at, praise_id = parse_cursor(re.search(r'^id: (\S+)$', body, re.M)[1])
+        self.assertLess(timezone.now() - created_at, datetime.timedelta(seconds=5))
+        self.assertEqual(praise_id, 0)
+        self.assertNotIn('data:', body)
+
+    def test_too_many_missed_events_resets(self):
+        first = Praise.objects.create(message='first')
+        Praise.objects.bulk_create(Praise(message='more') for _ in range(2))
+        with self.settings(SSE_REPLAY_LIMIT=1):
+            body = self.client.get(f'/api/praises/stream/?last_event_id={self.cursor(first)}').content.decode()
+        self.assertIn('event: reset', body)
+
+    def test_batch_shares_notify_payloads(self):
+        items = [{'id': i, 'message': '칭찬' * 140} for i in range(50)]
+        payloads = notify_payloads(items)
+        self.assertLess(len(payloads), len(items))
+        self.assertTrue(all(len(payload.encode()) <= NOTIFY_MAX_BYTES for payload in payloads))
+        self.assertEqual([data for payload in payloads for data in json.loads(payload)], items)
+
+    async def test_asgi_stream_pushes_new_praises(self):
+        response = await praise_stream(AsyncRequestFactory().get('/api/praises/stream/'))
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        self.assertRegex(await anext(stream), rb'^id: \d+-0\n\n$')
+
+        def create(message):
+            with self.captureOnCommitCallbacks(execute=True):
+                return Praise.objects.create(message=message)
+
+        praise = await sync_to_async(create)('live')
+        event = (await anext(stream)).decode()
+        self.assertIn(f'id: {self.cursor(praise)}\n', event)
+        self.assertIn('"message": "live"', event)
+
+        # Already sent: skipped. Committed late: sent, with the cursor kept.
+        data = PraiseSerializer(praise).data
+        broadcaster.publish(data)
+        broadcaster.publish({**data, 'id': praise.id - 1, 'message': 'late'})
+        event = (await anext(stream)).decode()
+        self.assertIn('"message": "late"', event)
+        self.assertIn(f'id: {self.cursor(praise)}\n', event)
+
+        # A client disconnect cancels the pending read, as the ASGI handler does
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(broadcaster.subscribers, set())
+
+
+class PraisePartitionTests(TestCase):
+    def test_month_arithmetic_and_names(self):
+        month = partitions.month_start(datetime.date(2025, 11, 30))
+        self.assertEqual(month, datetime.date(2025, 11, 1))
+        self.assertEqual(partitions.add_months(month, 2), datetime.date(2026, 1, 1))
+        self.assertEqual(partitions.add_months(month, -11), datetime.date(2024, 12, 1))
+        self.assertEqual(partitions.partition_name(month), 'praises_praise_202511')
+        self.assertEqual(partitions.bounds(month), ("'2025-11-01 00:00:00+00'", "'2025-12-01 00:00:00+00'"))
+
+    @skipUnless(connection.vendor != 'postgresql', "PostgreSQL partitions the table")
+    def test_command_requires_partitioned_table(self):
+        with self.assertRaises(CommandError):
+            call_command('praise_partitions')
+
+    @skipUnless(connection.vendor == 'postgresql', "partitioning is PostgreSQL only")
+    def test_frozen_month_is_not_frozen_again(self):
+        old = datetime.date(2001, 1, 1)
+        with connection.cursor() as cursor:
+            cursor.execute(partitions.create_partition_sql(old))
+            self.assertFalse(partitions.is_frozen(old))
+            # What freeze_partition leaves behind; VACUUM itself cannot run in a test transaction
+            cursor.execute(f"COMMENT ON TABLE {partitions.partition_name(old)} IS '{partitions.FROZEN_COMMENT}'")
+        self.assertTrue(partitions.is_frozen(old))
+        self.assertFalse(partitions.freeze_partition(old))
+
+    @skipUnless(connection.vendor == 'postgresql', "partitioning is PostgreSQL only")
+    def test_expired_month_is_archived_and_dropped(self):
+        old = datetime.date(2001, 1, 1)
+        with connection.cursor() as cursor:
+            cursor.execute(partitions.create_partition_sql(old))
+        Praise.objects.create(message='old')
+        Praise.objects.filter(message='old').update(created_at=datetime.datetime(2001, 1, 15, tzinfo=datetime.timezone.utc))
+        recent = Praise.objects.create(message='recent')
+        self.assertIn(old, partitions.expired_months(datetime.date.today(), 12))
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            path, rows = partitions.archive_partition(old, archive_dir)
+            with gzip.open(path, 'rt') as f:
+                lines = f.read().splitlines()
+        self.assertEqual(rows, 1)
+        self.assertEqual(lines[0], 'id,message,created_at')
+        self.assertIn(',old,', lines[1])
+        self.assertNotIn(old, partitions.partition_months())
+        self.assertEqual(list(Praise.objects.values_list('pk', flat=True)), [recent.pk])
@@ -1,7 +1,10 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import PraiseViewSet
+from .views import PraiseViewSet, praise_stream
 
 router = DefaultRouter()
 router.register(r'', PraiseViewSet, basename='praise')
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('stream/', praise_stream, name='praise-stream'),
+] + router.urls
@@ -1,9 +1,55 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets
+from config.async_views import AsyncListModelMixin, AsyncRetrieveModelMixin
+from config.batching import BatchedCreateMixin
+from config.cache import CachedListMixin, ConditionalListMixin, ConditionalRetrieveMixin
+from config.pagination import CreatedAtCursorPagination
+from config.throttling import TokenBucketThrottle
 from .models import Praise
 from .serializers import PraiseSerializer
+from .stream import event_stream, parse_cursor, replay
 
 
-class PraiseViewSet(viewsets.ModelViewSet):
+class PraiseViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    CachedListMixin,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    BatchedCreateMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Praise.objects.all()
     serializer_class = PraiseSerializer
+    pagination_class = CreatedAtCursorPagination
     http_method_names = ['get', 'post', 'head', 'options']
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'praise'
+    batch_create = settings.PRAISE_BATCH_WRITES
+    batch_size = settings.PRAISE_BATCH_SIZE
+    batch_window_ms = settings.PRAISE_BATCH_WINDOW_MS
+
+
+@require_GET
+async def praise_stream(request):
+    """
+    SSE feed of new praises (see ``praises/stream.py``). Only ASGI workers
+    hold the stream open; under WSGI that would pin a worker per viewer, so
+    the response carries the missed events and a long ``retry`` and the
+    browser reconnects with ``Last-Event-ID`` instead.
+    """
+    cursor = parse_cursor(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(event_stream(cursor), content_type='text/event-stream')
+    else:
+        events, _, _ = await replay(cursor)
+        body = f'retry: {settings.SSE_FALLBACK_RETRY_MS}\n\n' + ''.join(events)
+        response = HttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering (and proxy-caching) the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
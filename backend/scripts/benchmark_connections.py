@@ -0,0 +1,80 @@
+"""
+Requests per second for each database connection mode (``DB_CONN_MODE``).
+
+Starts gunicorn once per mode against the Postgres configured in the
+environment, drives it with ``loadtest.py`` and prints one row per mode.
+The default path is the inquiry list, which is never served from the API
+cache, so every request reaches the database:
+
+    python scripts/benchmark_connections.py --modes none,persistent,pool \\
+        --workers 4 --concurrency 64 --duration 20
+
+Pass ``--asgi`` to run uvicorn workers instead of sync ones; persistent
+connections are not reused under ASGI, so expect "persistent" to behave
+like "none" there.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from loadtest import run_target  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up within {timeout}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='none,persistent,pool')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8055)
+    parser.add_argument('--asgi', action='store_true')
+    parser.add_argument('--path', action='append')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    args = parser.parse_args()
+    args.path = args.path or ['/api/inquiries/']
+    args.slow_clients = 0
+
+    app, worker_class = ('config.asgi:application', 'uvicorn_worker.UvicornWorker') if args.asgi else (
+        'config.wsgi:application', 'sync')
+    url = f'http://127.0.0.1:{args.port}'
+    report = {}
+    for mode in args.modes.split(','):
+        env = {**os.environ, 'DB_CONN_MODE': mode, 'REQUEST_METRICS_LOG_LEVEL': 'WARNING'}
+        server = subprocess.Popen(
+            ['gunicorn', app, '-k', worker_class, '-w', str(args.workers), '-b', f'127.0.0.1:{args.port}'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(url + args.path[0])
+            report[mode] = asyncio.run(run_target(url, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    columns = ['requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms']
+    print(f"{'mode':<12}" + ''.join(f'{column:>10}' for column in columns))
+    for mode, summary in report.items():
+        print(f'{mode:<12}' + ''.join(f"{summary.get(column, '-'):>10}" for column in columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Closed-loop HTTP load test for comparing the WSGI and ASGI deployments.
+
+Each of ``--concurrency`` clients sends GET requests over a keep-alive
+connection back to back for ``--duration`` seconds, cycling through
+``--path``. ``--slow-clients`` additional connections trickle their request
+headers out over ``--slow-delay`` seconds, the way a client on a bad network
+does, to show how many workers they pin. Standard library only, so it runs
+anywhere Python does:
+
+    # terminal 1 and 2
+    gunicorn config.wsgi:application -w 4 -b :8000
+    gunicorn config.asgi:application -w 4 -k uvicorn_worker.UvicornWorker -b :8001
+    # terminal 3
+    python scripts/loadtest.py --target wsgi=http://127.0.0.1:8000 \\
+        --target asgi=http://127.0.0.1:8001 --concurrency 200 --slow-clients 8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ['/api/posts/', '/api/praises/', '/api/announcements/', '/api/praises/?page_size=50']
+
+
+class Connection:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept: application/json\r\n\r\n'.encode()
+        )
+        await self.writer.drain()
+        status_line = await self.reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readuntil(b'\r\n')) != b'\r\n':
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        size = 0
+        if headers.get('transfer-encoding') == 'chunked':
+            while chunk_size := int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16):
+                size += len(await self.reader.readexactly(chunk_size + 2)) - 2
+            await self.reader.readuntil(b'\r\n')
+        else:
+            size = len(await self.reader.readexactly(int(headers.get('content-length', 0))))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, size
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def client(host, port, paths, offset, deadline, warmup_until, results):
+    connection = Connection(host, port)
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            status, _ = await connection.request(path)
+            ok = status < 400
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            connection.close()
+            ok = False
+        finished = time.perf_counter()
+        if started >= warmup_until:
+            results.append((finished - started) * 1000 if ok else None)
+    connection.close()
+
+
+async def slow_client(host, port, path, delay, deadline):
+    """Send each request one header byte at a time spread over ``delay`` seconds."""
+    raw = f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode()
+    while time.perf_counter() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            for byte in raw:
+                writer.write(bytes([byte]))
+                await writer.drain()
+                await asyncio.sleep(delay / len(raw))
+            await reader.read()
+            writer.close()
+        except OSError:
+            await asyncio.sleep(delay)
+
+
+async def run_target(url, args):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    paths = [parts.path.rstrip('/') + path for path in args.path]
+    started = time.perf_counter()
+    warmup_until = started + args.warmup
+    deadline = warmup_until + args.duration
+    results = []
+    tasks = [
+        client(host, port, paths, i, deadline, warmup_until, results) for i in range(args.concurrency)
+    ] + [
+        slow_client(host, port, paths[0], args.slow_delay, deadline) for _ in range(args.slow_clients)
+    ]
+    await asyncio.gather(*tasks)
+
+    latencies = sorted(ms for ms in results if ms is not None)
+    summary = {'requests': len(results), 'errors': len(results) - len(latencies), 'rps': 0.0}
+    if latencies:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+        summary.update({
+            'rps': round(len(latencies) / args.duration, 1),
+            'p50_ms': round(cuts[49], 1),
+            'p95_ms': round(cuts[94], 1),
+            'p99_ms': round(cuts[98], 1),
+            'max_ms': round(latencies[-1], 1),
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, help='name=http://host:port, repeatable')
+    parser.add_argument('--path', action='append', help=f'request path, repeatable (default: {DEFAULT_PATHS})')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=20.0, help='measured seconds per target')
+    parser.add_argument('--warmup', type=float, default=2.0, help='unmeasured seconds before each run')
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--slow-delay', type=float, default=5.0, help='seconds a slow client takes to send a request')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+
+    report = {}
+    for target in args.target:
+        name, _, url = target.partition('=')
+        report[name] = asyncio.run(run_target(url, args))
+
+    columns = ['requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    print(f"{'target':<10}" + ''.join(f'{column:>10}' for column in columns))
+    for name, summary in report.items():
+        print(f'{name:<10}' + ''.join(f"{summary.get(column, '-'):>10}" for column in columns))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,9 @@ import PlayArrowIcon from '@mui/icons-material/PlayArrow';
 import type { Post } from './types';
 import { getDisplayableImageUrl } from './imageUtils';
 
+// Cards sit in a grid of columns at least 280px wide
+const CARD_IMAGE_SIZES = '(max-width: 600px) 100vw, 400px';
+
 interface PostCardProps {
   post: Post;
   index?: number;
@@ -102,25 +105,34 @@ const PostCard = ({ post, index, onClick }: PostCardProps) => {
       {hasMedia && (
         <Box sx={{ position: 'relative', overflow: 'hidden', paddingTop: '65%' }}>
           {imageUrl ? (
-            <CardMedia
-              component="img"
-              image={imageUrl}
-              alt={post.title}
-              sx={{
-                position: 'absolute',
-                top: 0,
-                left: 0,
-                width: '100%',
-                height: '100%',
-                objectFit: 'cover',
-                filter: 'grayscale(0.6) contrast(1.2)', // Gritty look
-                transition: 'filter 0.3s',
-              }}
-            />
+            <Box component="picture" sx={{ display: 'contents' }}>
+              {post.image_srcset?.avif && <source type="image/avif" srcSet={post.image_srcset.avif} sizes={CARD_IMAGE_SIZES} />}
+              {post.image_srcset?.webp && <source type="image/webp" srcSet={post.image_srcset.webp} sizes={CARD_IMAGE_SIZES} />}
+              <CardMedia
+                component="img"
+                image={imageUrl}
+                srcSet={post.image_srcset?.jpeg}
+                sizes={CARD_IMAGE_SIZES}
+                loading="lazy"
+                alt={post.title}
+                sx={{
+                  position: 'absolute',
+                  top: 0,
+                  left: 0,
+                  width: '100%',
+                  height: '100%',
+                  objectFit: 'cover',
+                  filter: 'grayscale(0.6) contrast(1.2)', // Gritty look
+                  transition: 'filter 0.3s',
+                }}
+              />
+            </Box>
           ) : (
             <Box sx={{ position: 'absolute', top: 0, left: 0, width: '100%', height: '100%', bgcolor: '#000', display: 'flex', alignItems: 'center', justifyContent: 'center' }}>
               <video
                 src={videoUrl || ""}
+                poster={getDisplayableImageUrl(post.video_poster)}
+                preload="metadata"
                 muted
                 loop
                 autoPlay
@@ -3,6 +3,7 @@ import type { FormEvent } from 'react';
 import { Box, TextField, Button, Typography, Paper } from '@mui/material';
 import FileUploadIcon from '@mui/icons-material/FileUpload';
 import type { Post } from './types';
+import { UploadError, forgetUpload, uploadFile } from './uploads';
 
 interface PostFormProps {
   onPostCreated: (newPost: Post) => void;
@@ -17,6 +18,7 @@ const PostForm = ({ onPostCreated, setError }: PostFormProps) => {
   const [postContent, setPostContent] = useState('');
   const [postImage, setPostImage] = useState<File | null>(null);
   const [postVideo, setPostVideo] = useState<File | null>(null);
+  const [uploadProgress, setUploadProgress] = useState<number | null>(null);
 
   const handleImageChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files?.[0]) {
@@ -47,16 +49,18 @@ const PostForm = ({ onPostCreated, setError }: PostFormProps) => {
     formData.append('location', location);
     formData.append('achieved_at', achieved_at);
     formData.append('content', postContent);
-    if (postImage) {
-      formData.append('image', postImage);
-    }
-    if (postVideo) {
-      formData.append('video', postVideo);
-    }
 
     try {
       setLoading(true);
       setError(null);
+      // Media goes up first in resumable chunks; the post references it by id
+      if (postImage) {
+        formData.append('image_upload', await uploadFile(postImage, 'image', setUploadProgress));
+      }
+      if (postVideo) {
+        formData.append('video_upload', await uploadFile(postVideo, 'video', setUploadProgress));
+      }
+      setUploadProgress(null);
       const response = await fetch('/api/posts/', {
         method: 'POST',
         body: formData,
@@ -65,7 +69,7 @@ const PostForm = ({ onPostCreated, setError }: PostFormProps) => {
       if (!response.ok) {
         let readableMessage = "업로드 실패: 서버 거부";
         if (response.status === 413) {
-          readableMessage = "오류: 파일 크기 초과 (Limit: 20MB)";
+          readableMessage = "오류: 파일 크기 초과 (Limit: 200MB)";
         } else {
           try {
             const err = await response.json();
@@ -77,6 +81,12 @@ const PostForm = ({ onPostCreated, setError }: PostFormProps) => {
       }
 
       const newPost: Post = await response.json();
+      if (postImage) {
+        forgetUpload(postImage, 'image');
+      }
+      if (postVideo) {
+        forgetUpload(postVideo, 'video');
+      }
       onPostCreated(newPost);
       setPostTitle('');
       setLocation('');
@@ -87,11 +97,16 @@ const PostForm = ({ onPostCreated, setError }: PostFormProps) => {
       alert('데이터 아카이빙 완료.');
     } catch (error) {
       console.error("Error creating post:", error);
-      if (!error || !(error instanceof Error)) {
+      if (error instanceof UploadError) {
+        setError(error.status === 413
+          ? "오류: 파일 크기 초과 (Limit: 200MB)"
+          : "업로드 중단: 다시 시도하면 이어서 전송합니다.");
+      } else if (!error || !(error instanceof Error)) {
         setError("시스템 오류: 잠시 후 다시 시도하십시오.");
       }
     } finally {
       setLoading(false);
+      setUploadProgress(null);
     }
   };
 
@@ -246,7 +261,9 @@ const PostForm = ({ onPostCreated, setError }: PostFormProps) => {
             }
           }}
         >
-          {loading ? 'ARCHIVING...' : '흑역사 영원히 박제 (UPLOAD)'}
+          {uploadProgress !== null
+            ? `UPLOADING... ${Math.round(uploadProgress * 100)}%`
+            : loading ? 'ARCHIVING...' : '흑역사 영원히 박제 (UPLOAD)'}
         </Button>
       </Box>
     </Paper>
@@ -9,9 +9,12 @@ import GoogleAd from '../../components/GoogleAd';
 interface PostListProps {
   posts: Post[];
   loading: boolean;
+  // Set when the parent fetched a cursor page (`PostPage`) with a `next` link.
+  hasMore?: boolean;
+  onLoadMore?: () => void;
 }
 
-const PostList = ({ posts, loading }: PostListProps) => {
+const PostList = ({ posts, loading, hasMore = false, onLoadMore }: PostListProps) => {
   const [modalOpen, setModalOpen] = useState(false);
   const [selectedPost, setSelectedPost] = useState<Post | null>(null);
   const [visibleAds, setVisibleAds] = useState<Set<number>>(new Set());
@@ -96,6 +99,19 @@ const PostList = ({ posts, loading }: PostListProps) => {
         ))}
       </Box>
 
+      {hasMore && onLoadMore && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 4 }}>
+          <Button
+            onClick={onLoadMore}
+            disabled={loading}
+            variant="outlined"
+            sx={{ fontFamily: 'monospace', color: '#ddd', borderColor: '#444' }}
+          >
+            LOAD_MORE
+          </Button>
+        </Box>
+      )}
+
       <Modal
         open={modalOpen}
         onClose={closeModal}
@@ -162,6 +178,8 @@ const PostList = ({ posts, loading }: PostListProps) => {
                         controls
                         autoPlay
                         src={getDisplayableImageUrl(selectedPost.video)}
+                        poster={getDisplayableImageUrl(selectedPost.video_poster)}
+                        preload="metadata"
                         style={{ maxWidth: '100%', maxHeight: '60vh', objectFit: 'contain' }}
                       />
                     ) : (
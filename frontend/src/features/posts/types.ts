@@ -5,7 +5,17 @@ export interface Post {
   achieved_at?: string;
   content: string;
   image?: string;
+  // Responsive variants keyed by format ('avif' | 'webp' | 'jpeg'), as `srcset` strings
+  image_srcset?: Record<string, string>;
   video?: string;
+  video_poster?: string;
+  video_duration?: number;
   is_blocked?: boolean;
   created_at?: string;
 }
+
+export interface PostPage {
+  next: string | null;
+  previous: string | null;
+  results: Post[];
+}
@@ -0,0 +1,136 @@
+// Resumable chunked uploads against /api/posts/uploads/ (tus 1.0 subset, see
+// backend/posts/uploads.py). Every chunk carries a SHA-256 Upload-Checksum.
+// After a dropped connection the client asks the server for its offset and
+// continues from there, and the upload id is remembered per file so a page
+// reload resumes instead of starting over.
+
+const UPLOADS_URL = '/api/posts/uploads/';
+// Below the backend's POST_UPLOAD_CHUNK_MAX_BYTES (8 MiB)
+const CHUNK_SIZE = 4 * 1024 * 1024;
+const MAX_RETRIES = 5;
+const TUS_HEADERS = { 'Tus-Resumable': '1.0.0' };
+
+export type UploadField = 'image' | 'video';
+
+export class UploadError extends Error {
+  status: number;
+
+  constructor(status: number) {
+    super(status ? `Upload failed: HTTP ${status}` : 'Upload failed: network error');
+    this.status = status;
+  }
+}
+
+const storageKey = (file: File, field: UploadField) =>
+  `upload:${field}:${file.name}:${file.size}:${file.lastModified}`;
+
+const uploadUrl = (id: string) => `${UPLOADS_URL}${id}/`;
+
+const toBase64 = (bytes: Uint8Array) => btoa(Array.from(bytes, (byte) => String.fromCharCode(byte)).join(''));
+
+const encodeMetadata = (metadata: Record<string, string>) =>
+  Object.entries(metadata)
+    .map(([key, value]) => `${key} ${toBase64(new TextEncoder().encode(value))}`)
+    .join(',');
+
+const sha256 = async (data: ArrayBuffer) => {
+  // crypto.subtle only exists in secure contexts; the checksum is optional
+  if (!globalThis.crypto?.subtle) {
+    return null;
+  }
+  return toBase64(new Uint8Array(await crypto.subtle.digest('SHA-256', data)));
+};
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const createUpload = async (file: File, field: UploadField) => {
+  const response = await fetch(UPLOADS_URL, {
+    method: 'POST',
+    headers: {
+      ...TUS_HEADERS,
+      'Upload-Length': String(file.size),
+      'Upload-Metadata': encodeMetadata({ field, filename: file.name }),
+    },
+  });
+  if (!response.ok) {
+    throw new UploadError(response.status);
+  }
+  const upload: { id: string } = await response.json();
+  return upload.id;
+};
+
+// The server's offset, or null when the upload is gone (expired or attached)
+const fetchOffset = async (id: string) => {
+  const response = await fetch(uploadUrl(id), { method: 'HEAD', headers: TUS_HEADERS, cache: 'no-store' });
+  if (!response.ok) {
+    return null;
+  }
+  return Number(response.headers.get('Upload-Offset'));
+};
+
+// Uploads `file` (resuming an earlier attempt when possible) and resolves to
+// the upload id to send as `image_upload` / `video_upload`.
+export const uploadFile = async (
+  file: File,
+  field: UploadField,
+  onProgress?: (fraction: number) => void,
+) => {
+  const key = storageKey(file, field);
+  let id = localStorage.getItem(key);
+  let offset = id ? await fetchOffset(id) : null;
+  if (!id || offset === null) {
+    id = await createUpload(file, field);
+    offset = 0;
+    localStorage.setItem(key, id);
+  }
+
+  let failures = 0;
+  while (offset < file.size) {
+    onProgress?.(offset / file.size);
+    const chunk = await file.slice(offset, offset + CHUNK_SIZE).arrayBuffer();
+    const headers: Record<string, string> = {
+      ...TUS_HEADERS,
+      'Content-Type': 'application/offset+octet-stream',
+      'Upload-Offset': String(offset),
+    };
+    const checksum = await sha256(chunk);
+    if (checksum) {
+      headers['Upload-Checksum'] = `sha256 ${checksum}`;
+    }
+
+    let response: Response | null = null;
+    try {
+      response = await fetch(uploadUrl(id), { method: 'PATCH', headers, body: chunk });
+    } catch {
+      // Network error: retry below from whatever offset the server has
+    }
+    if (response?.ok) {
+      offset = Number(response.headers.get('Upload-Offset'));
+      failures = 0;
+      continue;
+    }
+    // 409 (offset out of sync) and 460 (corrupted chunk) resync and retry,
+    // as do server errors; anything else is final
+    if (response && response.status < 500 && response.status !== 409 && response.status !== 460) {
+      throw new UploadError(response.status);
+    }
+    failures += 1;
+    if (failures > MAX_RETRIES) {
+      throw new UploadError(response?.status ?? 0);
+    }
+    await sleep(1000 * 2 ** (failures - 1));
+    const current = await fetchOffset(id).catch(() => offset);
+    if (current === null) {
+      localStorage.removeItem(key);
+      throw new UploadError(404);
+    }
+    offset = current;
+  }
+  onProgress?.(1);
+  return id;
+};
+
+// Call once the upload is attached to a post
+export const forgetUpload = (file: File, field: UploadField) => {
+  localStorage.removeItem(storageKey(file, field));
+};
@@ -3,7 +3,7 @@ import { Box, Typography, TextField, Button } from '@mui/material';
 import ContentCopyIcon from '@mui/icons-material/ContentCopy';
 import SendIcon from '@mui/icons-material/Send';
 import KakaoAd from '../../components/KakaoAd';
-import type { Praise } from './types';
+import type { Praise, PraisePage } from './types';
 
 const DONATION_ACCOUNT = `농협은행 302-1045-4203-01 (표주상)`;
 
@@ -12,13 +12,16 @@ const PraiseSection = () => {
   const [praises, setPraises] = useState<Praise[]>([]);
   const [submitting, setSubmitting] = useState(false);
   const [feedback, setFeedback] = useState<string | null>(null);
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
 
-  const fetchPraises = async () => {
+  // Cursor-paginated: the first call loads the newest page, later calls append older ones.
+  const fetchPraises = async (url: string = '/api/praises/') => {
     try {
-      const response = await fetch('/api/praises/');
+      const response = await fetch(url);
       if (response.ok) {
-        const data: Praise[] = await response.json();
-        setPraises(data);
+        const data: PraisePage = await response.json();
+        setPraises((prev) => (url === '/api/praises/' ? data.results : [...prev, ...data.results]));
+        setNextUrl(data.next);
       }
     } catch (error) {
       console.error('Failed to fetch praises', error);
@@ -27,6 +30,17 @@ const PraiseSection = () => {
 
   useEffect(() => {
     fetchPraises();
+
+    // New praises from every visitor arrive over SSE; EventSource reconnects
+    // by itself and resumes from the last event id it saw.
+    const source = new EventSource('/api/praises/stream/');
+    source.onmessage = (event) => {
+      const praise: Praise = JSON.parse(event.data);
+      setPraises((prev) => (prev.some((p) => p.id === praise.id) ? prev : [praise, ...prev]));
+    };
+    // Too much was missed to replay; reload the newest page
+    source.addEventListener('reset', () => fetchPraises());
+    return () => source.close();
   }, []);
 
   const handleSubmit = async (event: React.FormEvent<HTMLFormElement>) => {
@@ -47,7 +61,8 @@ const PraiseSection = () => {
         throw new Error('메시지 전송 실패');
       }
       const newPraise: Praise = await response.json();
-      setPraises((prev) => [newPraise, ...prev].slice(0, 8));
+      // The stream may have delivered it already
+      setPraises((prev) => (prev.some((p) => p.id === newPraise.id) ? prev : [newPraise, ...prev]));
       setMessage('');
       setFeedback('메시지가 박제되었습니다.');
     } catch (error) {
@@ -174,6 +189,15 @@ const PraiseSection = () => {
               NO_MESSAGES_FOUND...
             </Typography>
           )}
+          {nextUrl && (
+            <Button
+              onClick={() => fetchPraises(nextUrl)}
+              size="small"
+              sx={{ color: '#666', fontFamily: 'monospace' }}
+            >
+              LOAD_MORE
+            </Button>
+          )}
         </Box>
       </Box>
 
@@ -3,3 +3,9 @@ export interface Praise {
   message: string;
   created_at: string;
 }
+
+export interface PraisePage {
+  next: string | null;
+  previous: string | null;
+  results: Praise[];
+}